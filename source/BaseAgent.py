@@ -10,6 +10,11 @@ from mcpi.minecraft import Minecraft
 from mcpi.vec3 import Vec3
 from .MessageBus import MessageBus
 from .Message import Message, utc_now_iso
+from .PrefixIndex import PrefixIndex
+from .BlockWriter import BlockWriter
+from .ConnectionPool import PooledMinecraft
+from .WorldCache import WorldCache
+from .world_reads import read_heights
 
 class BotState(Enum):
     IDLE = auto()
@@ -27,25 +32,44 @@ class BaseAgent(threading.Thread):
         agent_id: int,
         bus: MessageBus,
         tick_time: float = 0.1,
+        idle_timeout: float = 1.0,
+        writer: Optional[BlockWriter] = None,
+        cache: Optional[WorldCache] = None,
     ):
         super().__init__(name=name, daemon=True)
         self.mc = mc
         self.name = name          # también sirve como target en el bus
         self.pos = start_pos
         self.tick_time = tick_time
+        self.idle_timeout = idle_timeout  # máximo bloqueo en IDLE antes de revisar self.running
         self.running = True
         self.mess_count = 0
         self.id = agent_id
         self.bus = bus
+        self.writer = writer      # si existe, las escrituras se agrupan en él
+        self.cache = cache        # caché de lecturas compartida entre agentes
         self.state: BotState = BotState.IDLE
+        # prefijo de msg.type -> handler(msg_dict); gana el prefijo más largo
+        self._handlers: PrefixIndex = PrefixIndex()
+        self.register_handler("control", self.handle_control_message)
 
     # ---------- ciclo principal del hilo ----------
 
     def run(self):
-        while(self.running):
-            self._tick_state()
+        try:
+            self.on_start()
+            while(self.running):
+                self._tick_state()
+        finally:
+            # devolver al pool la conexión de este hilo
+            if isinstance(self.mc, PooledMinecraft):
+                self.mc.release_thread()
         
 
+    def on_start(self) -> None:
+        """Se llama ya en el hilo del agente, antes del primer tick."""
+        pass
+
     def stop(self):
         self.state = BotState.STOPPED
 
@@ -65,11 +89,24 @@ class BaseAgent(threading.Thread):
         handler()
 
     def _on_idle(self) -> None:
-        self.handle_message(self.bus.poll_for(self.name))
+        # bloquea en el bus en lugar de girar sobre una cola vacía
+        self.handle_message(self.bus.wait_for(self.name, timeout=self.idle_timeout))
 
     def _on_running(self) -> None:
         self.step()
-        time.sleep(self.tick_time)
+        self._wait_tick()
+
+    def _wait_tick(self) -> None:
+        """Espera tick_time atendiendo los mensajes que lleguen mientras tanto."""
+        deadline = time.monotonic() + self.tick_time
+        while self.state == BotState.RUNNING:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            msg = self.bus.wait_for(self.name, timeout=remaining)
+            if msg is None:
+                break
+            self.handle_message(msg)
 
     def _on_stopped(self) -> None:
         print(f"[{self.name}] stopped")
@@ -108,11 +145,46 @@ class BaseAgent(threading.Thread):
 
     def get_block(self, offset: Vec3):
         target = self.pos + offset
-        return self.mc.getBlock(target.x, target.y, target.z)
+        return self.read_block(target.x, target.y, target.z)
+
+    def read_block(self, x: int, y: int, z: int) -> int:
+        if self.cache is not None:
+            return self.cache.get_block(x, y, z)
+        return self.mc.getBlock(x, y, z)
+
+    def read_height(self, x: int, z: int) -> int:
+        if self.cache is not None:
+            return self.cache.get_height(x, z)
+        return self.mc.getHeight(x, z)
+
+    def read_heights(self, x0: int, z0: int, width: int, length: int, out=None):
+        """Alturas de un rectángulo en una lectura pipelineada, pasando por la caché si la hay."""
+        if self.cache is not None:
+            return self.cache.read_heights(x0, z0, width, length, out=out)
+        return read_heights(self.mc, x0, z0, width, length, out=out)
 
     def set_block(self, offset: Vec3, block_id: int, data: int = 0):
         target = self.pos + offset
-        self.mc.setBlock(target.x, target.y, target.z, block_id, data)
+        self.write_block(target.x, target.y, target.z, block_id, data)
+
+    def write_block(self, x: int, y: int, z: int, block_id: int, data: int = 0):
+        """Escribe en coordenadas absolutas, vía BlockWriter si el agente tiene uno."""
+        if self.writer is not None:
+            self.writer.set_block(x, y, z, block_id, data)
+        else:
+            self.mc.setBlock(x, y, z, block_id, data)
+        if self.cache is not None:
+            self.cache.note_write(x, y, z, block_id)
+
+    def write_cuboid(self, x0: int, y0: int, z0: int, x1: int, y1: int, z1: int,
+                     block_id: int, data: int = 0):
+        """Rellena una caja (inclusiva) con un solo setBlocks."""
+        if self.writer is not None:
+            self.writer.set_blocks(x0, y0, z0, x1, y1, z1, block_id, data)
+        else:
+            self.mc.setBlocks(x0, y0, z0, x1, y1, z1, block_id, data)
+        if self.cache is not None:
+            self.cache.note_cuboid(x0, y0, z0, x1, y1, z1, block_id)
 
     # ---------- mensaes ----------
 
@@ -153,11 +225,18 @@ class BaseAgent(threading.Thread):
         print(f"MinerBot {self.id} received message: {msg}")
 
         msg_dict = asdict(msg)
-        msg_type = str(msg_dict.get("type", ""))
-        if msg_type.startswith("control"):
-            self.handle_control_message(msg_dict)
-        else:
-            self.handle_priv_message(msg_dict)
+        handler = self._handlers.longest(str(msg.type))
+        if handler is None:
+            handler = self.handle_priv_message
+        handler(msg_dict)
+
+    def register_handler(self, type_prefix: str, handler) -> None:
+        """Asocia un handler a los mensajes cuyo type empieza por type_prefix."""
+        self._handlers.add(type_prefix, handler)
+
+    def subscribe(self, type_prefix: str = "", target: Optional[str] = None) -> None:
+        """Recibe también los mensajes de otros targets que casen con type_prefix."""
+        self.bus.subscribe(self.name, type_prefix, target)
             
     def handle_priv_message(self, msg_dict: dict) -> None:
         pass 
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from .BuildCheckpoint import plan_hash
+from .world_diff import plan_arrays
+
+# (id, data)
+BlockKey = Tuple[int, int]
+
+
+class BillOfMaterials:
+    """Bloques necesarios para un plan, por id y por (id, data).
+
+    Se cuentan las celdas ya resueltas (si una celda se repite en el plan
+    cuenta solo la última entrada, que es la que queda en el mundo).
+    """
+
+    def __init__(self, by_block: Optional[Dict[BlockKey, int]] = None):
+        self.by_block: Dict[BlockKey, int] = dict(by_block or {})
+        self._by_id: Optional[Dict[int, int]] = None
+
+    @classmethod
+    def from_plan(cls, plan) -> "BillOfMaterials":
+        _, ids, data = plan_arrays(plan)
+        if len(ids) == 0:
+            return cls()
+        # un único bincount sobre la clave combinada id * 16 + data
+        keys = ids.astype(np.int64) * 16 + (data & 0x0F)
+        counts = np.bincount(keys)
+        present = np.nonzero(counts)[0]
+        return cls({(int(k) >> 4, int(k) & 0x0F): int(counts[k]) for k in present})
+
+    @property
+    def by_id(self) -> Dict[int, int]:
+        if self._by_id is None:
+            totals: Dict[int, int] = {}
+            for (block_id, _), n in self.by_block.items():
+                totals[block_id] = totals.get(block_id, 0) + n
+            self._by_id = totals
+        return self._by_id
+
+    @property
+    def total(self) -> int:
+        return sum(self.by_block.values())
+
+    def add(self, block_id: int, data: int = 0, count: int = 1) -> None:
+        key = (int(block_id), int(data) & 0x0F)
+        left = self.by_block.get(key, 0) + count
+        if left > 0:
+            self.by_block[key] = left
+        else:
+            self.by_block.pop(key, None)
+        self._by_id = None
+
+    def remove(self, block_id: int, data: int = 0, count: int = 1) -> None:
+        self.add(block_id, data, -count)
+
+    def apply(self, removed: Iterable[dict] = (), added: Iterable[dict] = ()) -> None:
+        """Actualiza los totales con entradas de plan quitadas y añadidas."""
+        for entry in removed:
+            self.remove(entry["id"], entry.get("data", 0))
+        for entry in added:
+            self.add(entry["id"], entry.get("data", 0))
+
+    def copy(self) -> "BillOfMaterials":
+        return BillOfMaterials(self.by_block)
+
+    def __len__(self) -> int:
+        return len(self.by_block)
+
+    def __repr__(self) -> str:
+        return f"BillOfMaterials({self.by_id})"
+
+
+_cache: "OrderedDict[str, BillOfMaterials]" = OrderedDict()
+_cache_lock = threading.Lock()
+CACHE_SIZE = 32
+
+
+def bom_for_plan(plan, key: Optional[str] = None) -> BillOfMaterials:
+    """BillOfMaterials de un plan, reutilizando el cálculo si el hash del plan ya se vio.
+
+    Devuelve una copia: se puede modificar sin afectar a la caché.
+    """
+    if key is None:
+        key = plan_hash(plan)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached.copy()
+    bom = BillOfMaterials.from_plan(plan)
+    with _cache_lock:
+        _cache[key] = bom
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return bom.copy()
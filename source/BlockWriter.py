@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from mcpi.minecraft import Minecraft
+
+from .ConnectionPool import PooledMinecraft
+from .world_reads import send_commands
+
+Cell = Tuple[int, int, int]
+Cuboid = Tuple[int, int, int, int, int, int]   # x0, y0, z0, x1, y1, z1 (inclusivo)
+
+
+def merge_cuboids(cells: Iterable[Cell]) -> List[Cuboid]:
+    """Agrupa celdas en cajas de forma voraz: primero en x, luego z y por último y."""
+    pending = set(cells)
+    boxes: List[Cuboid] = []
+    for (x, y, z) in sorted(pending, key=lambda c: (c[1], c[2], c[0])):
+        if (x, y, z) not in pending:
+            continue
+
+        x1 = x
+        while (x1 + 1, y, z) in pending:
+            x1 += 1
+
+        z1 = z
+        while all((xi, y, z1 + 1) in pending for xi in range(x, x1 + 1)):
+            z1 += 1
+
+        y1 = y
+        while all(
+            (xi, y1 + 1, zi) in pending
+            for xi in range(x, x1 + 1)
+            for zi in range(z, z1 + 1)
+        ):
+            y1 += 1
+
+        for yi in range(y, y1 + 1):
+            for zi in range(z, z1 + 1):
+                for xi in range(x, x1 + 1):
+                    pending.discard((xi, yi, zi))
+        boxes.append((x, y, z, x1, y1, z1))
+    return boxes
+
+
+class BlockWriter:
+    """Servicio de escritura de bloques compartido por los agentes.
+
+    Acumula setBlock, fusiona celdas contiguas del mismo id/data en setBlocks y
+    envía todos los comandos en un único sendall. Se vacía al llegar a max_batch
+    celdas pendientes o cuando la más antigua supera max_delay segundos.
+    """
+
+    def __init__(self, mc: Minecraft, max_batch: int = 4096, max_delay: float = 0.05):
+        self.mc = mc
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending: Dict[Cell, Tuple[int, int]] = {}
+        self._first_pending = 0.0
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.blocks_written = 0
+        self.commands_sent = 0
+        self.flushes = 0
+
+    # ---------- API de escritura ----------
+
+    def set_block(self, x: int, y: int, z: int, block_id: int, data: int = 0) -> None:
+        with self._lock:
+            if not self._pending:
+                self._first_pending = time.monotonic()
+            self._pending[(int(x), int(y), int(z))] = (int(block_id), int(data))
+            due = self._due_locked()
+        if due:
+            self.flush()
+
+    def set_blocks(self, x0: int, y0: int, z0: int, x1: int, y1: int, z1: int,
+                   block_id: int, data: int = 0) -> None:
+        with self._lock:
+            if not self._pending:
+                self._first_pending = time.monotonic()
+            for y in range(min(y0, y1), max(y0, y1) + 1):
+                for z in range(min(z0, z1), max(z0, z1) + 1):
+                    for x in range(min(x0, x1), max(x0, x1) + 1):
+                        self._pending[(int(x), int(y), int(z))] = (int(block_id), int(data))
+            due = self._due_locked()
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Envía todo lo pendiente. Devuelve el número de comandos enviados."""
+        # el swap y el envío van bajo el mismo lock para no reordenar lotes
+        with self._send_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            by_block: Dict[Tuple[int, int], List[Cell]] = {}
+            for cell, key in pending.items():
+                by_block.setdefault(key, []).append(cell)
+
+            lines = []
+            for (block_id, data), cells in by_block.items():
+                for x0, y0, z0, x1, y1, z1 in merge_cuboids(cells):
+                    if (x0, y0, z0) == (x1, y1, z1):
+                        lines.append(b"world.setBlock(%d,%d,%d,%d,%d)\n" % (x0, y0, z0, block_id, data))
+                    else:
+                        lines.append(b"world.setBlocks(%d,%d,%d,%d,%d,%d,%d,%d)\n"
+                                     % (x0, y0, z0, x1, y1, z1, block_id, data))
+
+            self._send(b"".join(lines))
+            self.blocks_written += len(pending)
+            self.commands_sent += len(lines)
+            self.flushes += 1
+            return len(lines)
+
+    def _send(self, payload: bytes) -> None:
+        # pipeline: todos los comandos en una sola escritura al socket
+        send_commands(self.mc, payload)
+
+    def _due_locked(self) -> bool:
+        return (len(self._pending) >= self.max_batch
+                or time.monotonic() - self._first_pending >= self.max_delay)
+
+    # ---------- vaciado periódico ----------
+
+    def start(self) -> None:
+        """Arranca un hilo que vacía el buffer cada max_delay segundos."""
+        if self._flusher is not None:
+            return
+        self._stop.clear()
+        self._flusher = threading.Thread(target=self._run, name="BlockWriter", daemon=True)
+        self._flusher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.wait(self.max_delay):
+                with self._lock:
+                    due = bool(self._pending) and self._due_locked()
+                if due:
+                    self.flush()
+        finally:
+            if isinstance(self.mc, PooledMinecraft):
+                self.mc.release_thread()
+
+    def stats(self) -> dict:
+        return {
+            "blocks_written": self.blocks_written,
+            "commands_sent": self.commands_sent,
+            "flushes": self.flushes,
+            "pending": len(self._pending),
+        }
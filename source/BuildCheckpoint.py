@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .world_diff import plan_arrays
+
+
+def plan_hash(plan) -> str:
+    """Huella estable de un plan (offsets, ids y data tras resolver duplicados)."""
+    offsets, ids, data = plan_arrays(plan)
+    h = hashlib.sha1()
+    for arr in (offsets, ids, data):
+        h.update(arr.astype("<i4").tobytes())
+    return h.hexdigest()
+
+
+class BuildCheckpoint:
+    """Progreso de construcción en un fichero JSON-lines de solo añadir.
+
+    Cada registro es el estado completo (cursor, sitio, hash del plan,
+    inventario), así que para reanudar basta con el último. Se escribe como
+    mucho cada interval segundos salvo con force, con fsync para que sobreviva
+    a una caída, y el fichero se compacta al superar max_records líneas.
+    """
+
+    def __init__(self, path: str, interval: float = 1.0, max_records: int = 1000):
+        self.path = path
+        self.interval = interval
+        self.max_records = max_records
+        self._last_write: Optional[float] = None
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # un fichero de una ejecución anterior cuenta para la compactación
+        self._records = self._recover()
+
+    def due(self) -> bool:
+        """True si ya pasó el intervalo desde el último registro."""
+        return self._last_write is None or time.monotonic() - self._last_write >= self.interval
+
+    def save(self, state: Dict[str, Any], force: bool = False) -> bool:
+        with self._lock:
+            if not force and not self.due():
+                return False
+            record = dict(state, ts=time.time())
+            line = json.dumps(record, separators=(",", ":")) + "\n"
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._last_write = time.monotonic()
+            self._records += 1
+            if self._records >= self.max_records:
+                self._compact(line)
+            return True
+
+    def mark_done(self, plan_hash: str) -> None:
+        self.save({"plan_hash": plan_hash, "done": True}, force=True)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Último registro válido (una línea final a medio escribir se ignora)."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                # basta con leer la cola del fichero
+                f.seek(max(0, size - 64 * 1024))
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return None
+        for raw in reversed(lines):
+            try:
+                return json.loads(raw)
+            except ValueError:
+                continue
+        return None
+
+    def resume_state(self, plan_hash: str) -> Optional[Dict[str, Any]]:
+        """Estado a reanudar para este plan, o None si no hay o ya terminó."""
+        record = self.load()
+        if not record or record.get("plan_hash") != plan_hash or record.get("done"):
+            return None
+        return record
+
+    def _recover(self) -> int:
+        """Cuenta los registros del fichero y recorta una última línea a medio escribir."""
+        try:
+            with open(self.path, "r+b") as f:
+                records, complete = 0, 0
+                for chunk in iter(lambda: f.read(1 << 16), b""):
+                    records += chunk.count(b"\n")
+                    newline = chunk.rfind(b"\n")
+                    if newline >= 0:
+                        complete = f.tell() - len(chunk) + newline + 1
+                if f.tell() != complete:
+                    # sin recortarla, el siguiente registro quedaría pegado a ella
+                    f.truncate(complete)
+                return records
+        except FileNotFoundError:
+            return 0
+
+    def _compact(self, last_line: str) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(last_line)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._records = 1
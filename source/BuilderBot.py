@@ -7,17 +7,45 @@ from .Message import Message
 from .MessageBus import MessageBus
 from dataclasses import asdict
 import random
+import numpy as np
+from .site_finder import find_sites, find_sites_in_store
+from .TileIndex import TileIndex
+from .plan_compiler import compile_plan
+from .world_diff import diff_plan
+from .BuildCheckpoint import plan_hash
+from .BillOfMaterials import bom_for_plan
+from .RecipeResolver import RecipeResolver
 
 class BuilderBot(BaseAgent):
-    def __init__(self, mc, name, start_pos: Vec3, agent_id: int, bus: MessageBus, build_plan, tick_time=0.05):
-        super().__init__(mc, "BuilderBot", start_pos, agent_id, bus, tick_time=tick_time)
+    def __init__(self, mc, name, start_pos: Vec3, agent_id: int, bus: MessageBus, build_plan, tick_time=0.05,
+                 writer=None, blocks_per_tick: int = 1, cache=None, heightmaps=None, compile_plans: bool = False,
+                 diff_build: bool = False, checkpoint=None, resolver: RecipeResolver = None,
+                 sites_per_map: int = 3):
+        super().__init__(mc, "BuilderBot", start_pos, agent_id, bus, tick_time=tick_time, writer=writer,
+                         cache=cache)
+        self.blocks_per_tick = blocks_per_tick  # con BlockWriter conviene colocar muchos por tick
         self.build_plan = list(build_plan)
+        self.work_plan = self.build_plan  # lo que queda por colocar en la construcción actual
         self.index = 0
-        self.map_database = {}
+        self.map_database = TileIndex()  # mapas recibidos, por esquina (x0, z0)
         self.aviable_sites = []
+        self._site_keys = set()  # (x, z) de los sitios ya guardados
+        self.sites_per_map = sites_per_map  # solo los más planos de cada mapa, sin solaparse
         self.bom = {}
+        self.materials = None  # BillOfMaterials del build_plan actual, se calcula al pedirlo
+        self.resolver = resolver or RecipeResolver()  # bloques fabricados -> materiales a picar
+        self.mining_costs = None  # id -> coste estimado de picarlo; None = minimizar bloques
         self.inventory = {}
         self.construction_going = False
+        self.heightmaps = heightmaps  # HeightmapStore donde escribe el ExplorerBot
+        self.compile_plans = compile_plans  # construir con cuboides setBlocks en vez de bloque a bloque
+        self.compiled = None
+        self.cmd_index = 0
+        self.diff_build = diff_build  # colocar solo lo que no está ya en el mundo
+        self.checkpoint = checkpoint  # BuildCheckpoint para reanudar tras un reinicio
+        self._plan_hash = None
+        self.current_site = None
+        self.register_handler("map.v", self._on_map_message)
 
 
     def perceive(self):
@@ -29,7 +57,7 @@ class BuilderBot(BaseAgent):
         has_sites = len(self.aviable_sites) > 0
         
         # 3. Verificar si ya terminamos el plan actual
-        plan_completed = self.index >= len(self.build_plan)
+        plan_completed = self.index >= self.plan_size()
         
         # 4. Verificar si estamos en medio de una construcción
         currently_building = self.construction_going
@@ -44,7 +72,7 @@ class BuilderBot(BaseAgent):
             "plan_completed": plan_completed,
             "construction_going": currently_building,
             "current_index": self.index,
-            "total_blocks": len(self.build_plan)
+            "total_blocks": self.plan_size()
         }
 
     def decide(self, obs):
@@ -56,8 +84,8 @@ class BuilderBot(BaseAgent):
             self.send_material_request()
             return {"action": "REQUEST_MATERIALS"}
         
-        # Si no tenemos sitios, esperar exploración
-        if not obs["has_sites"]:
+        # Si no tenemos sitios, esperar exploración (una construcción reanudada ya tiene el suyo)
+        if not obs["has_sites"] and not obs["construction_going"]:
             print(f"[{self.name}] decide -> Esperando sitios disponibles...")
             return {"action": "WAIT_FOR_SITES"}
         
@@ -71,16 +99,25 @@ class BuilderBot(BaseAgent):
                 print(f"[{self.name}] decide -> Sitio seleccionado: {self.current_site}")
                 # Resetear índice para nueva construcción
                 self.index = 0
+                self.cmd_index = 0
+                self.prepare_work_plan(self.current_site)
+                self.save_checkpoint(force=True)
                 return {"action": "START_CONSTRUCTION", "site": self.current_site}
             else:
                 return {"action": "WAIT_FOR_SITES"}
         
         # Si estamos construyendo y no hemos terminado
         if obs["construction_going"] and not obs["plan_completed"]:
-            # Obtener la siguiente acción del plan
-            next_action = self.build_plan[self.index]
-            print(f"[{self.name}] decide -> Próximo bloque: {self.index}/{len(self.build_plan)}")
-            return {"action": "PLACE_BLOCK", "block_data": next_action, "site": self.current_site}
+            if self.compiled is not None:
+                # Siguientes cuboides del plan compilado
+                next_commands = self.compiled.commands[self.cmd_index:self.cmd_index + self.blocks_per_tick]
+                print(f"[{self.name}] decide -> Próximo cuboide: {self.cmd_index}/{self.compiled.command_count}")
+                return {"action": "PLACE_CUBOIDS", "commands": next_commands, "site": self.current_site}
+            
+            # Obtener los siguientes bloques del plan
+            next_blocks = self.work_plan[self.index:self.index + self.blocks_per_tick]
+            print(f"[{self.name}] decide -> Próximo bloque: {self.index}/{len(self.work_plan)}")
+            return {"action": "PLACE_BLOCK", "blocks": next_blocks, "site": self.current_site}
         
         # Si terminamos la construcción
         if obs["construction_going"] and obs["plan_completed"]:
@@ -99,32 +136,52 @@ class BuilderBot(BaseAgent):
         action_type = decision.get("action", "WAIT")
         
         if action_type == "PLACE_BLOCK":
-            block_data = decision["block_data"]
             site = decision.get("site", self.current_site)
             
-            offset = block_data["offset"]
-            block_id = block_data["id"]
-            data = block_data.get("data", 0)
+            for block_data in decision["blocks"]:
+                offset = block_data["offset"]
+                block_id = block_data["id"]
+                data = block_data.get("data", 0)
+                
+                # Calcular posición absoluta (sitio + offset relativo)
+                abs_pos = Vec3(
+                    site.x + offset.x,
+                    site.y + offset.y,
+                    site.z + offset.z
+                )
+                
+                print(f"[{self.name}] act -> Colocando bloque ID {block_id} en {abs_pos}")
+                
+                # Colocar el bloque (agrupado por el BlockWriter si lo hay)
+                self.write_block(abs_pos.x, abs_pos.y, abs_pos.z, block_id, data)
             
-            # Calcular posición absoluta (sitio + offset relativo)
-            abs_pos = Vec3(
-                site.x + offset.x,
-                site.y + offset.y,
-                site.z + offset.z
-            )
+            # Actualizar progreso
+            previous = self.index
+            self.index += len(decision["blocks"])
             
-            print(f"[{self.name}] act -> Colocando bloque ID {block_id} en {abs_pos}")
-            print(f"  Offset: {offset}, Sitio base: {site}")
+            # Enviar progreso cada 5 bloques
+            if self.index // 5 != previous // 5:
+                self.send_build_progress(self.index, len(self.work_plan), site)
+            self.save_checkpoint()
             
-            # Colocar el bloque (descomentar para acción real)
-            # self.mc.setBlock(abs_pos.x, abs_pos.y, abs_pos.z, block_id, data)
+        elif action_type == "PLACE_CUBOIDS":
+            site = decision.get("site", self.current_site)
             
-            # Actualizar progreso
-            self.index += 1
+            previous = self.index
+            for x0, y0, z0, x1, y1, z1, block_id, data in decision["commands"]:
+                print(f"[{self.name}] act -> Colocando cuboide ID {block_id} en "
+                      f"({x0},{y0},{z0})-({x1},{y1},{z1}) + {site}")
+                self.write_cuboid(
+                    site.x + x0, site.y + y0, site.z + z0,
+                    site.x + x1, site.y + y1, site.z + z1,
+                    block_id, data
+                )
+                self.index += (x1 - x0 + 1) * (y1 - y0 + 1) * (z1 - z0 + 1)
+            self.cmd_index += len(decision["commands"])
             
-            # Enviar progreso cada 5 bloques
-            if self.index % 5 == 0:
-                self.send_build_progress(self.index, len(self.build_plan), site)
+            if self.index // 5 != previous // 5:
+                self.send_build_progress(self.index, self.plan_size(), site)
+            self.save_checkpoint()
             
         elif action_type == "START_CONSTRUCTION":
             site = decision.get("site")
@@ -134,6 +191,13 @@ class BuilderBot(BaseAgent):
             
         elif action_type == "CONSTRUCTION_COMPLETE":
             print(f"[{self.name}] act -> Construcción finalizada")
+            if self.writer is not None:
+                self.writer.flush()
+            if self.diff_build:
+                repaired = self.verify_and_repair(self.current_site)
+                print(f"[{self.name}] act -> Verificación: {repaired} bloques reparados")
+            if self.checkpoint is not None:
+                self.checkpoint.mark_done(self.plan_hash())
             self.current_site = None
             
         elif action_type == "REQUEST_MATERIALS":
@@ -151,9 +215,15 @@ class BuilderBot(BaseAgent):
     def build_message(self, x: int,z: int,
     ) -> Message:
 
+        missing = self.missing_materials()
+        resolution = self.resolver.optimize(missing, self.mining_costs)
         payload = {
-            self.get_inventory()
+            "requirements": resolution.minable(),
+            "crafts": dict(resolution.crafts),
+            "bom": missing,
         }
+        if resolution.unresolved():
+            print(f"[{self.name}] Sin receta ni mena para: {resolution.unresolved()}")
 
         return super().build_message(
             payload=payload,
@@ -162,56 +232,195 @@ class BuilderBot(BaseAgent):
             target="MinerBot"
         )
     
-    def get_inventory(self):
-        all_ids = list(map(lambda b: b["id"], self.build_plan))
-        unique_ids = list(set(all_ids))
-        counts = list(
-            map(
-                lambda block_id: (
-                    block_id,
-                    len(list(filter(lambda b: b["id"] == block_id, self.build_plan)))
-                ),
-                unique_ids
-            )
-        )
-        self.bom = counts
-        return counts
+    def get_inventory(self) -> dict:
+        """Bloques necesarios por id (los totales por (id, data) están en self.materials)"""
+        if self.materials is None:
+            self.materials = bom_for_plan(self.build_plan, self.plan_hash())
+        self.bom = dict(self.materials.by_id)
+        return self.bom
+
+    def missing_materials(self) -> dict:
+        """Lo que falta del BOM con el inventario actual, por id"""
+        missing = {}
+        for block_id, required in self.get_inventory().items():
+            lacking = required - self.inventory.get(block_id, 0)
+            if lacking > 0:
+                missing[block_id] = lacking
+        return missing
+
+    def send_material_request(self) -> None:
+        """Pide al MinerBot los materiales en bruto que cubren lo que falta del plan"""
+        self.send_message(self.build_message(0, 0))
+
+    def patch_plan(self, add: list, remove: list) -> None:
+        """Cambia celdas del plan y ajusta el BOM sin recontarlo entero"""
+        key = lambda e: (int(e["offset"].x), int(e["offset"].y), int(e["offset"].z))
+        touched = {key(e) for e in remove} | {key(e) for e in add}
+        kept, dropped = [], {}
+        for entry in self.build_plan:
+            if key(entry) in touched:
+                dropped[key(entry)] = entry  # la última entrada de la celda es la que cuenta
+            else:
+                kept.append(entry)
+        added = list({key(e): e for e in add}.values())
+        self.build_plan = kept + added
+        self._plan_hash = None
+        if self.materials is not None:
+            self.materials.apply(dropped.values(), added)
+            self.bom = dict(self.materials.by_id)
     
         #mensajes
-    def handle_priv_message(self, msg_dict: dict) -> None:
-        msg_type = str(msg_dict.get("type", ""))
+    def _on_map_message(self, msg_dict: dict) -> None:
+        print(f"[{self.name}] Received map from ExplorerBot")
+        payload = dict(msg_dict.get("payload", {}))
         
-        if msg_type.startswith("map.v"):
-            print(f"[{self.name}] Received map from ExplorerBot")
-            payload = dict(msg_dict.get("payload", {}))
-            
-            center = payload.get("center", Vec3())
-            map_key = center.x + center.y + center.z
-            
-            # Guardar TODO el mapa
-            heights = payload.get("heights", {})
-            print(f"map received: \n{heights}")
-            self.map_database[map_key] = payload.get("heights", {})
-            
-            # Guardar también las regiones planas por separado
-            if(self.poca_diferencia(
-                list(
-                    map(
-                        lambda row: Vec3(center.x + row[0], row[1], center.z + row[2]),
-                        payload.get("heights", [])
-                    )
-                ),
-                max_diff=2
-            )):
-                self.aviable_sites.append(center)
-            
-            print(f"[{self.name}] Map saved to database. Key: {map_key}")
-            print(f"[{self.name}] Available sites: {len(self.aviable_sites)}")
+        center = payload.get("center", Vec3())
+        
+        # Guardar TODO el mapa, indexado por su esquina
+        heights = self._map_heights(payload)
+        print(f"map received: \n{heights}")
+        origin = payload.get("origin", (center.x - heights.shape[0] // 2, center.z - heights.shape[1] // 2))
+        map_key = self.map_database.insert(origin[0], origin[1], heights).key
+        
+        # Guardar también los mejores sitios donde cabe la construcción
+        for site in self.sites_in(heights, origin, limit=self.sites_per_map):
+            self.add_site(site)
+        
+        print(f"[{self.name}] Map saved to database. Key: {map_key}")
+        print(f"[{self.name}] Available sites: {len(self.aviable_sites)}")
 
     
-    def poca_diferencia(self, heights: list[Vec3], max_diff: int) -> bool:
-        ys = list(map(lambda v: v.y, heights))   
-        return (max(ys) - min(ys)) <= max_diff
+    def _map_heights(self, payload: dict) -> np.ndarray:
+        """Alturas de un mensaje de mapa: del propio mensaje o del almacén compartido."""
+        if "heights" in payload:
+            return np.asarray(payload["heights"], dtype=np.int16)
+        x0, z0 = payload["origin"]
+        width, length = payload["size"]
+        return self.heightmaps.read(x0, z0, width, length)
+
+    def plan_size(self) -> int:
+        """Bloques a colocar en la construcción actual"""
+        if self.compiled is not None:
+            return self.compiled.block_count
+        return len(self.work_plan)
+
+    def prepare_work_plan(self, site: Vec3) -> None:
+        """Calcula lo que hay que colocar en site (diff y compilación según la configuración)"""
+        if self.diff_build:
+            self.work_plan = diff_plan(self.mc, site, self.build_plan)
+            print(f"[{self.name}] {len(self.work_plan)}/{len(self.build_plan)} bloques difieren del mundo")
+        else:
+            self.work_plan = self.build_plan
+        self.compiled = None
+        if self.compile_plans:
+            self.compiled = compile_plan(self.work_plan)
+            print(f"[{self.name}] Plan compilado: {self.compiled.report()}")
+
+    def plan_hash(self) -> str:
+        if self._plan_hash is None:
+            self._plan_hash = plan_hash(self.build_plan)
+        return self._plan_hash
+
+    def save_checkpoint(self, force: bool = False) -> None:
+        """Guarda cursor, sitio, hash del plan e inventario (como mucho cada checkpoint.interval)"""
+        if self.checkpoint is None or self.current_site is None:
+            return
+        if not (force or self.checkpoint.due()):
+            return
+        # lo que el checkpoint da por colocado tiene que haber salido ya hacia el servidor
+        if self.writer is not None:
+            self.writer.flush()
+        site = self.current_site
+        self.checkpoint.save({
+            "plan_hash": self.plan_hash(),
+            "site": [site.x, site.y, site.z],
+            "index": self.index,
+            "cmd_index": self.cmd_index,
+            "diff_build": self.diff_build,
+            "compile_plans": self.compile_plans,
+            "inventory": {str(k): v for k, v in self.inventory.items()},
+        }, force=True)
+
+    def on_start(self) -> None:
+        # reanudar puede leer el mundo (diff): se hace con la conexión del propio hilo
+        if self.checkpoint is not None:
+            self.resume_from_checkpoint()
+
+    def resume_from_checkpoint(self) -> bool:
+        """Retoma una construcción a medias del mismo plan sin volver a colocar lo ya hecho"""
+        state = self.checkpoint.resume_state(self.plan_hash())
+        if state is None:
+            return False
+        self.current_site = Vec3(*state["site"])
+        self.inventory = {int(k) if k.isdigit() else k: v for k, v in state["inventory"].items()}
+        self.prepare_work_plan(self.current_site)
+        if self.diff_build:
+            # el diff ya descarta lo colocado: se empieza desde el principio de lo que falta
+            self.index = self.cmd_index = 0
+        elif state.get("compile_plans") == self.compile_plans:
+            self.index = state["index"]
+            self.cmd_index = state["cmd_index"]
+        else:
+            # el cursor no es trasladable entre modos: se recalcula con un diff
+            self.work_plan = diff_plan(self.mc, self.current_site, self.build_plan)
+            self.compiled = compile_plan(self.work_plan) if self.compile_plans else None
+            self.index = self.cmd_index = 0
+        self.construction_going = True
+        self.set_state(BotState.RUNNING)
+        print(f"[{self.name}] Reanudando construcción en {self.current_site} desde {self.index}/{self.plan_size()}")
+        return True
+
+    def verify_and_repair(self, site: Vec3) -> int:
+        """Compara el plan con el mundo y vuelve a colocar lo que falte o difiera"""
+        missing = diff_plan(self.mc, site, self.build_plan)
+        if self.compile_plans:
+            for x0, y0, z0, x1, y1, z1, block_id, data in compile_plan(missing).commands:
+                self.write_cuboid(site.x + x0, site.y + y0, site.z + z0,
+                                  site.x + x1, site.y + y1, site.z + z1, block_id, data)
+        else:
+            for entry in missing:
+                offset = entry["offset"]
+                self.write_block(site.x + offset.x, site.y + offset.y, site.z + offset.z,
+                                 entry["id"], entry["data"])
+        if self.writer is not None:
+            self.writer.flush()
+        return len(missing)
+
+    def footprint(self) -> tuple:
+        """(min_dx, min_dy, min_dz, ancho, largo) de los offsets del plan"""
+        if not self.build_plan:
+            return (0, 0, 0, 1, 1)
+        xs = [b["offset"].x for b in self.build_plan]
+        ys = [b["offset"].y for b in self.build_plan]
+        zs = [b["offset"].z for b in self.build_plan]
+        return (min(xs), min(ys), min(zs), max(xs) - min(xs) + 1, max(zs) - min(zs) + 1)
+
+    def sites_in(self, heights: np.ndarray, origin, tolerance: int = 2, limit=None) -> list[Vec3]:
+        """Sitios de un mapa donde la huella del plan queda sobre terreno casi plano"""
+        dx, dy, dz, width, length = self.footprint()
+        return [
+            Vec3(x - dx, y - dy, z - dz)
+            for x, y, z in find_sites(heights, width, length, tolerance, origin, limit)
+        ]
+
+    def add_site(self, site: Vec3) -> bool:
+        """Guarda un sitio si no hay ya otro en la misma columna (mapas que se solapan)"""
+        key = (site.x, site.z)
+        if key in self._site_keys:
+            return False
+        self._site_keys.add(key)
+        self.aviable_sites.append(site)
+        return True
+
+    def sites_from_store(self, tolerance: int = 2) -> list[Vec3]:
+        """Igual que sites_in pero sobre todo el HeightmapStore"""
+        if self.heightmaps is None:
+            return []
+        dx, dy, dz, width, length = self.footprint()
+        return [
+            Vec3(x - dx, y - dy, z - dz)
+            for x, y, z in find_sites_in_store(self.heightmaps, width, length, tolerance)
+        ]
     
 
     def _handle_priv_command(self, command: str, payload: dict):
@@ -227,10 +436,19 @@ class BuilderBot(BaseAgent):
                     print("plan list:")
                 elif len(parts) >= 4 and parts[2] == "set":
                     template = parts[3]
-                    self.build_plan = payload.get("plan", [])
-                    print(f"plan set to: {template} with plan: {self.build_plan}")  
+                    if "plan" in payload:
+                        self.build_plan = payload["plan"]
+                        self.materials = None
+                    else:
+                        # cambio parcial: {"add": [...], "remove": [...]} por offset
+                        self.patch_plan(payload.get("add", []), payload.get("remove", []))
+                    self.work_plan = self.build_plan
+                    self.compiled = None
+                    self._plan_hash = None
+                    print(f"plan set to: {template} with {len(self.build_plan)} blocks")  
         elif command == "bom":
-                print(f"bom: {self.bom}\n")
+                self.get_inventory()
+                print(f"bom: {self.bom}\nbom por (id, data): {self.materials.by_block}\n")
         elif command == "build":
                 self.set_state(BotState.RUNNING) #contruir aunk no se tengn los materiales
         else:
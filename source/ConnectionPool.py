@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from mcpi.connection import RequestError
+from mcpi.minecraft import Minecraft
+
+
+class PoolExhausted(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Pool de conexiones a Minecraft: cada hilo usa su propio socket.
+
+    connection() devuelve la conexión asociada al hilo actual (la crea o la toma
+    del pool la primera vez); lease() presta una solo durante un bloque with.
+    """
+
+    def __init__(
+        self,
+        address: str = "localhost",
+        port: int = 4711,
+        size: int = 8,
+        timeout: Optional[float] = 5.0,
+        health_interval: float = 30.0,
+        factory: Optional[Callable[[], Minecraft]] = None,
+    ):
+        self.address = address
+        self.port = port
+        self.size = size
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self._factory = factory or (lambda: Minecraft.create(self.address, self.port))
+        self._cond = threading.Condition()
+        self._idle: List[tuple[Minecraft, float]] = []   # (conexión, instante en que quedó libre)
+        self._created = 0
+        self._local = threading.local()
+        self._closed = False
+
+    # ---------- préstamo ----------
+
+    def acquire(self, timeout: Optional[float] = None) -> Minecraft:
+        timeout = self.timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                mc = None
+                while True:
+                    if self._closed:
+                        raise PoolExhausted("pool cerrado")
+                    if self._idle:
+                        mc, since = self._idle.pop()
+                        if time.monotonic() - since < self.health_interval:
+                            return mc
+                        break
+                    if self._created < self.size:
+                        self._created += 1
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise PoolExhausted(f"sin conexiones libres ({self.size} en uso)")
+                    self._cond.wait(remaining)
+            if mc is None:
+                break
+            # el ping va fuera del lock: una conexión colgada no bloquea al resto del pool
+            if self.check(mc):
+                return mc
+            with self._cond:
+                self._discard_locked(mc)
+                self._cond.notify()
+        # abrir el socket fuera del lock
+        try:
+            return self._factory()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, mc: Minecraft, broken: bool = False) -> None:
+        with self._cond:
+            if broken or self._closed:
+                self._discard_locked(mc)
+            else:
+                self._idle.append((mc, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        mc = self.acquire(timeout)
+        broken = False
+        try:
+            yield mc
+        except (OSError, RequestError):
+            broken = True
+            raise
+        finally:
+            self.release(mc, broken)
+
+    # ---------- conexión por hilo ----------
+
+    def connection(self) -> Minecraft:
+        mc = getattr(self._local, "mc", None)
+        if mc is None:
+            mc = self.acquire()
+            self._local.mc = mc
+        return mc
+
+    def release_thread(self) -> None:
+        mc = getattr(self._local, "mc", None)
+        if mc is not None:
+            self._local.mc = None
+            self.release(mc)
+
+    def client(self) -> "PooledMinecraft":
+        return PooledMinecraft(self)
+
+    # ---------- salud ----------
+
+    def check(self, mc: Minecraft) -> bool:
+        """Ping barato: una petición con respuesta sobre el socket."""
+        try:
+            mc.getHeight(0, 0)
+            return True
+        except (OSError, RequestError, ValueError):
+            return False
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"size": self.size, "created": self._created, "idle": len(self._idle)}
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            for mc, _ in self._idle:
+                self._discard_locked(mc)
+            self._idle.clear()
+            self._cond.notify_all()
+
+    def _discard_locked(self, mc: Minecraft) -> None:
+        self._created -= 1
+        try:
+            mc.conn.socket.close()
+        except (AttributeError, OSError):
+            pass
+
+
+class PooledMinecraft:
+    """Sustituto de Minecraft para los agentes: cada hilo habla por su propia
+    conexión del pool, así las respuestas no se cruzan entre hilos."""
+
+    def __init__(self, pool: ConnectionPool):
+        self._pool = pool
+
+    def __getattr__(self, name):
+        return getattr(self._pool.connection(), name)
+
+    def release_thread(self) -> None:
+        self._pool.release_thread()
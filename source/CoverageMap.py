@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+import numpy as np
+
+CHUNK_BITS = 32                          # columnas por lado de cada chunk
+CHUNK_BYTES = CHUNK_BITS * CHUNK_BITS // 8
+
+
+def _popcount(chunk: bytes) -> int:
+    return bin(int.from_bytes(chunk, "little")).count("1")
+
+
+class CoverageMap:
+    """Conjunto disperso de columnas (x, z) visitadas, en bitmaps por chunk.
+
+    Cada chunk de 32x32 columnas ocupa 128 bytes, así que un millón de
+    columnas contiguas cabe en unos cientos de KB. Con más de max_chunks
+    chunks se olvidan los menos usados (LRU): la memoria queda acotada y lo
+    único que se pierde es que esas columnas vuelven a parecer nuevas.
+    """
+
+    def __init__(self, max_chunks: int = 1 << 16):
+        self.max_chunks = max_chunks
+        self._chunks: "OrderedDict[Tuple[int, int], bytearray]" = OrderedDict()
+        self._count = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    @staticmethod
+    def _locate(x: int, z: int) -> Tuple[Tuple[int, int], int, int]:
+        cx, bx = divmod(int(x), CHUNK_BITS)
+        cz, bz = divmod(int(z), CHUNK_BITS)
+        bit = bx * CHUNK_BITS + bz
+        return (cx, cz), bit >> 3, 1 << (bit & 7)
+
+    def _chunk(self, key: Tuple[int, int]) -> bytearray:
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            chunk = self._chunks[key] = bytearray(CHUNK_BYTES)
+            while len(self._chunks) > self.max_chunks:
+                _, old = self._chunks.popitem(last=False)
+                self._count -= _popcount(old)
+                self.evictions += 1
+        else:
+            self._chunks.move_to_end(key)
+        return chunk
+
+    def test(self, x: int, z: int) -> bool:
+        key, byte, mask = self._locate(x, z)
+        with self._lock:
+            chunk = self._chunks.get(key)
+            return chunk is not None and bool(chunk[byte] & mask)
+
+    def __contains__(self, pos) -> bool:
+        return self.test(pos[0], pos[1])
+
+    def test_and_set(self, x: int, z: int) -> bool:
+        """Marca (x, z) y devuelve si ya estaba marcada."""
+        key, byte, mask = self._locate(x, z)
+        with self._lock:
+            chunk = self._chunk(key)
+            if chunk[byte] & mask:
+                return True
+            chunk[byte] |= mask
+            self._count += 1
+            return False
+
+    def add_rect(self, x0: int, z0: int, width: int, length: int) -> None:
+        """Marca el rectángulo [x0, x0 + width) x [z0, z0 + length)."""
+        x1, z1 = x0 + width, z0 + length
+        with self._lock:
+            for cx in range(x0 // CHUNK_BITS, (x1 - 1) // CHUNK_BITS + 1):
+                for cz in range(z0 // CHUNK_BITS, (z1 - 1) // CHUNK_BITS + 1):
+                    chunk = self._chunk((cx, cz))
+                    before = _popcount(chunk)
+                    bits = np.unpackbits(np.frombuffer(chunk, dtype=np.uint8), bitorder="little")
+                    bits = bits.reshape(CHUNK_BITS, CHUNK_BITS)
+                    bx0, bz0 = max(x0 - cx * CHUNK_BITS, 0), max(z0 - cz * CHUNK_BITS, 0)
+                    bx1, bz1 = min(x1 - cx * CHUNK_BITS, CHUNK_BITS), min(z1 - cz * CHUNK_BITS, CHUNK_BITS)
+                    bits[bx0:bx1, bz0:bz1] = 1
+                    chunk[:] = np.packbits(bits.reshape(-1), bitorder="little").tobytes()
+                    self._count += _popcount(chunk) - before
+
+    def __len__(self) -> int:
+        """Columnas marcadas (sin contar las de chunks expulsados)."""
+        return self._count
+
+    def memory_bytes(self) -> int:
+        return len(self._chunks) * CHUNK_BYTES
+
+    def clear(self) -> None:
+        with self._lock:
+            self._chunks.clear()
+            self._count = 0
+
+    # ---------- persistencia ----------
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            keys = np.array(list(self._chunks), dtype=np.int32).reshape(-1, 2)
+            bits = np.frombuffer(b"".join(self._chunks.values()), dtype=np.uint8).reshape(-1, CHUNK_BYTES)
+        np.savez_compressed(path, keys=keys, bits=bits, chunk=CHUNK_BITS)
+
+    @classmethod
+    def load(cls, path: str, max_chunks: int = 1 << 16) -> "CoverageMap":
+        data = np.load(path)
+        if int(data["chunk"]) != CHUNK_BITS:
+            raise ValueError(f"{path}: chunks de {int(data['chunk'])} columnas, se esperaban {CHUNK_BITS}")
+        coverage = cls(max_chunks=max_chunks)
+        for (cx, cz), bits in zip(data["keys"].tolist(), data["bits"]):
+            coverage._chunks[(cx, cz)] = bytearray(bits.tobytes())
+            coverage._count += _popcount(coverage._chunks[(cx, cz)])
+        return coverage
@@ -8,16 +8,22 @@ import random
 from .Message import Message
 from datetime import datetime, timezone
 from .MessageBus import MessageBus
+from .CoverageMap import CoverageMap
+import numpy as np
 
 class ExplorerBot(BaseAgent):
-    def __init__(self, mc: Minecraft, start_pos: Vec3, agent_id: int, bus: MessageBus, stepp=5, radius=50):
-        super().__init__(mc, "ExplorerBot", start_pos, agent_id, bus)
+    def __init__(self, mc: Minecraft, start_pos: Vec3, agent_id: int, bus: MessageBus, stepp=5, radius=50,
+                 cache=None, heightmaps=None, coverage=None):
+        super().__init__(mc, "ExplorerBot", start_pos, agent_id, bus, cache=cache)
         self.stepp = stepp
         self.start_pos = start_pos
         self.radius = radius
         self.mapas = 0
         self.visited_starts = []
+        self.coverage = coverage if coverage is not None else CoverageMap()  # columnas ya escaneadas
         self.min_dist = self.radius
+        self._heights = None  # buffer int16 reutilizado entre escaneos
+        self.heightmaps = heightmaps  # HeightmapStore compartido con el BuilderBot
         # Añadir timer para envío periódico
         self.last_map_sent = 0
         self.map_interval = 5  # Enviar mapa cada 5 ciclos
@@ -27,29 +33,27 @@ class ExplorerBot(BaseAgent):
         """Observa el terreno alrededor de la posición actual"""
         print(f"[{self.name}] Explorando área alrededor de {self.start_pos}")
         
-        start_point = Vec3(self.start_pos.x - self.radius, 0, self.start_pos.z - self.radius)
-        heights = []
+        lado = self.radius * 2
+        if self._heights is None or self._heights.shape != (lado, lado):
+            self._heights = np.empty((lado, lado), dtype=np.int16)
+        
+        # Escanear área cuadrada: heights[i, j] = altura en (x0 + i, z0 + j)
+        x0 = self.start_pos.x - self.radius
+        z0 = self.start_pos.z - self.radius
+        heights = self.read_heights(x0, z0, lado, lado, out=self._heights)
         
-        # Escanear área cuadrada
-        for i in range(self.radius * 2):
-            for j in range(self.radius * 2):
-                x = start_point.x + i
-                z = start_point.z + j
-                h = self.mc.getHeight(x, z)
-                
-                # Marcar visualmente el área explorada (opcional)
-                # self.mc.setBlock(x, int(h), z, 89)  # Luz de glowstone
-                
-                heights.append(Vec3(x, h, z))
+        # Persistir el escaneo en el almacén de alturas
+        if self.heightmaps is not None:
+            self.heightmaps.write(x0, z0, heights)
         
-        # Guardar esta posición como explorada
+        # Guardar esta posición y el área escaneada como explorada
         self.visited_starts.append(self.start_pos)
+        self.coverage.add_rect(x0, z0, lado, lado)
         
         # Calcular estadísticas del terreno
-        ys = [v.y for v in heights]
-        min_height = min(ys)
-        max_height = max(ys)
-        avg_height = sum(ys) / len(ys)
+        min_height = int(heights.min())
+        max_height = int(heights.max())
+        avg_height = float(heights.mean())
         
         print(f"[{self.name}] Terreno: min={min_height}, max={max_height}, avg={avg_height:.1f}")
         
@@ -151,25 +155,16 @@ class ExplorerBot(BaseAgent):
             time.sleep(1)
     
 
-    def mapa_alturas(self,heights: list[Vec3]):
-        lado = self.radius * 2
-
-        # construir matriz de alturas (lista de listas de int)
-        lines: list[list[int]] = []
-        idx = 0
-        for _ in range(lado):          # fila
-            fila_vals: list[int] = []
-            for _ in range(lado):      # columna
-                v = heights[idx]
-                fila_vals.append(int(v.y))
-                idx += 1
-            lines.append(fila_vals)
-
+    def mapa_alturas(self, heights: np.ndarray):
         # objeto "JSON" listo para json.dumps(...)
         mapa_json = {
-            "heights": lines,
-            "center": self.start_pos
+            "center": self.start_pos,
+            "origin": (self.start_pos.x - self.radius, self.start_pos.z - self.radius),
+            "size": heights.shape,
         }
+        # con almacén compartido el BuilderBot lee las alturas de ahí
+        if self.heightmaps is None:
+            mapa_json["heights"] = heights.tolist()   # matriz fila = x, columna = z
 
         return mapa_json
 
@@ -183,15 +178,8 @@ class ExplorerBot(BaseAgent):
 
             cand = Vec3(base.x + dx, base.y, base.z + dz)
 
-            # comprobar que está lo bastante lejos de todos los ya usados
-            ok = True
-            for s in self.visited_starts:
-                dist2 = (cand.x - s.x) ** 2 + (cand.z - s.z) ** 2
-                if dist2 < (self.min_dist ** 2):
-                    ok = False
-                    break
-
-            if ok:
+            # un candidato dentro de un área ya escaneada no aporta nada nuevo
+            if not self.coverage.test(cand.x, cand.z):
                 return cand
 
         # si no encuentra nada “bueno”, devuelve algo simple (fallback)
@@ -208,121 +196,101 @@ class ExplorerBot(BaseAgent):
             target="BuilderBot"
         )
 
-    def handle_priv_message(self, command, msg_dict):
-        payload = dict(msg_dict.get("payload", {}))
-
-        if command == "start":
-            pos = payload.get("start_pos", Vec3())
-            if pos != None:
-                self.start_pos = Vec3(pos[0], pos[1], pos[2])
-            else:
-                self.start_pos = self.mc.player.getTilePos() + Vec3(20,0,20)
-        elif command == "set range":
-                pos = payload.get("range", self.radius)
-                if pos != None:
-                    self.radius = int(pos)
-                else:
-                    self.radius = int(10)
-                print(f"[{self.name}] Range set to: {self.radius}")
-        else:
-            print(f"[{self.name}] Comando explorer incompleto")
-
-
     # ExplorerBot.py - Añadir al final de la clase
 
-def send_map_update(self, mapa_json, is_flat: bool):
-    """Envía actualización del mapa al BuilderBot"""
-    # Añadir metadata adicional
-    mapa_json["metadata"] = {
-        "is_flat": is_flat,
-        "explorer_id": self.id,
-        "area_number": len(self.visited_starts),
-        "timestamp": datetime.now(timezone.utc).isoformat()
-    }
+    def send_map_update(self, mapa_json, is_flat: bool):
+        """Envía actualización del mapa al BuilderBot"""
+        # Añadir metadata adicional
+        mapa_json["metadata"] = {
+            "is_flat": is_flat,
+            "explorer_id": self.id,
+            "area_number": len(self.visited_starts),
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
     
-    msg = self.build_message(mapa_json)
-    print(f"[{self.name}] Enviando mapa v{self.mapas} al BuilderBot")
-    print(f"  Centro: {mapa_json['center']}, Plano: {is_flat}")
+        msg = self.build_message(mapa_json)
+        print(f"[{self.name}] Enviando mapa v{self.mapas} al BuilderBot")
+        print(f"  Centro: {mapa_json['center']}, Plano: {is_flat}")
     
-    self.send_message(msg)
-    self.mapas += 1
+        self.send_message(msg)
+        self.mapas += 1
 
-def send_movement_update(self, from_pos: Vec3, to_pos: Vec3):
-    """Envía mensaje de movimiento/posición"""
-    msg = super().build_message(
-        payload={
-            "from": {"x": from_pos.x, "y": from_pos.y, "z": from_pos.z},
-            "to": {"x": to_pos.x, "y": to_pos.y, "z": to_pos.z},
-            "distance": self.calculate_distance(from_pos, to_pos),
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        },
-        type="explorer.movement.v1",
-        source=self.name,
-        target="System"  # O podría ser "Logger"
-    )
-    self.send_message(msg)
+    def send_movement_update(self, from_pos: Vec3, to_pos: Vec3):
+        """Envía mensaje de movimiento/posición"""
+        msg = super().build_message(
+            payload={
+                "from": {"x": from_pos.x, "y": from_pos.y, "z": from_pos.z},
+                "to": {"x": to_pos.x, "y": to_pos.y, "z": to_pos.z},
+                "distance": self.calculate_distance(from_pos, to_pos),
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            },
+            type="explorer.movement.v1",
+            source=self.name,
+            target="System"  # O podría ser "Logger"
+        )
+        self.send_message(msg)
 
-def send_exploration_complete_message(self):
-    """Envía mensaje cuando termina la exploración"""
-    msg = super().build_message(
-        payload={
-            "total_areas": len(self.visited_starts),
-            "exploration_radius": self.radius,
-            "visited_positions": [
-                {"x": pos.x, "y": pos.y, "z": pos.z} 
-                for pos in self.visited_starts
-            ],
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        },
-        type="exploration.completed.v1",
-        source=self.name,
-        target="BuilderBot"  # También informar al Builder
-    )
-    self.send_message(msg)
+    def send_exploration_complete_message(self):
+        """Envía mensaje cuando termina la exploración"""
+        msg = super().build_message(
+            payload={
+                "total_areas": len(self.visited_starts),
+                "exploration_radius": self.radius,
+                "visited_positions": [
+                    {"x": pos.x, "y": pos.y, "z": pos.z} 
+                    for pos in self.visited_starts
+                ],
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            },
+            type="exploration.completed.v1",
+            source=self.name,
+            target="BuilderBot"  # También informar al Builder
+        )
+        self.send_message(msg)
 
-def calculate_distance(self, pos1: Vec3, pos2: Vec3) -> float:
-    """Calcula distancia entre dos puntos"""
-    dx = pos2.x - pos1.x
-    dz = pos2.z - pos1.z
-    return (dx**2 + dz**2) ** 0.5
+    def calculate_distance(self, pos1: Vec3, pos2: Vec3) -> float:
+        """Calcula distancia entre dos puntos"""
+        dx = pos2.x - pos1.x
+        dz = pos2.z - pos1.z
+        return (dx**2 + dz**2) ** 0.5
 
-def handle_priv_message(self, msg_dict: dict):  # Corregir firma
-    """Maneja mensajes privados para el ExplorerBot"""
-    payload = dict(msg_dict.get("payload", {}))
+    def handle_priv_message(self, msg_dict: dict):  # Corregir firma
+        """Maneja mensajes privados para el ExplorerBot"""
+        payload = dict(msg_dict.get("payload", {}))
     
-    # Extraer comando del payload
-    command = payload.get("command", "")
+        # Extraer comando del payload
+        command = payload.get("command", "")
     
-    if command == "start":
-        pos = payload.get("start_pos", None)
-        if pos is not None and isinstance(pos, (list, tuple)) and len(pos) >= 3:
-            self.start_pos = Vec3(pos[0], pos[1], pos[2])
-            print(f"[{self.name}] Posición inicial establecida: {self.start_pos}")
+        if command == "start":
+            pos = payload.get("start_pos", None)
+            if pos is not None and isinstance(pos, (list, tuple)) and len(pos) >= 3:
+                self.start_pos = Vec3(pos[0], pos[1], pos[2])
+                print(f"[{self.name}] Posición inicial establecida: {self.start_pos}")
             
-            # Iniciar exploración
-            self.set_state(BotState.RUNNING)
-        else:
-            self.start_pos = self.mc.player.getTilePos() + Vec3(20, 0, 20)
-            print(f"[{self.name}] Usando posición por defecto: {self.start_pos}")
-            self.set_state(BotState.RUNNING)
+                # Iniciar exploración
+                self.set_state(BotState.RUNNING)
+            else:
+                self.start_pos = self.mc.player.getTilePos() + Vec3(20, 0, 20)
+                print(f"[{self.name}] Usando posición por defecto: {self.start_pos}")
+                self.set_state(BotState.RUNNING)
             
-    elif command == "set_range" or command == "set range":
-        new_range = payload.get("range", self.radius)
-        if new_range is not None:
-            self.radius = int(new_range)
-            print(f"[{self.name}] Rango de exploración cambiado a: {self.radius}")
-        else:
-            self.radius = 10
-            print(f"[{self.name}] Rango establecido a valor por defecto: {self.radius}")
+        elif command == "set_range" or command == "set range":
+            new_range = payload.get("range", self.radius)
+            if new_range is not None:
+                self.radius = int(new_range)
+                print(f"[{self.name}] Rango de exploración cambiado a: {self.radius}")
+            else:
+                self.radius = 10
+                print(f"[{self.name}] Rango establecido a valor por defecto: {self.radius}")
         
-    elif command == "status":
-        print(f"[{self.name}] Estado actual:")
-        print(f"  - Posición: {self.start_pos}")
-        print(f"  - Radio: {self.radius}")
-        print(f"  - Áreas exploradas: {len(self.visited_starts)}")
-        print(f"  - Estado: {self.state}")
+        elif command == "status":
+            print(f"[{self.name}] Estado actual:")
+            print(f"  - Posición: {self.start_pos}")
+            print(f"  - Radio: {self.radius}")
+            print(f"  - Áreas exploradas: {len(self.visited_starts)}")
+            print(f"  - Estado: {self.state}")
         
-    else:
-        print(f"[{self.name}] Comando no reconocido: {command}")
-        print(f"  Comandos disponibles: start, set_range, pause, resume, stop, status")
+        else:
+            print(f"[{self.name}] Comando no reconocido: {command}")
+            print(f"  Comandos disponibles: start, set_range, pause, resume, stop, status")
        
\ No newline at end of file
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import glob
+import os
+import re
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+NODATA = np.iinfo(np.int16).min   # columnas aún no exploradas
+_START_RE = re.compile(r"#\s*start=\(\s*(-?\d+)\s*,\s*(-?\d+)\s*,\s*(-?\d+)\s*\)")
+
+
+class HeightmapStore:
+    """Alturas del mundo en disco, en teselas binarias int16 de tile x tile.
+
+    tiles.bin guarda las teselas una tras otra y se abre con memmap; index.bin
+    es una lista de (tx, tz, slot) int32 que se añade al crear cada tesela.
+    Abrir el almacén solo lee el índice, así que cuesta milisegundos aunque el
+    mapa no quepa en memoria.
+    """
+
+    TILES_FILE = "tiles.bin"
+    INDEX_FILE = "index.bin"
+
+    def __init__(self, path: str, tile: int = 64):
+        self.path = path
+        self.tile = tile
+        os.makedirs(path, exist_ok=True)
+        self._tiles_path = os.path.join(path, self.TILES_FILE)
+        self._index_path = os.path.join(path, self.INDEX_FILE)
+        self._lock = threading.RLock()
+
+        self._index: Dict[Tuple[int, int], int] = {}
+        if os.path.exists(self._index_path):
+            entries = np.fromfile(self._index_path, dtype=np.int32).reshape(-1, 3)
+            for tx, tz, slot in entries.tolist():
+                self._index[(tx, tz)] = slot
+
+        self._tiles: Optional[np.memmap] = None
+        self._capacity = 0
+        if os.path.exists(self._tiles_path):
+            self._map(os.path.getsize(self._tiles_path) // self._tile_bytes)
+
+    # ---------- lectura / escritura ----------
+
+    def write(self, x0: int, z0: int, heights: np.ndarray) -> None:
+        """Guarda heights[i, j] como la altura de la columna (x0 + i, z0 + j)."""
+        heights = np.asarray(heights, dtype=np.int16)
+        width, length = heights.shape
+        with self._lock:
+            for tx, tz, sx, sz, tx0, tz0, w, l in self._spans(x0, z0, width, length):
+                tile = self._tile_for_write(tx, tz)
+                tile[tx0:tx0 + w, tz0:tz0 + l] = heights[sx:sx + w, sz:sz + l]
+
+    def read(self, x0: int, z0: int, width: int, length: int) -> np.ndarray:
+        """Rectángulo de alturas; NODATA donde no se ha explorado."""
+        out = np.full((width, length), NODATA, dtype=np.int16)
+        with self._lock:
+            for tx, tz, sx, sz, tx0, tz0, w, l in self._spans(x0, z0, width, length):
+                slot = self._index.get((tx, tz))
+                if slot is not None:
+                    out[sx:sx + w, sz:sz + l] = self._tiles[slot, tx0:tx0 + w, tz0:tz0 + l]
+        return out
+
+    def tile_array(self, tx: int, tz: int) -> Optional[np.ndarray]:
+        slot = self._index.get((tx, tz))
+        return None if slot is None else self._tiles[slot]
+
+    def tiles(self) -> Iterator[Tuple[int, int]]:
+        return iter(list(self._index))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def bounds(self) -> Optional[Tuple[int, int, int, int]]:
+        """(x0, z0, x1, z1) exclusivo que cubre todas las teselas."""
+        if not self._index:
+            return None
+        keys = np.array(list(self._index), dtype=np.int64)
+        (tx0, tz0), (tx1, tz1) = keys.min(axis=0), keys.max(axis=0)
+        return (int(tx0) * self.tile, int(tz0) * self.tile,
+                (int(tx1) + 1) * self.tile, (int(tz1) + 1) * self.tile)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._tiles is not None:
+                self._tiles.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._tiles = None
+
+    # ---------- importación de mapas/alturas_* ----------
+
+    def import_text(self, file_path: str) -> Tuple[int, int, int, int]:
+        """Importa un volcado de texto '# start=(x,y,z)' + filas separadas por comas.
+
+        Cada fila es un x consecutivo y cada columna un z, como en mapa_alturas.
+        Devuelve (x0, z0, ancho, largo).
+        """
+        with open(file_path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        match = _START_RE.match(lines[0]) if lines else None
+        if match is None:
+            raise ValueError(f"{file_path}: falta la cabecera '# start=(x,y,z)'")
+        x0, _, z0 = (int(v) for v in match.groups())
+        rows = [
+            [int(v) for v in line.split(",") if v.strip()]
+            for line in lines[1:]
+            if line.strip()
+        ]
+        heights = np.array(rows, dtype=np.int16)
+        self.write(x0, z0, heights)
+        return (x0, z0, heights.shape[0], heights.shape[1])
+
+    def import_dir(self, directory: str, pattern: str = "alturas_*") -> int:
+        """Importa todos los volcados de directory; devuelve cuántos ha leído."""
+        count = 0
+        for file_path in sorted(glob.glob(os.path.join(directory, pattern))):
+            self.import_text(file_path)
+            count += 1
+        self.flush()
+        return count
+
+    def migrate_dir(self, directory: str, pattern: str = "alturas_*") -> int:
+        """import_dir solo si el almacén está vacío.
+
+        Los volcados de texto son anteriores al almacén: importarlos en cada
+        arranque pisaría alturas más recientes del explorador.
+        """
+        if self._index:
+            return 0
+        return self.import_dir(directory, pattern)
+
+    # ---------- internos ----------
+
+    @property
+    def _tile_bytes(self) -> int:
+        return self.tile * self.tile * np.dtype(np.int16).itemsize
+
+    def _spans(self, x0: int, z0: int, width: int, length: int):
+        """Trocea un rectángulo en los fragmentos que caen en cada tesela."""
+        t = self.tile
+        x0, z0 = int(x0), int(z0)
+        for tx in range(x0 // t, (x0 + width - 1) // t + 1):
+            ax0 = max(x0, tx * t)
+            ax1 = min(x0 + width, (tx + 1) * t)
+            for tz in range(z0 // t, (z0 + length - 1) // t + 1):
+                az0 = max(z0, tz * t)
+                az1 = min(z0 + length, (tz + 1) * t)
+                yield (tx, tz, ax0 - x0, az0 - z0, ax0 - tx * t, az0 - tz * t,
+                       ax1 - ax0, az1 - az0)
+
+    def _map(self, capacity: int) -> None:
+        if capacity <= 0:
+            self._tiles, self._capacity = None, 0
+            return
+        self._tiles = np.memmap(self._tiles_path, dtype=np.int16, mode="r+",
+                                shape=(capacity, self.tile, self.tile))
+        self._capacity = capacity
+
+    def _tile_for_write(self, tx: int, tz: int) -> np.ndarray:
+        slot = self._index.get((tx, tz))
+        if slot is None:
+            slot = len(self._index)
+            if slot >= self._capacity:
+                self._grow(max(16, self._capacity * 2))
+            self._tiles[slot] = NODATA
+            # la tesela llega a disco antes que su entrada en el índice: tras un
+            # corte, una tesela indexada se lee como NODATA y no como ceros
+            self._tiles.flush()
+            with open(self._index_path, "ab") as f:
+                np.array([tx, tz, slot], dtype=np.int32).tofile(f)
+            self._index[(tx, tz)] = slot
+        return self._tiles[slot]
+
+    def _grow(self, capacity: int) -> None:
+        if self._tiles is not None:
+            self._tiles.flush()
+        self._tiles = None
+        with open(self._tiles_path, "ab") as f:
+            f.truncate(capacity * self._tile_bytes)
+        self._map(capacity)
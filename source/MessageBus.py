@@ -1,31 +1,248 @@
 from __future__ import annotations
 
 from collections import deque
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from enum import Enum, auto
+from typing import Any, Dict, Iterable, Optional
 from .Message import Message
+from .PrefixIndex import PrefixIndex
 import collections
+import threading
+import time
+
+
+class OverflowPolicy(Enum):
+    BLOCK = auto()        # publish espera a que haya hueco (o vence su timeout)
+    DROP_OLDEST = auto()  # se descarta el mensaje más antiguo de la cola
+    REJECT = auto()       # se descarta el mensaje nuevo
+
+
+@dataclass
+class QueueStats:
+    published: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    high_water: int = 0
+    dropped_by_type: Dict[str, int] = field(default_factory=dict)
+
+
+def _check_capacity(capacity: int) -> None:
+    if capacity < 1:
+        raise ValueError(f"capacity debe ser >= 1 (recibido {capacity})")
+
 
 class MessageBus:
-    def __init__(self):
+    def __init__(
+        self,
+        capacity: int = 1000,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        block_timeout: Optional[float] = None,
+        protected_types: Iterable[str] = ("control",),
+    ):
+        _check_capacity(capacity)
         self._queues: dict[str, collections.deque[Message]] = {}
+        self._lock = threading.Lock()
+        # target -> condiciones de los hilos que esperan mensajes para ese target
+        self._waiters: dict[str, set[threading.Condition]] = {}
+        # target -> condición para publicadores bloqueados por cola llena
+        self._not_full: dict[str, threading.Condition] = {}
+        self._stats: dict[str, QueueStats] = {}
+        self.capacity = capacity
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        # tipos que DROP_OLDEST nunca expulsa (START/STOP no se pueden perder en silencio)
+        self.protected_types = frozenset(protected_types)
+        self._limits: dict[str, tuple[int, OverflowPolicy]] = {}
+        # target (None = cualquiera) -> índice de prefijos de type -> suscriptores
+        self._subscriptions: dict[Optional[str], PrefixIndex[str]] = {}
+
+    def configure_target(
+        self,
+        target: str,
+        capacity: Optional[int] = None,
+        overflow: Optional[OverflowPolicy] = None,
+    ) -> None:
+        """Fija capacidad y política propias para un target concreto."""
+        if capacity is not None:
+            _check_capacity(capacity)
+        with self._lock:
+            cur_cap, cur_policy = self._limits_locked(target)
+            self._limits[target] = (
+                cur_cap if capacity is None else capacity,
+                cur_policy if overflow is None else overflow,
+            )
+            cond = self._not_full.get(target)
+            if cond is not None:
+                cond.notify_all()
+
+    def subscribe(self, subscriber: str, type_prefix: str = "", target: Optional[str] = None) -> None:
+        """Entrega a la cola de subscriber una copia de los mensajes cuyo type empieza
+        por type_prefix y van dirigidos a target (o a cualquiera si target es None)."""
+        with self._lock:
+            self._subscriptions.setdefault(target, PrefixIndex()).add(type_prefix, subscriber)
+
+    def unsubscribe(self, subscriber: str, type_prefix: str = "", target: Optional[str] = None) -> bool:
+        with self._lock:
+            index = self._subscriptions.get(target)
+            if index is None or not index.remove(type_prefix, subscriber):
+                return False
+            if not len(index):
+                del self._subscriptions[target]
+            return True
+
+    def publish(self, msg: Message) -> bool:
+        """Encola msg para su target y los suscriptores que casen.
+
+        Devuelve False si la política de desbordamiento lo descartó del target directo.
+        """
+        deadline = None if self.block_timeout is None else time.monotonic() + self.block_timeout
+        with self._lock:
+            delivered = self._enqueue_locked(msg.target, msg, deadline)
+            for subscriber in self._subscribers_locked(msg):
+                self._enqueue_locked(subscriber, msg, deadline)
+            return delivered
+
+    def _subscribers_locked(self, msg: Message) -> list[str]:
+        recipients: list[str] = []
+        for key in (msg.target, None):
+            index = self._subscriptions.get(key)
+            if index is None:
+                continue
+            for subscriber in index.match(msg.type):
+                if subscriber != msg.target and subscriber not in recipients:
+                    recipients.append(subscriber)
+        return recipients
+
+    def _enqueue_locked(self, target: str, msg: Message, deadline: Optional[float]) -> bool:
+        q = self._queues.setdefault(target, collections.deque())
+        stats = self._stats.setdefault(target, QueueStats())
+        capacity, policy = self._limits_locked(target)
+
+        while len(q) >= capacity:
+            if policy == OverflowPolicy.DROP_OLDEST:
+                victim = self._oldest_droppable(q)
+                if victim is None:
+                    # cola llena de mensajes protegidos: se rechaza el nuevo
+                    self._count_drop(stats, msg)
+                    return False
+                self._count_drop(stats, q[victim])
+                del q[victim]
+            elif policy == OverflowPolicy.REJECT:
+                self._count_drop(stats, msg)
+                return False
+            else:
+                cond = self._not_full.setdefault(target, threading.Condition(self._lock))
+                if deadline is None:
+                    cond.wait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not cond.wait(remaining):
+                        if len(q) >= capacity:
+                            self._count_drop(stats, msg)
+                            return False
+                capacity, policy = self._limits_locked(target)
 
-    def publish(self, msg: Message) -> None:
-        q = self._queues.setdefault(msg.target, collections.deque())
         q.append(msg)
+        stats.published += 1
+        stats.high_water = max(stats.high_water, len(q))
+        # despertar solo a quien espera este target
+        for cond in self._waiters.get(target, ()):
+            cond.notify()
+        return True
+
+    def _oldest_droppable(self, q: collections.deque[Message]) -> Optional[int]:
+        for i, queued in enumerate(q):
+            if queued.type not in self.protected_types:
+                return i
+        return None
+
+    @staticmethod
+    def _count_drop(stats: QueueStats, msg: Message) -> None:
+        stats.dropped += 1
+        stats.dropped_by_type[msg.type] = stats.dropped_by_type.get(msg.type, 0) + 1
 
     def poll_for(self, target: str) -> Optional[Message]:
+        with self._lock:
+            return self._pop_locked(target)
+
+    def wait_for(self, target: str, timeout: Optional[float] = None) -> Optional[Message]:
+        """Bloquea hasta que llegue un mensaje para target o venza el timeout."""
+        return self.wait_for_any((target,), timeout)
+
+    def wait_for_any(self, targets: Iterable[str], timeout: Optional[float] = None) -> Optional[Message]:
+        """Como wait_for pero despierta con el primer mensaje de cualquiera de los targets."""
+        targets = tuple(targets)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            msg = self._pop_any_locked(targets)
+            if msg is not None:
+                return msg
+
+            cond = threading.Condition(self._lock)
+            for target in targets:
+                self._waiters.setdefault(target, set()).add(cond)
+            try:
+                while True:
+                    if deadline is None:
+                        cond.wait()
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return None
+                        cond.wait(remaining)
+                    msg = self._pop_any_locked(targets)
+                    if msg is not None:
+                        return msg
+            finally:
+                for target in targets:
+                    waiters = self._waiters.get(target)
+                    if waiters is not None:
+                        waiters.discard(cond)
+                        if not waiters:
+                            del self._waiters[target]
+
+    def depth(self, target: str) -> int:
+        with self._lock:
+            q = self._queues.get(target)
+            return len(q) if q else 0
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Contadores por target: profundidad, máximo histórico, descartes..."""
+        with self._lock:
+            result = {}
+            for target, stats in self._stats.items():
+                entry = asdict(stats)
+                entry["depth"] = len(self._queues.get(target, ()))
+                result[target] = entry
+            return result
+
+    def _limits_locked(self, target: str) -> tuple[int, OverflowPolicy]:
+        return self._limits.get(target, (self.capacity, self.overflow))
+
+    def _pop_locked(self, target: str) -> Optional[Message]:
         q = self._queues.get(target)
         if not q:
             return None
-        return q.popleft()
-    
+        msg = q.popleft()
+        self._stats[target].delivered += 1
+        cond = self._not_full.get(target)
+        if cond is not None:
+            cond.notify()
+        return msg
+
+    def _pop_any_locked(self, targets: tuple[str, ...]) -> Optional[Message]:
+        for target in targets:
+            msg = self._pop_locked(target)
+            if msg is not None:
+                return msg
+        return None
+
     def publish_command_message(self, target:str, command:str):
         msg = Message(
-            type="control", 
+            type="control",
             source="System",
             target=target,
             payload=command
         )
-        self.publish(msg)
\ No newline at end of file
+        self.publish(msg)
@@ -8,18 +8,71 @@ import time
 import random
 from .Message import Message
 from .MessageBus import MessageBus
+from .MiningObjectives import MiningObjectives
+from .CoverageMap import CoverageMap
+from .world_reads import RegionReader, read_cuboid
+from .vein_miner import find_veins
+from .BlockWriter import merge_cuboids
+from .ProspectIndex import ProspectIndex
+from .strip_mining import StripMine, next_branch_mine, plan_branch_mine, shell_box, tune_spacing
+import numpy as np
 from datetime import datetime, timezone  # Asegúrate de tener esto
 from typing import Optional  # Añadir también
 
 class MinerBot(BaseAgent):
-    def __init__(self, mc: Minecraft, start_pos: Vec3, id: int, bus: MessageBus, grid_size: int = 5):
-        super().__init__(mc, "MinerBot", start_pos, id, bus)
-        self.objetivos = []
+    def __init__(self, mc: Minecraft, start_pos: Vec3, id: int, bus: MessageBus, grid_size: int = 5, writer=None,
+                 cache=None, coverage: Optional[CoverageMap] = None, column_mining: bool = False,
+                 column_chunk: int = 64, max_depth: int = 384, vein_cube: int = 16,
+                 max_blocks_per_second: Optional[float] = None, strip_y: Optional[int] = None,
+                 strip_spacing: Optional[int] = None, tunnels_per_tick: int = 1,
+                 prospects: Optional[ProspectIndex] = None):
+        super().__init__(mc, "MinerBot", start_pos, id, bus, writer=writer, cache=cache)
+        self.objectives = MiningObjectives()  # objetivos e inventario por id de bloque
         self.modo = 0
-        self.inventario = []
         self.grid_size = grid_size
-        self.pos_visitadas = []
+        self.pos_visitadas = coverage if coverage is not None else CoverageMap()  # columnas (x, z) ya visitadas
         self.mess_count = 0
+        self.column_mining = column_mining  # búsqueda vertical columna a columna en vez de bloque a bloque
+        self.column_chunk = column_chunk  # bloques por lectura al buscar el bedrock
+        self.max_depth = max_depth  # tope de bajada si no aparece bedrock
+        # cubos leídos en bloque para seguir vetas; caducan como la caché compartida
+        self.region = RegionReader(mc, cube=vein_cube, ttl=cache.ttl if cache is not None else 30.0)
+        if cache is not None:
+            # las escrituras de cualquier agente con esta caché llegan también a los cubos
+            cache.add_write_listener(self.region.note_cuboid)
+        self.max_blocks_per_second = max_blocks_per_second  # ritmo de excavación en grid; None = sin límite
+        self._next_face = 0.0
+        self.strip_y = strip_y  # altura de la mina en espina de pez (None = la actual)
+        self.strip_spacing = strip_spacing or tune_spacing()
+        self.tunnels_per_tick = tunnels_per_tick
+        self.strip: Optional[StripMine] = None
+        self.strip_branches = 8  # ramales por cada plan; al acabarlos se planifica el siguiente tramo
+        self._strip_origin = None
+        self._strip_trunk = None
+        self.prospects = prospects  # índice de menas: a dónde ir en lugar de probar al azar
+        self.register_handler("materials.requirements", self._on_materials_request)
+        self.register_handler("materials.requierments", self._on_materials_request)
+
+    def write_block(self, x: int, y: int, z: int, block_id: int, data: int = 0):
+        super().write_block(x, y, z, block_id, data)
+        if self.cache is None:  # con caché, el aviso llega por su listener
+            self.region.note_write(x, y, z, block_id)
+
+    def write_cuboid(self, x0: int, y0: int, z0: int, x1: int, y1: int, z1: int,
+                     block_id: int, data: int = 0):
+        super().write_cuboid(x0, y0, z0, x1, y1, z1, block_id, data)
+        if self.cache is None:
+            self.region.note_cuboid(x0, y0, z0, x1, y1, z1, block_id)
+
+    @property
+    def objetivos(self) -> dict:
+        """id -> cantidad requerida"""
+        return self.objectives.required
+
+    @property
+    def inventario(self) -> dict:
+        """id -> cantidad recogida"""
+        return self.objectives.collected
 
 # MinerBot.py - Modificar estas funciones
 
@@ -32,7 +85,7 @@ class MinerBot(BaseAgent):
         objectives_completed = self.check_objectives_completed()
         
         # 3. Observar el bloque actual debajo del minero
-        current_block = self.mc.getBlock(self.pos.x, self.pos.y, self.pos.z)
+        current_block = self.read_block(self.pos.x, self.pos.y, self.pos.z)
         
         # 4. Verificar si estamos en bedrock (límite inferior)
         at_bedrock = current_block == 7
@@ -92,11 +145,18 @@ class MinerBot(BaseAgent):
         # Decidir estrategia basada en objetivos y entorno
         # Si hay objetivos específicos y estamos en modo vertical
         if self.modo == 0:  # Vertical Search
+            if self.column_mining:
+                print(f"[MinerBot_{self.id}] decide -> Minando columna completa desde y={self.pos.y}")
+                return {
+                    "action": "MINE_COLUMN",
+                    "strategy": "vertical",
+                    "position": self.pos
+                }
+
             current_block = obs["current_block"]
             
             # Verificar si el bloque actual es uno de los objetivos
-            target_blocks = [obj[0] for obj in self.objetivos]
-            if current_block in target_blocks:
+            if self.objectives.is_target(current_block):
                 print(f"[MinerBot_{self.id}] decide -> Bloque objetivo encontrado (ID: {current_block})")
                 return {
                     "action": "MINE_TARGET_BLOCK",
@@ -127,6 +187,13 @@ class MinerBot(BaseAgent):
                 "position": self.pos
             }
         
+        elif self.modo == 3:  # Strip Mining
+            print(f"[MinerBot_{self.id}] decide -> Mina en espina de pez")
+            return {
+                "action": "STRIP_MINE",
+                "position": self.pos
+            }
+        
         # Estrategia por defecto
         print(f"[MinerBot_{self.id}] decide -> Usando estrategia por defecto (vertical)")
         return {
@@ -146,10 +213,10 @@ class MinerBot(BaseAgent):
             print(f"[MinerBot_{self.id}] act -> Minando bloque objetivo ID {block_id} en {position}")
             
             # Minar el bloque
-            self.mc.setBlock(position.x, position.y, position.z, 0)  # Reemplazar con aire
+            self.write_block(position.x, position.y, position.z, 0)  # Reemplazar con aire
             
             # Recoger el recurso
-            self.recoger_recurso(block_id)
+            self.recoger_recurso(block_id, cells=[(position.x, position.y, position.z)])
             
             # Enviar update de inventario
             self.send_inventory_update()
@@ -161,14 +228,14 @@ class MinerBot(BaseAgent):
             print(f"[MinerBot_{self.id}] act -> Continuando búsqueda vertical (profundidad: {self.pos.y})")
             
             # Minar el bloque actual (aunque no sea objetivo)
-            current_block = self.mc.getBlock(self.pos.x, self.pos.y, self.pos.z)
+            current_block = self.read_block(self.pos.x, self.pos.y, self.pos.z)
             
             # Solo minar si no es bedrock
             if current_block != 7:
-                self.mc.setBlock(self.pos.x, self.pos.y, self.pos.z, 0)
+                self.write_block(self.pos.x, self.pos.y, self.pos.z, 0)
                 
                 # Verificar si era un bloque objetivo
-                if any(obj[0] == current_block for obj in self.objetivos):
+                if self.objectives.is_target(current_block):
                     self.recoger_recurso(current_block)
                     self.send_inventory_update()
                 
@@ -177,6 +244,28 @@ class MinerBot(BaseAgent):
             else:
                 print(f"[MinerBot_{self.id}] act -> ¡Bedrock alcanzado!")
                 
+        elif action_type == "MINE_COLUMN":
+            found = self.mine_column()
+            print(f"[MinerBot_{self.id}] act -> Columna minada hasta y={self.pos.y + 1}, recogido: {found}")
+            if found:
+                self.send_inventory_update()
+            
+        elif action_type == "VEIN_SEARCH":
+            found = self.vein_search()
+            print(f"[MinerBot_{self.id}] act -> Vetas minadas: {found} ({self.region.reads} lecturas de cubo)")
+            if found:
+                self.send_inventory_update()
+            
+        elif action_type == "STRIP_MINE":
+            found = self.strip_mine_step()
+            stats = self.strip.stats()
+            print(f"[MinerBot_{self.id}] act -> Túneles: recogido {found}, "
+                  f"expuestos/bloque={stats['exposure_per_block']:.2f}, "
+                  f"mineral/bloque={stats['ore_per_block']:.3f}, "
+                  f"faltan ~{self.estimate_strip_blocks()} bloques")
+            if found:
+                self.send_inventory_update()
+            
         elif action_type == "GRID_SEARCH":
             grid_size = decision.get("grid_size", self.grid_size)
             print(f"[MinerBot_{self.id}] act -> Ejecutando búsqueda en grid {grid_size}x{grid_size}")
@@ -218,12 +307,12 @@ class MinerBot(BaseAgent):
 
     def vertical_search(self):
 
-        bloque_debajo = self.mc.getBlock(self.pos.x, self.pos.y, self.pos.z)
+        bloque_debajo = self.read_block(self.pos.x, self.pos.y, self.pos.z)
 
         if bloque_debajo != 7: # si no hem arribat al final (7==bedrock)
-            if any(tupla[0] == bloque_debajo for tupla in self.objetivos):
+            if self.objectives.is_target(bloque_debajo):
                 self.recoger_recurso(bloque_debajo)
-            self.mc.setBlock(self.pos.x, self.pos.y, self.pos.z, 20)
+            self.write_block(self.pos.x, self.pos.y, self.pos.z, 20)
 
             self.pos.y = self.pos.y - 1 
         else:
@@ -236,58 +325,171 @@ class MinerBot(BaseAgent):
 
                 self.pos.x += dx
                 self.pos.z += dz
-                self.pos.y = self.mc.getHeight(self.pos.x, self.pos.z) - 1
+                self.pos.y = self.read_height(self.pos.x, self.pos.z) - 1
 
                 if not self.pos_ya_visitada(self.pos):
                     no_visitada = False
         
+    def read_shaft(self, x: int, top: int, z: int) -> tuple:
+        """(y más bajo excavable, ids de [ese y, top]) leyendo la columna en bloques hasta el bedrock"""
+        segments = []
+        y1 = top
+        while top - y1 < self.max_depth:
+            y0 = y1 - self.column_chunk + 1
+            ids = read_cuboid(self.mc, x, y0, z, x, y1, z)[0, :, 0]
+            bedrock = np.nonzero(ids == block.BEDROCK.id)[0]
+            if bedrock.size:
+                bottom = y0 + int(bedrock[-1]) + 1  # justo encima del bedrock más alto
+                segments.append(ids[bottom - y0:])
+                return bottom, np.concatenate(segments[::-1])
+            segments.append(ids)
+            y1 = y0 - 1
+        return y1 + 1, np.concatenate(segments[::-1])
+
+    def mine_column(self) -> dict:
+        """Excava la columna actual hasta el bedrock: una lectura, un setBlocks y un solo recuento"""
+        x, top, z = self.pos.x, self.pos.y, self.pos.z
+        bottom, shaft = self.read_shaft(x, top, z)
+        found = {}
+        if shaft.size:
+            ids, counts = np.unique(shaft, return_counts=True)
+            for block_id, count in zip(ids.tolist(), counts.tolist()):
+                if self.objectives.is_target(block_id):
+                    ys = bottom + np.nonzero(shaft == block_id)[0]
+                    counted = self.recoger_recurso(block_id, count, cells=[(x, int(y), z) for y in ys])
+                    if counted:
+                        found[block_id] = counted
+            self.write_cuboid(x, bottom, z, x, top, z, block.AIR.id)
+        self.pos.y = bottom - 1  # sobre el bedrock: perceive pedirá cambiar de sitio
+        return found
+
+    def vein_search(self) -> dict:
+        """Busca mena objetivo en el cubo actual y extrae las vetas conexas completas"""
+        x, y, z = self.pos.x, self.pos.y, self.pos.z
+        veins = find_veins(self.region, x, y, z, self.objectives.remaining)
+        if not veins:
+            # nada en este cubo: bajar al siguiente, o quedarse sobre el bedrock si lo hay en la columna
+            (_, y0, _), arr = self.region.cube_at(x, y, z)
+            column = arr[x % self.region.cube, :, z % self.region.cube]
+            bedrock = np.nonzero(column == block.BEDROCK.id)[0]
+            self.pos.y = y0 + int(bedrock[-1]) if bedrock.size else y0 - 1
+            return {}
+
+        found = {}
+        for block_id, cells in veins.items():
+            for x0, y0, z0, x1, y1, z1 in merge_cuboids(cells):
+                self.write_cuboid(x0, y0, z0, x1, y1, z1, block.AIR.id)
+            found[block_id] = self.recoger_recurso(block_id, len(cells), cells=cells)
+        return found
+
+    def strip_mine_step(self) -> dict:
+        """Excava los siguientes tramos del plan de mina, planificando otro bloque de ramales si se acaba"""
+        if self.strip is None:
+            self.strip = StripMine([])
+            y = self.strip_y if self.strip_y is not None else self.pos.y
+            self._strip_origin = (self.pos.x, y, self.pos.z)
+            self._strip_trunk = self.pos.x
+        found = {}
+        for _ in range(self.tunnels_per_tick):
+            if not self.strip:
+                x, y, z = self._strip_origin
+                self.strip.pending.extend(plan_branch_mine(
+                    x, y, z, branches=self.strip_branches, spacing=self.strip_spacing,
+                    trunk_from=self._strip_trunk))
+                # el siguiente plan continúa el mismo pasillo justo tras el último ramal
+                next_x, self._strip_trunk = next_branch_mine(x, self.strip_branches, self.strip_spacing)
+                self._strip_origin = (next_x, y, z)
+            for block_id, n in self.dig_tunnel(self.strip.next_tunnel()).items():
+                found[block_id] = found.get(block_id, 0) + n
+        return found
+
+    def dig_tunnel(self, tunnel) -> dict:
+        """Un tramo: una lectura con paredes incluidas, un setBlocks y el mineral expuesto extraído"""
+        shell = read_cuboid(self.mc, *shell_box(tunnel))
+        ore, exposed = self.strip.record(tunnel, shell, self.objectives.is_target)
+        self.write_cuboid(*tunnel, block.AIR.id)
+
+        found = {}
+        for block_id, count in ore.items():
+            inside = np.argwhere(shell[1:-1, 1:-1, 1:-1] == block_id) + tunnel[:3]
+            found[block_id] = self.recoger_recurso(block_id, count, cells=[tuple(c) for c in inside.tolist()])
+        by_id = {}
+        x0, y0, z0 = shell_box(tunnel)[:3]
+        for cell in exposed:
+            block_id = int(shell[cell[0] - x0, cell[1] - y0, cell[2] - z0])
+            if self.objectives.remaining(block_id) > len(by_id.get(block_id, ())):
+                by_id.setdefault(block_id, []).append(cell)
+        for block_id, cells in by_id.items():
+            for box in merge_cuboids(cells):
+                self.write_cuboid(*box, block.AIR.id)
+            self.strip.open_cells(cells)
+            found[block_id] = found.get(block_id, 0) + self.recoger_recurso(block_id, len(cells), cells=cells)
+
+        self.move_to(Vec3(tunnel[3], tunnel[1], tunnel[5]))
+        return {block_id: n for block_id, n in found.items() if n}
+
+    def estimate_strip_blocks(self) -> Optional[int]:
+        """Bloques que quedarían por excavar para completar los objetivos al ritmo observado"""
+        if self.strip is None:
+            return None
+        pending = sum(self.objectives.remaining(block_id) for block_id in self.objectives.targets)
+        return self.strip.estimate_blocks(pending)
+
     def grid_search(self):
-        for i in range(self.grid_size):
-            for j in range(self.grid_size):
-                n_pos = Vec3(self.pos.x+i, self.pos.y+j, self.pos.z)
-                bloque = self.get_block(n_pos)
-                if bloque in self.objetivos:
-                    self.recoger_recurso(bloque)
-                self.set_block(n_pos, 0)
-        
+        self.mine_face(self.grid_size)
         self.move_to(Vec3(self.pos.x, self.pos.y, self.pos.z+1))
 
-    def recoger_recurso(self, bloque_id: int):
-        #buscamos indice
-        idx = next(filter(
-            lambda i: self.objetivos[i][0] == bloque_id,
-            range(len(self.objetivos))
-        ), None) 
+    def mine_face(self, grid_size: int) -> dict:
+        """Excava la cara grid_size x grid_size (x, y) en z = pos.z: una lectura y un setBlocks"""
+        self._pace(grid_size * grid_size)
+        x0, y0, z = self.pos.x, self.pos.y, self.pos.z
+        x1, y1 = x0 + grid_size - 1, y0 + grid_size - 1
+        face = read_cuboid(self.mc, x0, y0, z, x1, y1, z)
+        found = {}
+        ids, counts = np.unique(face, return_counts=True)
+        for block_id, count in zip(ids.tolist(), counts.tolist()):
+            if self.objectives.is_target(block_id):
+                cells = [(x0 + i, y0 + j, z) for i, j, _ in np.argwhere(face == block_id).tolist()]
+                counted = self.recoger_recurso(block_id, count, cells=cells)
+                if counted:
+                    found[block_id] = counted
+        self.write_cuboid(x0, y0, z, x1, y1, z, block.AIR.id)
+        return found
 
-        # sumamos un inventario
-        bid, cant = self.inventario[idx]
-        self.inventario[idx] = (bid, cant + 1)
+    def _pace(self, blocks: int) -> None:
+        """Limita el ritmo a max_blocks_per_second (sustituye al sleep fijo por bloque)"""
+        if not self.max_blocks_per_second:
+            return
+        now = time.monotonic()
+        if now < self._next_face:
+            time.sleep(self._next_face - now)
+            now = self._next_face
+        self._next_face = now + blocks / self.max_blocks_per_second
 
-        if(self.inventario[idx][1] == self.objetivos[idx][1]):
-            del self.objetivos[idx]
-                
+    def recoger_recurso(self, bloque_id: int, cantidad: int = 1, cells=None) -> int:
+        """Suma al inventario; cells son las celdas (x, y, z) de donde salieron (por defecto, pos)"""
+        # el objetivo deja de ser target al completarse, pero se conserva con su inventario
+        counted = self.objectives.collect(bloque_id, cantidad)
+        if self.prospects is not None:
+            # se descuenta todo lo extraído del mundo, aunque el inventario ya estuviera lleno
+            if cells is None:
+                cells = [(self.pos.x, self.pos.y, self.pos.z)] * cantidad
+            self.prospects.note_mined_cells(bloque_id, cells)
+        return counted
     
     def objetivos_cumplidos(self) -> bool:
-        if(self.objetivos.count()==0):
-            return True
-        
-        return False
+        return self.objectives.complete
     
     
     def pos_ya_visitada(self, pos: Vec3) -> bool:
-        clave = (pos.x, pos.z)
-
-        if clave in self.pos_visitadas:
-            return True
-
-        self.pos_visitadas.append(clave)
-        return False
+        # comprueba y marca a la vez
+        return self.pos_visitadas.test_and_set(pos.x, pos.z)
     
     def build_message(self) -> Message:
         """Crea mensaje de inventario (mantener compatibilidad)"""
         payload = {
-            "inventario": self.inventario,
-            "objetivos": self.objetivos,
+            "inventario": dict(self.inventario),
+            "objetivos": dict(self.objetivos),
             "progress": self.calculate_progress()
         }
         
@@ -302,17 +504,6 @@ class MinerBot(BaseAgent):
         )
     
     #mensajes
-    def handle_priv_message(self, msg_dict: dict) -> None:
-        msg_type = str(msg_dict.get("type", ""))
-        if msg_type.startswith("materials.requierments"):
-            self.objetivos = msg_dict.get("payload", [])
-            self.inventario = list(
-                map(lambda objetivo: (objetivo[0], 0), self.objetivos)
-            )
-            self.set_state(BotState.RUNNING)
-            #response_msg = self.build_response_message(msg_dict.get("source", ""))
-            #self.bus.publish(response_msg)
-
     def _handle_priv_command(self, command, payload):
                 
         if command  == "start":
@@ -330,81 +521,38 @@ class MinerBot(BaseAgent):
 
     def check_objectives_completed(self) -> bool:
         """Verifica si todos los objetivos han sido completados"""
-        if not self.objetivos:
-            return True
-        
-        # Verificar cada objetivo contra el inventario
-        for i, (block_id, required) in enumerate(self.objetivos):
-            if i < len(self.inventario):
-                _, collected = self.inventario[i]
-                if collected < required:
-                    return False
-            else:
-                return False
-        
-        return True
+        return self.objectives.complete
 
     def calculate_progress(self) -> dict:
-        """Calcula el progreso de minería"""
-        progress = {}
-        total_required = 0
-        total_collected = 0
-        
-        for i, (block_id, required) in enumerate(self.objetivos):
-            total_required += required
-            
-            if i < len(self.inventario):
-                _, collected = self.inventario[i]
-                total_collected += collected
-                
-                progress[block_id] = {
-                    "required": required,
-                    "collected": collected,
-                    "percentage": (collected / required * 100) if required > 0 else 0
-                }
-        
-        overall_percentage = (total_collected / total_required * 100) if total_required > 0 else 0
-        
-        return {
-            "by_block": progress,
-            "total_required": total_required,
-            "total_collected": total_collected,
-            "overall_percentage": overall_percentage
-        }
+        """Calcula el progreso de minería (se mantiene al recoger, no se recorre nada)"""
+        return self.objectives.progress()
 
     def get_strategy_name(self) -> str:
         """Devuelve el nombre de la estrategia actual"""
         strategies = {
             0: "vertical_search",
             1: "grid_search", 
-            2: "vein_search"
+            2: "vein_search",
+            3: "strip_mining"
         }
         return strategies.get(self.modo, "unknown")
 
     def grid_search_execute(self, grid_size: int):
         """Ejecuta búsqueda en grid"""
-        for i in range(grid_size):
-            for j in range(grid_size):
-                n_pos = Vec3(self.pos.x + i, self.pos.y + j, self.pos.z)
-                bloque = self.mc.getBlock(n_pos.x, n_pos.y, n_pos.z)
-                
-                # Verificar si es un bloque objetivo
-                target_blocks = [obj[0] for obj in self.objetivos]
-                if bloque in target_blocks:
-                    print(f"[MinerBot_{self.id}] act -> Encontrado bloque objetivo {bloque} en grid")
-                    self.recoger_recurso(bloque)
-                
-                # Minar el bloque
-                self.mc.setBlock(n_pos.x, n_pos.y, n_pos.z, 0)
-                
-                # Pequeña pausa para simulación
-                time.sleep(0.05)
+        found = self.mine_face(grid_size)
+        if found:
+            print(f"[MinerBot_{self.id}] act -> Encontrados bloques objetivo en grid: {found}")
+            self.send_inventory_update()
         
         # Mover a siguiente posición en grid
         self.move_to(Vec3(self.pos.x, self.pos.y, self.pos.z + 1))
 
     def find_new_location(self, max_attempts: int = 20) -> Vec3:
         """Encuentra una nueva ubicación no visitada"""
+        prospected = self.prospected_location()
+        if prospected is not None:
+            return prospected
+
         for _ in range(max_attempts):
             # Generar desplazamiento aleatorio
             dx, dz = 0, 0
@@ -414,7 +562,7 @@ class MinerBot(BaseAgent):
             
             new_pos = Vec3(
                 self.pos.x + dx,
-                self.mc.getHeight(self.pos.x + dx, self.pos.z + dz) - 1,
+                self.read_height(self.pos.x + dx, self.pos.z + dz) - 1,
                 self.pos.z + dz
             )
             
@@ -423,14 +571,31 @@ class MinerBot(BaseAgent):
         
         return None
 
+    def prospected_location(self) -> Optional[Vec3]:
+        """Siguiente sitio según el índice de menas: el chunk más cercano con el objetivo que más falta"""
+        if self.prospects is None:
+            return None
+        targets = sorted(self.objectives.targets, key=self.objectives.remaining, reverse=True)
+        visited = lambda x, z: (x, z) in self.pos_visitadas  # sin marcar: solo se marca la elegida
+        for block_id in targets:
+            for hit in self.prospects.nearest_rich(self.pos.x, self.pos.z, block_id, limit=1, skip=visited):
+                x, y, z = hit["sample"]
+                self.pos_ya_visitada(Vec3(x, y, z))
+                print(f"[MinerBot_{self.id}] Índice de menas: {hit['count']} de ID {block_id} "
+                      f"en chunk {hit['chunk']} (y media {hit['mean_y']:.0f})")
+                if self.modo in (2, 3):
+                    return Vec3(x, y, z)  # vetas y túneles empiezan a la altura del mineral
+                return Vec3(x, self.read_height(x, z) - 1, z)  # la columna pasa por la muestra
+        return None
+
     def send_inventory_update(self):
         """Envía actualización periódica del inventario"""
         progress = self.calculate_progress()
         
         msg = super().build_message(
             payload={
-                "inventario": self.inventario,
-                "objetivos": self.objetivos,
+                "inventario": dict(self.inventario),
+                "objetivos": dict(self.objetivos),
                 "progress": progress,
                 "position": {"x": self.pos.x, "y": self.pos.y, "z": self.pos.z},
                 "strategy": self.get_strategy_name()
@@ -448,8 +613,8 @@ class MinerBot(BaseAgent):
         msg = super().build_message(
             payload={
                 "status": "COMPLETED",
-                "final_inventory": self.inventario,
-                "objectives": self.objetivos,
+                "final_inventory": dict(self.inventario),
+                "objectives": dict(self.objetivos),
                 "message": "Todos los materiales han sido recolectados",
                 "timestamp": datetime.now(timezone.utc).isoformat()
             },
@@ -477,33 +642,25 @@ class MinerBot(BaseAgent):
         
         self.send_message(msg)
 
-    def handle_priv_message(self, msg_dict: dict) -> None:
-        """Maneja mensajes privados para el MinerBot"""
-        msg_type = str(msg_dict.get("type", ""))
+    def _on_materials_request(self, msg_dict: dict) -> None:
+        """Recibe la lista de materiales requeridos por el BuilderBot"""
+        print(f"[MinerBot_{self.id}] Received material requirements")
+        payload = dict(msg_dict.get("payload", {}))
         
-        if msg_type.startswith("materials.requirements") or msg_type.startswith("materials.requierments"):
-            print(f"[MinerBot_{self.id}] Received material requirements")
-            payload = dict(msg_dict.get("payload", {}))
-            
-            # Extraer requerimientos del payload
-            requirements = payload.get("requirements", [])
-            if isinstance(requirements, dict):
-                # Convertir dict a lista de tuplas
-                self.objetivos = [(block_id, qty) for block_id, qty in requirements.items()]
-            elif isinstance(requirements, list):
-                self.objetivos = requirements
-            else:
-                print(f"[MinerBot_{self.id}] Formato de requerimientos no reconocido")
-                return
-            
-            # Inicializar inventario
-            self.inventario = [(block_id, 0) for block_id, _ in self.objetivos]
-            
-            print(f"[MinerBot_{self.id}] Objetivos establecidos: {self.objetivos}")
-            print(f"[MinerBot_{self.id}] Inventario inicializado: {self.inventario}")
-            
-            # Iniciar minería
-            self.set_state(BotState.RUNNING)
-            
-            # Enviar acknowledgment
-            self.send_acknowledgment(msg_dict.get("source", "unknown"), "requirements_received")
\ No newline at end of file
+        # Extraer requerimientos del payload
+        requirements = payload.get("requirements", [])
+        if not isinstance(requirements, (dict, list)):
+            print(f"[MinerBot_{self.id}] Formato de requerimientos no reconocido")
+            return
+        
+        # Objetivos por id (dict o lista de pares) con el inventario a cero
+        self.objectives.set(requirements)
+        
+        print(f"[MinerBot_{self.id}] Objetivos establecidos: {self.objetivos}")
+        print(f"[MinerBot_{self.id}] Inventario inicializado: {self.inventario}")
+        
+        # Iniciar minería
+        self.set_state(BotState.RUNNING)
+        
+        # Enviar acknowledgment
+        self.send_acknowledgment(msg_dict.get("source", "unknown"), "requirements_received")
\ No newline at end of file
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, Mapping, Set, Tuple, Union
+
+Requirements = Union[Mapping[int, int], Iterable[Tuple[int, int]]]
+
+
+class MiningObjectives:
+    """Objetivos de minería e inventario indexados por id de bloque.
+
+    required y collected son dicts id -> cantidad; targets es el conjunto de
+    ids que todavía faltan, así que comprobar si un bloque interesa, sumarlo
+    y saber si se ha terminado es O(1). El progreso se mantiene al recoger en
+    lugar de recalcularse.
+    """
+
+    def __init__(self, requirements: Requirements = ()):
+        self.required: Dict[int, int] = {}
+        self.collected: Dict[int, int] = {}
+        self.targets: Set[int] = set()
+        self._by_block: Dict[int, dict] = {}
+        self._total_required = 0
+        self._total_collected = 0
+        self.set(requirements)
+
+    def set(self, requirements: Requirements) -> None:
+        """Sustituye los objetivos (dict id -> cantidad o lista de pares) y vacía el inventario."""
+        items = requirements.items() if isinstance(requirements, Mapping) else requirements
+        required: Dict[int, int] = {}
+        for block_id, qty in items:
+            required[int(block_id)] = required.get(int(block_id), 0) + int(qty)
+        self.required = {block_id: qty for block_id, qty in required.items() if qty > 0}
+        self.collected = {block_id: 0 for block_id in self.required}
+        self.targets = set(self.required)
+        self._by_block = {
+            block_id: {"required": qty, "collected": 0, "percentage": 0.0}
+            for block_id, qty in self.required.items()
+        }
+        self._total_required = sum(self.required.values())
+        self._total_collected = 0
+
+    def is_target(self, block_id: int) -> bool:
+        return block_id in self.targets
+
+    def remaining(self, block_id: int) -> int:
+        return self.required.get(block_id, 0) - self.collected.get(block_id, 0)
+
+    def collect(self, block_id: int, count: int = 1) -> int:
+        """Suma hasta count bloques de block_id si aún hacen falta; devuelve cuántos contaron."""
+        if block_id not in self.targets:
+            return 0
+        counted = min(count, self.remaining(block_id))
+        done = self.collected[block_id] + counted
+        self.collected[block_id] = done
+        self._total_collected += counted
+        entry = self._by_block[block_id]
+        entry["collected"] = done
+        entry["percentage"] = done / entry["required"] * 100
+        if done >= self.required[block_id]:
+            self.targets.discard(block_id)
+        return counted
+
+    @property
+    def complete(self) -> bool:
+        return not self.targets
+
+    def progress(self) -> dict:
+        total = self._total_required
+        return {
+            # copia: el resultado acaba en payloads ya publicados mientras se sigue recogiendo
+            "by_block": {block_id: dict(entry) for block_id, entry in self._by_block.items()},
+            "total_required": total,
+            "total_collected": self._total_collected,
+            "overall_percentage": (self._total_collected / total * 100) if total > 0 else 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self.required)
+
+    def __repr__(self) -> str:
+        return f"MiningObjectives({self.collected}/{self.required})"
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from typing import Dict, Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _Node:
+    __slots__ = ("children", "values")
+
+    def __init__(self):
+        self.children: Dict[str, _Node] = {}
+        self.values: list = []
+
+
+class PrefixIndex(Generic[T]):
+    """Trie por caracteres: asocia prefijos de msg.type (p.ej. "map.v") a valores.
+
+    La búsqueda recorre el tipo una sola vez, sin cadenas de startswith.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, prefix: str, value: T) -> None:
+        node = self._root
+        for ch in prefix:
+            node = node.children.setdefault(ch, _Node())
+        if value not in node.values:
+            node.values.append(value)
+            self._size += 1
+
+    def remove(self, prefix: str, value: T) -> bool:
+        path = [self._root]
+        for ch in prefix:
+            nxt = path[-1].children.get(ch)
+            if nxt is None:
+                return False
+            path.append(nxt)
+        node = path[-1]
+        if value not in node.values:
+            return False
+        node.values.remove(value)
+        self._size -= 1
+        # podar ramas vacías
+        for ch, parent in zip(reversed(prefix), reversed(path[:-1])):
+            child = parent.children[ch]
+            if child.values or child.children:
+                break
+            del parent.children[ch]
+        return True
+
+    def match(self, key: str) -> List[T]:
+        """Todos los valores cuyo prefijo es prefijo de key (del más corto al más largo)."""
+        node = self._root
+        found = list(node.values)
+        for ch in key:
+            node = node.children.get(ch)
+            if node is None:
+                break
+            found.extend(node.values)
+        return found
+
+    def longest(self, key: str) -> Optional[T]:
+        """Último valor registrado para el prefijo más largo que casa con key."""
+        node = self._root
+        best = node.values[-1] if node.values else None
+        for ch in key:
+            node = node.children.get(ch)
+            if node is None:
+                break
+            if node.values:
+                best = node.values[-1]
+        return best
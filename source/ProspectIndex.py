@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import math
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .ConnectionPool import PooledMinecraft
+from .world_reads import read_cuboid
+
+CHUNK_SIZE = 16
+# ids que no interesa indexar: aire, agua, lava y bedrock
+IGNORED_IDS = (0, 7, 8, 9, 10, 11)
+# celdas de muestra que se guardan por chunk e id, en columnas distintas
+MAX_SAMPLES = 8
+
+ChunkKey = Tuple[int, int]
+
+
+Cell = Tuple[int, int, int]
+
+
+class _OreStats:
+    __slots__ = ("count", "y_sum", "samples")
+
+    def __init__(self, count: int, y_sum: int, samples: List[Cell]):
+        self.count = count
+        self.y_sum = y_sum
+        self.samples = samples    # celdas concretas con ese id, para ir directo a ellas
+
+
+class ProspectIndex:
+    """Densidad de cada id de bloque por chunk de 16x16, a partir de escaneos subterráneos.
+
+    El índice está organizado por id: by_ore[id][(cx, cz)] guarda cuántos
+    bloques hay, la suma de sus y (para la altura media) y unas pocas celdas
+    de muestra en columnas distintas; las que se van extrayendo se quitan.
+    Una consulta por id solo recorre los chunks donde aparece.
+    """
+
+    def __init__(self):
+        self.by_ore: Dict[int, Dict[ChunkKey, _OreStats]] = {}
+        self.scanned: Dict[ChunkKey, Tuple[int, int]] = {}   # chunk -> (y0, y1) escaneado
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.scanned)
+
+    def is_scanned(self, cx: int, cz: int, y0: int, y1: int) -> bool:
+        band = self.scanned.get((cx, cz))
+        return band is not None and band[0] <= y0 and band[1] >= y1
+
+    def add_chunk(self, cx: int, cz: int, y0: int, blocks: np.ndarray) -> None:
+        """Registra el escaneo [dx, dy, dz] de un chunk cuya capa inferior es y0."""
+        key = (cx, cz)
+        x0, z0 = cx * CHUNK_SIZE, cz * CHUNK_SIZE
+        flat = blocks.reshape(-1)
+        ids, first, counts = np.unique(flat, return_index=True, return_counts=True)
+        # suma de y por id en una pasada
+        ys = np.broadcast_to(np.arange(blocks.shape[1])[None, :, None], blocks.shape).reshape(-1)
+        order = np.searchsorted(ids, flat)
+        y_sums = np.bincount(order, weights=ys, minlength=len(ids))
+        # primera celda de cada (id, columna): hasta MAX_SAMPLES columnas repartidas por id
+        columns = blocks.shape[0] * blocks.shape[2]
+        cols = np.broadcast_to(
+            (np.arange(blocks.shape[0])[:, None, None] * blocks.shape[2]
+             + np.arange(blocks.shape[2])[None, None, :]), blocks.shape).reshape(-1)
+        pairs, pair_first = np.unique(order * columns + cols, return_index=True)
+        bounds = np.searchsorted(pairs // columns, np.arange(len(ids) + 1))
+        with self._lock:
+            for by_chunk in self.by_ore.values():
+                by_chunk.pop(key, None)   # un re-escaneo sustituye al anterior
+            for k, block_id in enumerate(ids.tolist()):
+                if block_id in IGNORED_IDS:
+                    continue
+                lo, hi = bounds[k], bounds[k + 1]
+                picks = pair_first[lo:hi]
+                if len(picks) > MAX_SAMPLES:
+                    picks = picks[np.linspace(0, len(picks) - 1, MAX_SAMPLES).astype(int)]
+                i, j, l = np.unravel_index(picks, blocks.shape)
+                self.by_ore.setdefault(block_id, {})[key] = _OreStats(
+                    int(counts[k]),
+                    int(y_sums[k]) + int(counts[k]) * y0,
+                    [(x0 + a, y0 + b, z0 + c) for a, b, c in zip(i.tolist(), j.tolist(), l.tolist())],
+                )
+            self.scanned[key] = (y0, y0 + blocks.shape[1] - 1)
+
+    def note_mined(self, x: int, z: int, block_id: int, count: int = 1) -> None:
+        """Descuenta bloques extraídos para que el índice no siga mandando al mismo sitio."""
+        with self._lock:
+            self._discount_locked((x // CHUNK_SIZE, z // CHUNK_SIZE), block_id, count)
+
+    def note_mined_cells(self, block_id: int, cells: Iterable[Cell]) -> None:
+        """note_mined para celdas (x, y, z) concretas, que pueden caer en varios chunks.
+
+        Las celdas de muestra extraídas dejan de ofrecerse en nearest_rich.
+        """
+        per_chunk: Dict[ChunkKey, List[Cell]] = {}
+        for x, y, z in cells:
+            cell = (int(x), int(y), int(z))
+            per_chunk.setdefault((cell[0] // CHUNK_SIZE, cell[2] // CHUNK_SIZE), []).append(cell)
+        with self._lock:
+            for key, mined in per_chunk.items():
+                self._discount_locked(key, block_id, len(mined), mined)
+
+    def _discount_locked(self, key: ChunkKey, block_id: int, count: int,
+                         mined: Iterable[Cell] = ()) -> None:
+        stats = self.by_ore.get(block_id, {}).get(key)
+        if stats is None:
+            return
+        mean_y = stats.y_sum / stats.count
+        stats.count -= count
+        stats.y_sum -= int(mean_y * count)
+        if stats.count <= 0:
+            del self.by_ore[block_id][key]
+            return
+        mined = set(mined)
+        if mined:
+            stats.samples = [c for c in stats.samples if c not in mined]
+
+    def density(self, cx: int, cz: int, block_id: int) -> float:
+        """Fracción de bloques del chunk escaneado que son block_id."""
+        band = self.scanned.get((cx, cz))
+        stats = self.by_ore.get(block_id, {}).get((cx, cz))
+        if band is None or stats is None:
+            return 0.0
+        return stats.count / (CHUNK_SIZE * CHUNK_SIZE * (band[1] - band[0] + 1))
+
+    def nearest_rich(self, x: int, z: int, block_id: int, min_count: int = 1,
+                     limit: int = 8, skip: Optional[Callable[[int, int], bool]] = None) -> List[dict]:
+        """Chunks con al menos min_count bloques de block_id, del más cercano al más lejano.
+
+        Cada resultado trae una celda de muestra, la altura media del mineral,
+        el recuento y la densidad. skip(x, z) descarta columnas (p.ej. ya
+        visitadas): de cada chunk se ofrece la primera muestra no descartada y
+        el chunk se omite si no queda ninguna. El filtro va antes de cortar a
+        limit resultados.
+        """
+        half = CHUNK_SIZE // 2
+        with self._lock:
+            found = []
+            for key, stats in self.by_ore.get(block_id, {}).items():
+                if stats.count < min_count:
+                    continue
+                mean_y = stats.y_sum / stats.count
+                # sin muestras (todas extraídas) queda el centro del chunk a la altura media
+                samples = list(stats.samples) or [
+                    (key[0] * CHUNK_SIZE + half, int(round(mean_y)), key[1] * CHUNK_SIZE + half)]
+                found.append((key, stats.count, mean_y, samples))
+        found.sort(key=lambda f: (f[0][0] * CHUNK_SIZE + half - x) ** 2 + (f[0][1] * CHUNK_SIZE + half - z) ** 2)
+        hits: List[dict] = []
+        for key, count, mean_y, samples in found:
+            if len(hits) >= limit:
+                break
+            sample = next((c for c in samples if skip is None or not skip(c[0], c[2])), None)
+            if sample is None:
+                continue
+            hits.append({"chunk": key, "sample": sample, "mean_y": mean_y, "count": count,
+                         "density": self.density(key[0], key[1], block_id)})
+        return hits
+
+    # ---------- persistencia ----------
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            scanned = np.array([(cx, cz, y0, y1) for (cx, cz), (y0, y1) in self.scanned.items()],
+                               dtype=np.int32).reshape(-1, 4)
+            records = np.array([
+                (block_id, cx, cz, s.count, s.y_sum)
+                for block_id, by_chunk in self.by_ore.items()
+                for (cx, cz), s in by_chunk.items()
+            ], dtype=np.int64).reshape(-1, 5)
+            samples = np.array([
+                (block_id, cx, cz) + cell
+                for block_id, by_chunk in self.by_ore.items()
+                for (cx, cz), s in by_chunk.items()
+                for cell in s.samples
+            ], dtype=np.int64).reshape(-1, 6)
+        np.savez_compressed(path, scanned=scanned, records=records, samples=samples)
+
+    @classmethod
+    def load(cls, path: str) -> "ProspectIndex":
+        data = np.load(path)
+        index = cls()
+        for cx, cz, y0, y1 in data["scanned"].tolist():
+            index.scanned[(cx, cz)] = (y0, y1)
+        records = data["records"]
+        for block_id, cx, cz, count, y_sum in records[:, :5].tolist():
+            index.by_ore.setdefault(block_id, {})[(cx, cz)] = _OreStats(count, y_sum, [])
+        if "samples" in data.files:
+            rows = data["samples"].tolist()
+        else:
+            # formato anterior: una sola muestra en las columnas 5-7 de records
+            rows = [r[:3] + r[5:8] for r in records.tolist()]
+        for block_id, cx, cz, sx, sy, sz in rows:
+            index.by_ore[block_id][(cx, cz)].samples.append((sx, sy, sz))
+        return index
+
+
+def spiral_chunks(cx: int, cz: int, radius: int) -> Iterator[ChunkKey]:
+    """Chunks en anillos crecientes alrededor de (cx, cz), hasta radius chunks."""
+    yield cx, cz
+    for r in range(1, radius + 1):
+        for i in range(-r, r + 1):
+            yield cx + i, cz - r
+            yield cx + i, cz + r
+        for j in range(-r + 1, r):
+            yield cx - r, cz + j
+            yield cx + r, cz + j
+
+
+class Prospector:
+    """Hilo que va escaneando chunks alrededor de un punto y llenando un ProspectIndex.
+
+    Cada chunk es una sola lectura read_cuboid de 16 x (y1 - y0 + 1) x 16;
+    interval espacia las lecturas para no competir con los agentes. Con un
+    PooledMinecraft la conexión se devuelve al pool tras cada chunk, así que
+    el escaneo no ocupa un hueco del pool durante toda la espiral.
+    """
+
+    def __init__(self, mc, index: ProspectIndex, x: int, z: int, y0: int, y1: int,
+                 radius: int = 8, interval: float = 0.1):
+        self.mc = mc
+        self.index = index
+        self.center = (math.floor(x / CHUNK_SIZE), math.floor(z / CHUNK_SIZE))
+        self.y0, self.y1 = min(y0, y1), max(y0, y1)
+        self.radius = radius
+        self.interval = interval
+        self.chunks_scanned = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def scan_chunk(self, cx: int, cz: int) -> None:
+        x0, z0 = cx * CHUNK_SIZE, cz * CHUNK_SIZE
+        blocks = read_cuboid(self.mc, x0, self.y0, z0, x0 + CHUNK_SIZE - 1, self.y1, z0 + CHUNK_SIZE - 1)
+        self.index.add_chunk(cx, cz, self.y0, blocks)
+        self.chunks_scanned += 1
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="Prospector", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def scan(self) -> int:
+        """Recorre la espiral en el hilo actual (lo que hace el hilo de fondo); devuelve chunks leídos."""
+        before = self.chunks_scanned
+        for cx, cz in spiral_chunks(*self.center, self.radius):
+            if self._stop.is_set():
+                break
+            if self.index.is_scanned(cx, cz, self.y0, self.y1):
+                continue
+            self.scan_chunk(cx, cz)
+            self._release()
+            if self.interval and self._stop.wait(self.interval):
+                break
+        return self.chunks_scanned - before
+
+    def _release(self) -> None:
+        if isinstance(self.mc, PooledMinecraft):
+            self.mc.release_thread()
+
+    def _run(self) -> None:
+        try:
+            self.scan()
+        finally:
+            self._release()
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+
+from .recetas import ITEM_BLOQUE, RECETAS
+
+# id de bloque (int) o nombre de item de recetas.py (str)
+Item = Union[int, str]
+
+# coste por unidad de un item en bruto que no es un bloque: no se puede picar
+UNRESOLVED_COST = 1e6
+
+
+@dataclass(frozen=True)
+class Recipe:
+    name: str
+    output: Item
+    quantity: int
+    inputs: Tuple[Tuple[Item, int], ...]
+
+
+@dataclass
+class Resolution:
+    """Resultado de expandir un BOM: lo que hay que picar, fabricar y lo que sobra."""
+    raw: Dict[Item, int] = field(default_factory=dict)
+    crafts: Dict[str, int] = field(default_factory=dict)
+    surplus: Dict[Item, int] = field(default_factory=dict)
+    choices: Dict[Item, str] = field(default_factory=dict)
+
+    def minable(self) -> Dict[int, int]:
+        """Parte de raw que son ids de bloque (lo que puede pedirse al MinerBot)."""
+        return {item: n for item, n in self.raw.items() if isinstance(item, int)}
+
+    def unresolved(self) -> Dict[str, int]:
+        """Items en bruto sin bloque asociado (ni receta ni mena)."""
+        return {item: n for item, n in self.raw.items() if isinstance(item, str)}
+
+    def cost(self, costs: Optional[Mapping[int, float]] = None) -> float:
+        """Coste de picar raw: bloques en total, o tiempo estimado si se da costs por id."""
+        total = 0.0
+        for item, n in self.raw.items():
+            if isinstance(item, str):
+                total += UNRESOLVED_COST * n
+            else:
+                total += (costs.get(item, 1.0) if costs else 1.0) * n
+        return total
+
+
+class RecipeResolver:
+    """Expande un BOM a través del grafo de recetas hasta materiales en bruto.
+
+    Cada item tiene a lo sumo una receta elegida (por defecto la primera
+    declarada que no cierra un ciclo; las demás son alternativas, como las de
+    "fuel"). Con las elecciones fijadas el grafo es acíclico y se precalcula
+    un orden topológico productos -> ingredientes. Resolver es entonces una
+    pasada por ese orden acumulando demanda y redondeando a lotes enteros.
+    Las resoluciones se memorizan por BOM.
+    """
+
+    def __init__(self, recetas: Mapping[str, dict] = RECETAS, aliases: Mapping[str, int] = ITEM_BLOQUE,
+                 choices: Optional[Mapping[Item, str]] = None, memo_size: int = 256):
+        self.aliases = dict(aliases)
+        self.recipes: Dict[str, Recipe] = {}
+        self.producers: Dict[Item, List[str]] = {}
+        for name, receta in recetas.items():
+            out = receta["outputs"][0]
+            recipe = Recipe(
+                name=name,
+                output=self.canonical(out["id"]),
+                quantity=int(out["cantidad"]),
+                inputs=tuple((self.canonical(i["id"]), int(i["cantidad"])) for i in receta["inputs"]),
+            )
+            self.recipes[name] = recipe
+            self.producers.setdefault(recipe.output, []).append(name)
+
+        self.memo_size = memo_size
+        self._memo: Dict[Tuple, Resolution] = {}
+        self._plans: Dict[frozenset, Tuple[Dict[Item, str], List[Item]]] = {}
+        self._best: Dict[Tuple, Resolution] = {}
+        self._lock = threading.Lock()
+        self.choices: Dict[Item, str] = {}
+        self.set_choices(choices or {})
+
+    def canonical(self, item: Item) -> Item:
+        return self.aliases.get(item, item) if isinstance(item, str) else int(item)
+
+    # ---------- elección de recetas ----------
+
+    def set_choices(self, choices: Mapping[Item, str]) -> None:
+        """Fija la receta de algunos items; el resto toma la primera alternativa válida."""
+        chosen, order = self._plan(choices)
+        with self._lock:
+            self.choices = chosen
+            self.order = order
+            self._memo.clear()
+            self._best.clear()
+
+    def _plan(self, choices: Mapping[Item, str]) -> Tuple[Dict[Item, str], List[Item]]:
+        """(elecciones completas, orden topológico) para unas elecciones parciales; ValueError si hay ciclo."""
+        key = frozenset((self.canonical(i), n) for i, n in choices.items())
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan
+        chosen: Dict[Item, str] = {}
+        for item, name in choices.items():
+            item = self.canonical(item)
+            if name not in self.producers.get(item, ()):
+                raise ValueError(f"{name} no produce {item}")
+            chosen[item] = name
+        for item, name in chosen.items():
+            if self._reaches(self.recipes[name], item, chosen):
+                raise ValueError(f"la receta {name} forma un ciclo")
+        for item, names in self.producers.items():
+            if item in chosen:
+                continue
+            for name in names:
+                if not self._reaches(self.recipes[name], item, chosen):
+                    chosen[item] = name
+                    break
+        plan = (chosen, self._topological_order(chosen))
+        self._plans[key] = plan
+        return plan
+
+    def _reaches(self, recipe: Recipe, target: Item, chosen: Mapping[Item, str]) -> bool:
+        """¿Algún ingrediente de recipe lleva de vuelta a target con las elecciones dadas?"""
+        stack = [item for item, _ in recipe.inputs]
+        seen = set()
+        while stack:
+            item = stack.pop()
+            if item == target:
+                return True
+            if item in seen or item not in chosen:
+                continue
+            seen.add(item)
+            stack.extend(i for i, _ in self.recipes[chosen[item]].inputs)
+        return False
+
+    def _topological_order(self, choices: Mapping[Item, str]) -> List[Item]:
+        """Items fabricables ordenados para que cada producto vaya antes que sus ingredientes."""
+        postorder: List[Item] = []
+        visited = set()
+        for root in choices:
+            if root in visited:
+                continue
+            visited.add(root)
+            stack = [(root, iter(self.recipes[choices[root]].inputs))]
+            while stack:
+                item, children = stack[-1]
+                for child, _ in children:
+                    if child in choices and child not in visited:
+                        visited.add(child)
+                        stack.append((child, iter(self.recipes[choices[child]].inputs)))
+                        break
+                else:
+                    stack.pop()
+                    postorder.append(item)
+        postorder.reverse()
+        return postorder
+
+    # ---------- resolución ----------
+
+    def _wanted(self, bom: Mapping[Item, int]) -> Dict[Item, int]:
+        wanted: Dict[Item, int] = {}
+        for item, n in bom.items():
+            if n > 0:
+                item = self.canonical(item)
+                wanted[item] = wanted.get(item, 0) + int(n)
+        return wanted
+
+    def resolve(self, bom: Mapping[Item, int], choices: Optional[Mapping[Item, str]] = None) -> Resolution:
+        """Materiales en bruto y fabricaciones para cubrir bom (id o item -> cantidad).
+
+        Sin choices se usan las elecciones del resolver. La Resolution devuelta
+        se comparte con la memoria interna: no modificarla.
+        """
+        wanted = self._wanted(bom)
+        key = tuple(sorted(wanted.items(), key=repr))
+        if choices is not None:
+            choices, order = self._plan(choices)
+            key = (key, tuple(sorted(choices.items(), key=repr)))
+        with self._lock:
+            hit = self._memo.get(key)
+            if hit is not None:
+                return hit
+            if choices is None:
+                order, choices = self.order, self.choices
+
+        demand = wanted
+        result = Resolution(choices=choices)
+        for item in order:
+            need = demand.pop(item, 0)
+            if need <= 0:
+                continue
+            recipe = self.recipes[choices[item]]
+            batches = -(-need // recipe.quantity)
+            result.crafts[recipe.name] = batches
+            extra = batches * recipe.quantity - need
+            if extra:
+                result.surplus[item] = extra
+            for ingredient, qty in recipe.inputs:
+                demand[ingredient] = demand.get(ingredient, 0) + batches * qty
+        result.raw = {item: n for item, n in demand.items() if n > 0}
+
+        with self._lock:
+            if len(self._memo) >= self.memo_size:
+                self._memo.pop(next(iter(self._memo)))
+            self._memo[key] = result
+        return result
+
+    # ---------- optimización ----------
+
+    def alternatives(self, bom: Mapping[Item, int]) -> Dict[Item, List[str]]:
+        """Items alcanzables desde bom (por cualquier receta) que tienen más de una receta."""
+        stack = list(self._wanted(bom))
+        seen = set()
+        while stack:
+            item = stack.pop()
+            if item in seen:
+                continue
+            seen.add(item)
+            for name in self.producers.get(item, ()):
+                stack.extend(i for i, _ in self.recipes[name].inputs)
+        return {item: self.producers[item] for item in seen if len(self.producers.get(item, ())) > 1}
+
+    def optimize(self, bom: Mapping[Item, int], costs: Optional[Mapping[int, float]] = None,
+                 max_combinations: int = 4096) -> Resolution:
+        """Resolución de coste mínimo probando las combinaciones de recetas alternativas.
+
+        Cada combinación se evalúa con resolve, así que el coste ya incluye el
+        redondeo a lotes y el reparto de intermedios compartidos (tablones,
+        palos...). Las combinaciones con ciclo se descartan. Si hay más de
+        max_combinations solo se prueban las primeras en orden de declaración.
+        """
+        wanted = self._wanted(bom)
+        key = (tuple(sorted(wanted.items(), key=repr)), tuple(sorted((costs or {}).items())))
+        with self._lock:
+            hit = self._best.get(key)
+        if hit is not None:
+            return hit
+
+        options = self.alternatives(wanted)
+        items = sorted(options, key=repr)
+        best, best_cost = self.resolve(wanted), None
+        for combo in itertools.islice(itertools.product(*(options[i] for i in items)), max_combinations):
+            try:
+                resolution = self.resolve(wanted, dict(zip(items, combo)))
+            except ValueError:
+                continue  # esta combinación cierra un ciclo
+            cost = resolution.cost(costs)
+            if best_cost is None or cost < best_cost:
+                best, best_cost = resolution, cost
+
+        with self._lock:
+            self._best[key] = best
+        return best
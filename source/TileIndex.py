@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+Cell = Tuple[int, int]
+
+
+@dataclass
+class MapTile:
+    x0: int           # esquina mínima en x
+    z0: int           # esquina mínima en z
+    width: int        # columnas en x
+    length: int       # columnas en z
+    heights: Any      # matriz de alturas [i, j] -> (x0 + i, z0 + j)
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        return (self.x0, self.z0)
+
+    def distance2(self, x: float, z: float) -> float:
+        """Distancia al cuadrado desde (x, z) al rectángulo (0 si está dentro)."""
+        dx = max(self.x0 - x, 0, x - (self.x0 + self.width - 1))
+        dz = max(self.z0 - z, 0, z - (self.z0 + self.length - 1))
+        return dx * dx + dz * dz
+
+
+class TileIndex:
+    """Índice espacial de mapas recibidos: hash de celdas cell x cell en xz.
+
+    Cada mapa se registra en las celdas que toca, así las consultas por caja,
+    el vecino más cercano y la cobertura solo miran celdas cercanas.
+    """
+
+    def __init__(self, cell: int = 64):
+        self.cell = cell
+        self._tiles: Dict[Tuple[int, int], MapTile] = {}
+        self._grid: Dict[Cell, Set[Tuple[int, int]]] = {}
+        self._cell_bounds: Optional[Tuple[int, int, int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    def __iter__(self) -> Iterator[MapTile]:
+        return iter(self._tiles.values())
+
+    def get(self, x0: int, z0: int) -> Optional[MapTile]:
+        return self._tiles.get((x0, z0))
+
+    def insert(self, x0: int, z0: int, heights) -> MapTile:
+        """Añade (o sustituye) el mapa con esquina (x0, z0)."""
+        width, length = len(heights), len(heights[0])
+        tile = MapTile(int(x0), int(z0), width, length, heights)
+        old = self._tiles.get(tile.key)
+        if old is not None:
+            self._unlink(old)
+        self._tiles[tile.key] = tile
+        for c in self._cells(tile.x0, tile.z0, tile.x0 + width, tile.z0 + length):
+            self._grid.setdefault(c, set()).add(tile.key)
+            self._grow_bounds(c)
+        return tile
+
+    def remove(self, x0: int, z0: int) -> bool:
+        tile = self._tiles.pop((x0, z0), None)
+        if tile is None:
+            return False
+        self._unlink(tile)
+        return True
+
+    # ---------- consultas ----------
+
+    def query_bbox(self, x0: int, z0: int, x1: int, z1: int) -> List[MapTile]:
+        """Mapas que solapan la caja [x0, x1) x [z0, z1)."""
+        found: Dict[Tuple[int, int], MapTile] = {}
+        for c in self._cells(x0, z0, x1, z1):
+            for key in self._grid.get(c, ()):
+                if key in found:
+                    continue
+                tile = self._tiles[key]
+                if (tile.x0 < x1 and tile.x0 + tile.width > x0
+                        and tile.z0 < z1 and tile.z0 + tile.length > z0):
+                    found[key] = tile
+        return list(found.values())
+
+    def nearest(self, x: float, z: float) -> Optional[MapTile]:
+        """Mapa más cercano a (x, z), buscando por anillos de celdas.
+
+        Los anillos empiezan donde el primero toca las celdas ocupadas y solo
+        se recorre su parte dentro de ellas, así una consulta lejana no visita
+        celdas vacías.
+        """
+        if not self._tiles:
+            return None
+        cx, cz = int(x) // self.cell, int(z) // self.cell
+        bounds = self._cell_bounds
+        bx0, bz0, bx1, bz1 = bounds
+        max_ring = max(abs(cx - bx0), abs(cx - bx1), abs(cz - bz0), abs(cz - bz1))
+        first_ring = max(bx0 - cx, cx - bx1, bz0 - cz, cz - bz1, 0)
+
+        best, best_d2 = None, float("inf")
+        seen: Set[Tuple[int, int]] = set()
+        for ring in range(first_ring, max_ring + 1):
+            # ninguna celda de este anillo puede estar a menos de (ring - 1) * cell
+            lower = max(ring - 1, 0) * self.cell
+            if lower * lower > best_d2:
+                break
+            for c in self._ring(cx, cz, ring, bounds):
+                for key in self._grid.get(c, ()):
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    tile = self._tiles[key]
+                    d2 = tile.distance2(x, z)
+                    if d2 < best_d2:
+                        best, best_d2 = tile, d2
+        return best
+
+    def uncovered(self, x0: int, z0: int, x1: int, z1: int) -> List[Cell]:
+        """Celdas (cx, cz) de la caja que ningún mapa toca todavía."""
+        return [c for c in self._cells(x0, z0, x1, z1) if not self._grid.get(c)]
+
+    def cell_origin(self, c: Cell) -> Tuple[int, int]:
+        return (c[0] * self.cell, c[1] * self.cell)
+
+    # ---------- internos ----------
+
+    def _cells(self, x0: int, z0: int, x1: int, z1: int) -> Iterator[Cell]:
+        for cx in range(int(x0) // self.cell, (int(x1) - 1) // self.cell + 1):
+            for cz in range(int(z0) // self.cell, (int(z1) - 1) // self.cell + 1):
+                yield (cx, cz)
+
+    @staticmethod
+    def _ring(cx: int, cz: int, r: int, bounds: Tuple[int, int, int, int]) -> Iterator[Cell]:
+        """Celdas a distancia de Chebyshev r de (cx, cz) que caen dentro de bounds."""
+        bx0, bz0, bx1, bz1 = bounds
+        if r == 0:
+            if bx0 <= cx <= bx1 and bz0 <= cz <= bz1:
+                yield (cx, cz)
+            return
+        xs = range(max(cx - r, bx0), min(cx + r, bx1) + 1)
+        for z in (cz - r, cz + r):
+            if bz0 <= z <= bz1:
+                for x in xs:
+                    yield (x, z)
+        zs = range(max(cz - r + 1, bz0), min(cz + r - 1, bz1) + 1)
+        for x in (cx - r, cx + r):
+            if bx0 <= x <= bx1:
+                for z in zs:
+                    yield (x, z)
+
+    def _unlink(self, tile: MapTile) -> None:
+        for c in self._cells(tile.x0, tile.z0, tile.x0 + tile.width, tile.z0 + tile.length):
+            keys = self._grid.get(c)
+            if keys is not None:
+                keys.discard(tile.key)
+                if not keys:
+                    del self._grid[c]
+
+    def _grow_bounds(self, c: Cell) -> None:
+        if self._cell_bounds is None:
+            self._cell_bounds = (c[0], c[1], c[0], c[1])
+        else:
+            bx0, bz0, bx1, bz1 = self._cell_bounds
+            self._cell_bounds = (min(bx0, c[0]), min(bz0, c[1]), max(bx1, c[0]), max(bz1, c[1]))
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from mcpi.minecraft import Minecraft
+
+from .world_reads import read_height_columns
+
+CHUNK_SIZE = 16
+
+
+class _Chunk:
+    __slots__ = ("blocks", "heights")
+
+    def __init__(self):
+        self.blocks: Dict[Tuple[int, int, int], Tuple[int, float]] = {}
+        self.heights: Dict[Tuple[int, int], Tuple[int, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.blocks) + len(self.heights)
+
+
+class WorldCache:
+    """Caché compartida de getBlock/getHeight agrupada por chunk de 16x16.
+
+    Los chunks se expulsan por LRU cuando se supera max_entries; cada entrada
+    caduca a los ttl segundos para recoger cambios hechos fuera de los agentes.
+    Las escrituras de los agentes actualizan la caché directamente.
+    """
+
+    def __init__(self, mc: Minecraft, max_entries: int = 200_000, ttl: float = 30.0):
+        self.mc = mc
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._chunks: "OrderedDict[Tuple[int, int], _Chunk]" = OrderedDict()
+        self._entries = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # avisados de cada escritura como (x0, y0, z0, x1, y1, z1, id), p.ej. RegionReader.note_cuboid
+        self._listeners: List[Callable[[int, int, int, int, int, int, int], None]] = []
+
+    def add_write_listener(self, listener: Callable[[int, int, int, int, int, int, int], None]) -> None:
+        self._listeners.append(listener)
+
+    # ---------- lecturas ----------
+
+    def get_block(self, x: int, y: int, z: int) -> int:
+        x, y, z = int(x), int(y), int(z)
+        with self._lock:
+            cached = self._lookup_locked(x, z, "blocks", (x, y, z))
+        if cached is not None:
+            return cached
+        block_id = self.mc.getBlock(x, y, z)
+        with self._lock:
+            self._store_locked(x, z, "blocks", (x, y, z), block_id)
+        return block_id
+
+    def get_height(self, x: int, z: int) -> int:
+        x, z = int(x), int(z)
+        with self._lock:
+            cached = self._lookup_locked(x, z, "heights", (x, z))
+        if cached is not None:
+            return cached
+        height = self.mc.getHeight(x, z)
+        with self._lock:
+            self._store_locked(x, z, "heights", (x, z), height)
+        return height
+
+    def read_heights(self, x0: int, z0: int, width: int, length: int,
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Alturas de un rectángulo (out[i, j] = altura en (x0 + i, z0 + j)).
+
+        Las columnas en caché se sirven de ahí; el resto se piden juntas en una
+        lectura pipelineada y quedan guardadas.
+        """
+        x0, z0 = int(x0), int(z0)
+        if out is None:
+            out = np.empty((width, length), dtype=np.int16)
+        missing = []
+        with self._lock:
+            for i in range(width):
+                for j in range(length):
+                    x, z = x0 + i, z0 + j
+                    cached = self._lookup_locked(x, z, "heights", (x, z))
+                    if cached is None:
+                        missing.append((x, z))
+                    else:
+                        out[i, j] = cached
+        if missing:
+            heights = read_height_columns(self.mc, missing)
+            with self._lock:
+                for (x, z), height in zip(missing, heights):
+                    out[x - x0, z - z0] = height
+                    self._store_locked(x, z, "heights", (x, z), int(height))
+        return out
+
+    # ---------- escrituras ----------
+
+    def set_block(self, x: int, y: int, z: int, block_id: int, data: int = 0) -> None:
+        """Escribe en el mundo y deja la caché al día (write-through)."""
+        self.mc.setBlock(x, y, z, block_id, data)
+        self.note_write(x, y, z, block_id)
+
+    def note_write(self, x: int, y: int, z: int, block_id: int) -> None:
+        """Registra una escritura hecha por otra vía (p.ej. BlockWriter)."""
+        x, y, z = int(x), int(y), int(z)
+        with self._lock:
+            self._store_locked(x, z, "blocks", (x, y, z), int(block_id))
+            # la altura de la columna puede haber cambiado
+            chunk = self._chunks.get(self._key(x, z))
+            if chunk is not None and chunk.heights.pop((x, z), None) is not None:
+                self._entries -= 1
+        for listener in self._listeners:
+            listener(x, y, z, x, y, z, int(block_id))
+
+    def note_cuboid(self, x0: int, y0: int, z0: int, x1: int, y1: int, z1: int, block_id: int) -> None:
+        """note_write para todas las celdas de una caja inclusiva."""
+        x0, x1 = sorted((int(x0), int(x1)))
+        y0, y1 = sorted((int(y0), int(y1)))
+        z0, z1 = sorted((int(z0), int(z1)))
+        with self._lock:
+            for x in range(x0, x1 + 1):
+                for z in range(z0, z1 + 1):
+                    for y in range(y0, y1 + 1):
+                        self._store_locked(x, z, "blocks", (x, y, z), int(block_id))
+                    chunk = self._chunks.get(self._key(x, z))
+                    if chunk is not None and chunk.heights.pop((x, z), None) is not None:
+                        self._entries -= 1
+        for listener in self._listeners:
+            listener(x0, y0, z0, x1, y1, z1, int(block_id))
+
+    def invalidate_chunk(self, x: int, z: int) -> None:
+        with self._lock:
+            chunk = self._chunks.pop(self._key(int(x), int(z)), None)
+            if chunk is not None:
+                self._entries -= len(chunk)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._chunks.clear()
+            self._entries = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "chunks": len(self._chunks),
+                "entries": self._entries,
+            }
+
+    # ---------- internos ----------
+
+    @staticmethod
+    def _key(x: int, z: int) -> Tuple[int, int]:
+        return (x // CHUNK_SIZE, z // CHUNK_SIZE)
+
+    def _lookup_locked(self, x: int, z: int, table: str, key) -> Optional[int]:
+        chunk_key = self._key(x, z)
+        chunk = self._chunks.get(chunk_key)
+        if chunk is not None:
+            entry = getattr(chunk, table).get(key)
+            if entry is not None:
+                value, stamp = entry
+                if time.monotonic() - stamp < self.ttl:
+                    self._chunks.move_to_end(chunk_key)
+                    self.hits += 1
+                    return value
+                del getattr(chunk, table)[key]
+                self._entries -= 1
+        self.misses += 1
+        return None
+
+    def _store_locked(self, x: int, z: int, table: str, key, value: int) -> None:
+        chunk_key = self._key(x, z)
+        chunk = self._chunks.get(chunk_key)
+        if chunk is None:
+            chunk = self._chunks[chunk_key] = _Chunk()
+        else:
+            self._chunks.move_to_end(chunk_key)
+        entries = getattr(chunk, table)
+        if key not in entries:
+            self._entries += 1
+        entries[key] = (value, time.monotonic())
+
+        while self._entries > self.max_entries and len(self._chunks) > 1:
+            _, old = self._chunks.popitem(last=False)
+            self._entries -= len(old)
+            self.evictions += 1
@@ -3,7 +3,15 @@ from .BuilderBot import BuilderBot
 from .ExplorerBot import ExplorerBot
 from .MinerBot import MinerBot  # si todavía no existe, comenta esta línea
 from .Message import Message
-from .MessageBus import MessageBus
+from .MessageBus import MessageBus, OverflowPolicy
+from .BlockWriter import BlockWriter
+from .ConnectionPool import ConnectionPool, PooledMinecraft
+from .WorldCache import WorldCache
+from .HeightmapStore import HeightmapStore
+from .TileIndex import TileIndex
+from .BuildCheckpoint import BuildCheckpoint
+from .CoverageMap import CoverageMap
+from .ProspectIndex import ProspectIndex, Prospector
 
 __all__ = [
     "BaseAgent",
@@ -12,4 +20,15 @@ __all__ = [
     "MinerBot",
     "Message",
     "MessageBus",
+    "OverflowPolicy",
+    "BlockWriter",
+    "ConnectionPool",
+    "PooledMinecraft",
+    "WorldCache",
+    "HeightmapStore",
+    "TileIndex",
+    "BuildCheckpoint",
+    "CoverageMap",
+    "ProspectIndex",
+    "Prospector",
 ]
\ No newline at end of file
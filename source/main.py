@@ -1,17 +1,35 @@
 from source import BaseAgent, BuilderBot, ExplorerBot, MinerBot
-from source.read_schematic import read_blocks
+from source.read_schematic import load_blocks_cached
 from mcpi.minecraft import Minecraft
 import mcpi.block as block
 import time
 from mcpi.vec3 import Vec3
 import threading
 from .MessageBus import MessageBus
+from .BlockWriter import BlockWriter
+from .ConnectionPool import ConnectionPool
+from .WorldCache import WorldCache
+from .HeightmapStore import HeightmapStore
+from .BuildCheckpoint import BuildCheckpoint
+from .CoverageMap import CoverageMap
+from .ProspectIndex import ProspectIndex, Prospector
 from .Message import Message
 from datetime import datetime, timezone
+import os
 
 
-mc = Minecraft.create ()
-datos = read_blocks(r"C:\URV\TAP\AdventuresInMinecraft-PC-master\AdventuresInMinecraft-PC-master\MyAdventures\Dream Survival House - (mcbuild_org).schematic")
+# rutas relativas a este fichero: main se lanza como `python -m source.main` desde la raíz
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MAPAS_DIR = os.path.join(BASE_DIR, "mapas")
+STORE_DIR = os.path.join(MAPAS_DIR, "store")
+
+# una conexión por hilo de agente en lugar de un único socket compartido; el
+# Prospector la toma chunk a chunk y el hilo principal la suelta antes de arrancar
+# a los agentes, pero se reserva hueco para todos a la vez
+POOL_THREADS = ("main", "BlockWriter", "BuilderBot", "ExplorerBot", "MinerBot", "Prospector")
+pool = ConnectionPool(size=len(POOL_THREADS))
+mc = pool.client()
+datos = load_blocks_cached(r"C:\URV\TAP\AdventuresInMinecraft-PC-master\AdventuresInMinecraft-PC-master\MyAdventures\Dream Survival House - (mcbuild_org).schematic")
 """
 #def place_block():
 original_pos = mc.player.getTilePos() + Vec3(5,0,0)
@@ -29,10 +47,10 @@ while(1):
     if(events != 0):
         print(f"{events}")
 
-for bloque in datos:
-    pos = original_pos + bloque[0]
-    tipo = bloque[1]
-    print(f"pos: {bloque[0]} tipo: {bloque[1]}\n")
+for bloque in datos.to_plan():
+    pos = original_pos + bloque["offset"]
+    tipo = bloque["id"]
+    print(f"pos: {bloque['offset']} tipo: {bloque['id']}\n")
 
     mc.postToChat(" Hello Minecraft World ")
     mc.setBlock(pos.x + 3, pos.y ,pos.z , tipo)
@@ -40,6 +58,19 @@ for bloque in datos:
 
 # Plan muy simple: una línea de 5 bloques de piedra delante del bot
 bus = MessageBus()
+writer = BlockWriter(mc)
+writer.start()
+cache = WorldCache(mc)
+heightmaps = HeightmapStore(STORE_DIR)
+heightmaps.migrate_dir(MAPAS_DIR)  # volcados antiguos mapas/alturas_*, solo la primera vez
+coverage_path = os.path.join(STORE_DIR, "cobertura.npz")
+coverage = CoverageMap.load(coverage_path) if os.path.exists(coverage_path) else CoverageMap()
+prospects_path = os.path.join(STORE_DIR, "menas.npz")
+prospects = ProspectIndex.load(prospects_path) if os.path.exists(prospects_path) else ProspectIndex()
+# escaneo subterráneo en segundo plano, chunk a chunk alrededor del jugador
+player = mc.player.getTilePos()
+prospector = Prospector(mc, prospects, player.x, player.z, player.y - 64, player.y - 1)
+prospector.start()
 
 plan = []
 for dx in range(5):
@@ -56,7 +87,23 @@ builder = BuilderBot(
     agent_id=2,  # ← AÑADIR ID ÚNICO (ej: 1 para miner, 2 para builder)
     bus=bus,
     build_plan=plan,
-    tick_time=0.1
+    tick_time=0.1,
+    writer=writer,
+    blocks_per_tick=64,
+    cache=cache,
+    heightmaps=heightmaps,
+    checkpoint=BuildCheckpoint(os.path.join(MAPAS_DIR, "checkpoints", "builder.jsonl"))  # reanuda si se cortó a medias
+)
+
+# atiende las peticiones de materiales del BuilderBot yendo primero a las menas indexadas
+miner = MinerBot(
+    mc=mc,
+    start_pos=mc.player.getTilePos(),
+    id=1,
+    bus=bus,
+    writer=writer,
+    cache=cache,
+    prospects=prospects
 )
 
 agent = ExplorerBot(
@@ -65,10 +112,16 @@ agent = ExplorerBot(
     agent_id=3,  # ID único (ej: 3 para explorer)
     bus=bus,     # Necesitas el MessageBus
     stepp=5,
-    radius=5
+    radius=5,
+    cache=cache,
+    heightmaps=heightmaps,
+    coverage=coverage
 )
+# el hilo principal ya no habla con el servidor: su conexión vuelve al pool
+mc.release_thread()
 agent.start()
 builder.start()
+miner.start()
 message = Message(
     payload={"command": "START"},  # Comando en el payload
     type="control",
@@ -83,12 +136,20 @@ builder.join()
 agent.join()
 agent.stop()
 builder.stop()
+miner.stop()
+miner.join()
+writer.stop()
+prospector.stop()
+prospects.save(prospects_path)
+coverage.save(coverage_path)
+heightmaps.close()
+pool.close()
 
 
 
 """# En tu main:
 
-agent = MinerBot(mc, mc.player.getTilePos(),3,bus, 5)
+agent = MinerBot(mc, mc.player.getTilePos(),3,bus, 5, prospects=prospects)
 agent.start()
 print("message send")
 message = Message(
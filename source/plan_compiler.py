@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from .BlockWriter import Cell, merge_cuboids
+from .read_schematic import SchematicBlocks
+
+# (x0, y0, z0, x1, y1, z1, id, data) en offsets relativos al sitio, inclusivo
+Command = Tuple[int, int, int, int, int, int, int, int]
+
+
+@dataclass
+class CompiledPlan:
+    commands: List[Command] = field(default_factory=list)
+    block_count: int = 0
+
+    @property
+    def command_count(self) -> int:
+        return len(self.commands)
+
+    @property
+    def compression_ratio(self) -> float:
+        """Bloques por comando: 1.0 = sin ganancia."""
+        return self.block_count / self.command_count if self.commands else 1.0
+
+    @staticmethod
+    def volume(cmd: Command) -> int:
+        x0, y0, z0, x1, y1, z1 = cmd[:6]
+        return (x1 - x0 + 1) * (y1 - y0 + 1) * (z1 - z0 + 1)
+
+    def report(self) -> str:
+        return (f"{self.block_count} bloques -> {self.command_count} comandos "
+                f"(x{self.compression_ratio:.1f})")
+
+
+def _cells_from_plan(plan) -> Dict[Cell, Tuple[int, int]]:
+    """Celda -> (id, data); si una celda se repite manda la última entrada, como al construir."""
+    if isinstance(plan, SchematicBlocks):
+        return {
+            (x, y, z): (block_id, data)
+            for x, y, z, block_id, data in zip(
+                plan.x.tolist(), plan.y.tolist(), plan.z.tolist(),
+                plan.ids.tolist(), plan.data.tolist(),
+            )
+        }
+    cells = {}
+    for entry in plan:
+        offset = entry["offset"]
+        cells[(int(offset.x), int(offset.y), int(offset.z))] = (int(entry["id"]), int(entry.get("data", 0)))
+    return cells
+
+
+def compile_plan(plan) -> CompiledPlan:
+    """Convierte un build_plan (lista de dicts) o un SchematicBlocks en cuboides setBlocks.
+
+    Las celdas se agrupan por (id, data) y cada grupo se trocea en cajas con
+    merge_cuboids. Los comandos salen ordenados de abajo arriba para que cada
+    capa tenga apoyo al colocarse.
+    """
+    cells = _cells_from_plan(plan)
+    by_block: Dict[Tuple[int, int], List[Cell]] = {}
+    for cell, key in cells.items():
+        by_block.setdefault(key, []).append(cell)
+
+    commands: List[Command] = []
+    for (block_id, data), group in by_block.items():
+        for box in merge_cuboids(group):
+            commands.append(box + (block_id, data))
+    commands.sort(key=lambda c: (c[1], c[4], c[2], c[0]))
+    return CompiledPlan(commands=commands, block_count=len(cells))
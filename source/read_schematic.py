@@ -3,28 +3,137 @@ from mcpi.minecraft import Minecraft
 import mcpi.block as block
 import time
 from mcpi.vec3 import Vec3
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple
+import hashlib
+import json
+import os
+import numpy as np
 
-def read_blocks(schematic_path):
-    schem = nbtlib.load(schematic_path)
-    blocks = schem['Blocks']
+# subir si cambia lo que produce load_blocks: invalida las cachés existentes
+LOADER_VERSION = 1
+CACHE_DIRNAME = ".schematic_cache"
+_RECORD = np.dtype([("x", "<i2"), ("y", "<i2"), ("z", "<i2"), ("id", "<u2"), ("data", "u1")])
+
+
+@dataclass(frozen=True)
+class SchematicBlocks:
+    """Bloques no-aire de un schematic como estructura de arrays."""
+    width: int
+    height: int
+    length: int
+    x: np.ndarray       # int16
+    y: np.ndarray       # int16
+    z: np.ndarray       # int16
+    ids: np.ndarray     # uint16 (Blocks + AddBlocks)
+    data: np.ndarray    # uint8 (nibble bajo de Data)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def to_plan(self) -> list:
+        """Plan en el formato de BuilderBot.build_plan."""
+        return [
+            {"offset": Vec3(x, y, z), "id": block_id, "data": data}
+            for x, y, z, block_id, data in zip(
+                self.x.tolist(), self.y.tolist(), self.z.tolist(),
+                self.ids.tolist(), self.data.tolist(),
+            )
+        ]
+
+
+def _volumes(schem) -> Tuple[int, int, int, np.ndarray, np.ndarray]:
+    """Blocks y Data como arrays [y, z, x] (el orden del formato schematic)."""
     width  = int(schem['Width'])
     height = int(schem['Height'])
     length = int(schem['Length'])
+    shape = (height, length, width)
+
+    ids = np.asarray(schem['Blocks']).view(np.uint8).astype(np.uint16)
+    if 'AddBlocks' in schem:
+        # dos nibbles por byte; los índices pares van en el nibble alto
+        add = np.asarray(schem['AddBlocks']).view(np.uint8)
+        nibbles = np.empty(add.size * 2, dtype=np.uint16)
+        nibbles[0::2] = add >> 4
+        nibbles[1::2] = add & 0x0F
+        ids |= nibbles[:ids.size] << 8
+
+    if 'Data' in schem:
+        data = np.asarray(schem['Data']).view(np.uint8) & 0x0F
+    else:
+        data = np.zeros(ids.size, dtype=np.uint8)
+    return width, height, length, ids.reshape(shape), data.reshape(shape)
+
+
+def load_blocks(schematic_path) -> SchematicBlocks:
+    """Carga un schematic descartando el aire de entrada, sin bucles en Python."""
+    width, height, length, ids, data = _volumes(nbtlib.load(schematic_path))
+    ys, zs, xs = np.nonzero(ids)
+    return SchematicBlocks(
+        width=width, height=height, length=length,
+        x=xs.astype(np.int16), y=ys.astype(np.int16), z=zs.astype(np.int16),
+        ids=ids[ys, zs, xs], data=data[ys, zs, xs].astype(np.uint8),
+    )
 
-    # Recorrer todos los bloques
-    datos = []
+
+def load_blocks_cached(schematic_path, cache_dir: Optional[str] = None) -> SchematicBlocks:
+    """load_blocks con caché en disco indexada por el hash del contenido.
+
+    La primera vez se parsea el NBT y se guarda un .npy de registros
+    (x, y, z, id, data) junto a un .json con hash, versión y dimensiones;
+    las siguientes se abre el .npy con mmap, sin pasar por nbtlib.
+    """
+    with open(schematic_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(schematic_path)), CACHE_DIRNAME)
+    base = os.path.join(cache_dir, f"{digest}.v{LOADER_VERSION}")
+
+    try:
+        with open(base + ".json", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["sha256"] == digest and meta["version"] == LOADER_VERSION:
+            records = np.load(base + ".npy", mmap_mode="r")
+            return SchematicBlocks(
+                width=meta["width"], height=meta["height"], length=meta["length"],
+                x=records["x"], y=records["y"], z=records["z"],
+                ids=records["id"], data=records["data"],
+            )
+    except (OSError, ValueError, KeyError):
+        pass  # sin caché o caché corrupta: se regenera
+
+    blocks = load_blocks(schematic_path)
+    records = np.empty(len(blocks), dtype=_RECORD)
+    records["x"], records["y"], records["z"] = blocks.x, blocks.y, blocks.z
+    records["id"], records["data"] = blocks.ids, blocks.data
+
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(base + ".npy", records)
+    # el .json se escribe al final: si existe, el .npy está completo
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump({
+            "sha256": digest,
+            "version": LOADER_VERSION,
+            "source": os.path.basename(schematic_path),
+            "width": blocks.width, "height": blocks.height, "length": blocks.length,
+            "count": len(blocks),
+        }, f)
+    return blocks
+
+
+def iter_blocks(schematic_path) -> Iterator[Tuple[int, int, int, int, int]]:
+    """Versión perezosa: produce (x, y, z, id, data) capa a capa, sin aire."""
+    width, height, length, ids, data = _volumes(nbtlib.load(schematic_path))
     for y in range(height):
-        for z in range(length):
-            for x in range(width):
-                idx = y * length * width + z * width + x
-                tipo = blocks[idx]
-                # Ensure numeric types are plain ints for downstream use
-                if hasattr(tipo, 'value'):  # nbtlib tag objects
-                    tipo = int(tipo)
-                else:
-                    try:
-                        tipo = int(tipo)
-                    except Exception:
-                        pass
-                datos.append([Vec3(x,y,z), tipo])
-    return datos
\ No newline at end of file
+        zs, xs = np.nonzero(ids[y])
+        yield from zip(xs.tolist(), [y] * len(xs), zs.tolist(),
+                       ids[y, zs, xs].tolist(), data[y, zs, xs].tolist())
+
+
+def read_blocks(schematic_path):
+    width, height, length, ids, _ = _volumes(nbtlib.load(schematic_path))
+
+    # Recorrer todos los bloques (aire incluido), en el mismo orden y, z, x
+    ys, zs, xs = np.indices((height, length, width)).reshape(3, -1).tolist()
+    tipos = ids.reshape(-1).tolist()
+    return [[Vec3(x, y, z), tipo] for x, y, z, tipo in zip(xs, ys, zs, tipos)]
@@ -25,6 +25,44 @@ RECETAS = {
 
     # --- LUZ / COMBUSTIBLE ---
 
+    # picar mena de carbón -> 1 carbón
+    "coal_from_coal_ore": {
+        "outputs": [
+            {"tipo": "item", "id": "coal", "data": 0, "cantidad": 1}
+        ],
+        "inputs": [
+            {"tipo": "block", "id": block.COAL_ORE.id, "data": 0, "cantidad": 1}
+        ],
+    },
+
+    # combustible: recetas alternativas para el mismo "fuel"
+    "fuel_from_coal": {
+        "outputs": [
+            {"tipo": "item", "id": "fuel", "data": 0, "cantidad": 1}
+        ],
+        "inputs": [
+            {"tipo": "item", "id": "coal", "data": 0, "cantidad": 1}
+        ],
+    },
+
+    "fuel_from_charcoal": {
+        "outputs": [
+            {"tipo": "item", "id": "fuel", "data": 0, "cantidad": 1}
+        ],
+        "inputs": [
+            {"tipo": "item", "id": "charcoal", "data": 0, "cantidad": 1}
+        ],
+    },
+
+    "fuel_from_planks": {
+        "outputs": [
+            {"tipo": "item", "id": "fuel", "data": 0, "cantidad": 1}
+        ],
+        "inputs": [
+            {"tipo": "item", "id": "planks", "data": 0, "cantidad": 4}
+        ],
+    },
+
     # 1 carbón + 1 palo -> 4 antorchas
     "torch_from_coal_and_stick": {
         "outputs": [
@@ -62,7 +100,7 @@ RECETAS = {
     # 8 roca -> 1 horno
     "furnace_from_cobblestone": {
         "outputs": [
-            {"tipo": "block", "id": block.FURNACE.id, "data": 0, "cantidad": 1}
+            {"tipo": "block", "id": block.FURNACE_INACTIVE.id, "data": 0, "cantidad": 1}
         ],
         "inputs": [
             {"tipo": "block", "id": block.COBBLESTONE.id, "data": 0, "cantidad": 8}
@@ -119,7 +157,7 @@ RECETAS = {
     # 6 tablones -> 4 escaleras de madera
     "stairs_wood_from_planks": {
         "outputs": [
-            {"tipo": "block", "id": block.WOOD_STAIRS.id, "data": 0, "cantidad": 4}
+            {"tipo": "block", "id": block.STAIRS_WOOD.id, "data": 0, "cantidad": 4}
         ],
         "inputs": [
             {"tipo": "item", "id": "planks", "data": 0, "cantidad": 6}
@@ -192,4 +230,17 @@ RECETAS = {
             {"tipo": "item",  "id": "fuel",       "data": 0, "cantidad": 1},
         ],
     },
-}
\ No newline at end of file
+}
+
+# items de las recetas que en el mundo son un bloque (el plan usa ids de bloque)
+ITEM_BLOQUE = {
+    "planks": block.WOOD_PLANKS.id,
+    "chest": block.CHEST.id,
+    "bed": block.BED.id,
+    "door_wood": block.DOOR_WOOD.id,
+    "glass_pane": block.GLASS_PANE.id,
+    "fence_wood": block.FENCE.id,
+    "fence_gate": block.FENCE_GATE.id,
+    "stone_slab": block.STONE_SLAB.id,
+    "wool": block.WOOL.id,
+}
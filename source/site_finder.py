@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .HeightmapStore import NODATA, HeightmapStore
+
+
+def sliding_extreme(a: np.ndarray, window: int, axis: int, op) -> np.ndarray:
+    """Máximo/mínimo deslizante en O(n) independiente de la ventana (van Herk / Gil-Werman).
+
+    op es np.maximum o np.minimum. El resultado tiene n - window + 1 posiciones en axis.
+    """
+    a = np.moveaxis(a, axis, 0)
+    n = a.shape[0]
+    out_n = n - window + 1
+    if out_n <= 0:
+        return np.moveaxis(np.empty((0,) + a.shape[1:], dtype=a.dtype), 0, axis)
+
+    info = np.iinfo(a.dtype)
+    fill = info.min if op is np.maximum else info.max
+    pad = (-n) % window
+    padded = np.concatenate([a, np.full((pad,) + a.shape[1:], fill, dtype=a.dtype)], axis=0)
+    blocks = padded.reshape((-1, window) + a.shape[1:])
+    prefix = op.accumulate(blocks, axis=1).reshape(padded.shape)
+    suffix = op.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(padded.shape)
+    result = op(suffix[:out_n], prefix[window - 1:window - 1 + out_n])
+    return np.moveaxis(result, 0, axis)
+
+
+def window_sum(mask: np.ndarray, width: int, length: int) -> np.ndarray:
+    """Suma de cada ventana width x length con una tabla de áreas sumadas."""
+    sat = np.zeros((mask.shape[0] + 1, mask.shape[1] + 1), dtype=np.int64)
+    sat[1:, 1:] = mask.cumsum(axis=0).cumsum(axis=1)
+    return (sat[width:, length:] - sat[:-width, length:]
+            - sat[width:, :-length] + sat[:-width, :-length])
+
+
+def window_stats(heights: np.ndarray, width: int, length: int):
+    """(mínimo, máximo, columnas sin datos) de cada ventana width x length."""
+    h = np.asarray(heights, dtype=np.int32)
+    missing = h == NODATA
+    hi = np.where(missing, np.iinfo(np.int32).min, h)
+    lo = np.where(missing, np.iinfo(np.int32).max, h)
+    win_max = sliding_extreme(sliding_extreme(hi, width, 0, np.maximum), length, 1, np.maximum)
+    win_min = sliding_extreme(sliding_extreme(lo, width, 0, np.minimum), length, 1, np.minimum)
+    return win_min, win_max, window_sum(missing, width, length)
+
+
+def find_sites(
+    heights: np.ndarray,
+    width: int,
+    length: int,
+    tolerance: int = 2,
+    origin: Tuple[int, int] = (0, 0),
+    limit: Optional[int] = None,
+) -> List[Tuple[int, int, int]]:
+    """Sitios (x, y, z) donde la huella width x length cabe con max - min <= tolerance.
+
+    heights[i, j] es la altura de (origin[0] + i, origin[1] + j). x, z es la
+    esquina mínima de la huella e y = altura máxima bajo ella + 1, es decir,
+    la primera capa libre. Las ventanas con NODATA se descartan.
+
+    Con limit se devuelven como mucho limit sitios que no se solapan, del más
+    plano al menos plano, en lugar de todas las ventanas válidas.
+    """
+    h = np.asarray(heights)
+    if h.ndim != 2 or h.shape[0] < width or h.shape[1] < length:
+        return []
+    win_min, win_max, missing = window_stats(h, width, length)
+    spread = win_max - win_min
+    ok = (missing == 0) & (spread <= tolerance)
+    ii, jj = np.nonzero(ok)
+    if limit is not None:
+        ii, jj = _flattest_disjoint(ii, jj, spread[ii, jj], width, length, limit)
+    ys = win_max[ii, jj] + 1
+    x0, z0 = origin
+    return list(zip((ii + x0).tolist(), ys.tolist(), (jj + z0).tolist()))
+
+
+def _flattest_disjoint(ii: np.ndarray, jj: np.ndarray, spread: np.ndarray,
+                       width: int, length: int, limit: int):
+    """Elige de forma voraz hasta limit ventanas sin solape, las más planas primero."""
+    chosen_i: List[int] = []
+    chosen_j: List[int] = []
+    for k in np.lexsort((jj, ii, spread)).tolist():
+        if len(chosen_i) >= limit:
+            break
+        i, j = int(ii[k]), int(jj[k])
+        if all(abs(i - ci) >= width or abs(j - cj) >= length for ci, cj in zip(chosen_i, chosen_j)):
+            chosen_i.append(i)
+            chosen_j.append(j)
+    return np.array(chosen_i, dtype=np.intp), np.array(chosen_j, dtype=np.intp)
+
+
+def find_sites_in_store(
+    store: HeightmapStore,
+    width: int,
+    length: int,
+    tolerance: int = 2,
+    region: Optional[Tuple[int, int, int, int]] = None,
+) -> List[Tuple[int, int, int]]:
+    """Como find_sites sobre el almacén de alturas.
+
+    region es (x0, z0, x1, z1) exclusivo; por defecto se busca en todo lo explorado.
+    """
+    if region is None:
+        region = store.bounds()
+        if region is None:
+            return []
+    x0, z0, x1, z1 = region
+    heights = store.read(x0, z0, x1 - x0, z1 - z0)
+    return find_sites(heights, width, length, tolerance, origin=(x0, z0))
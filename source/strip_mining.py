@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# (x0, y0, z0, x1, y1, z1) inclusivo
+Tunnel = Tuple[int, int, int, int, int, int]
+Cell = Tuple[int, int, int]
+
+
+def tune_spacing(min_vein: int = 1) -> int:
+    """Separación entre ramales (de eje a eje) para no dejar pasar vetas de min_vein bloques.
+
+    Entre dos túneles quedan spacing - 1 bloques; los de los extremos quedan
+    expuestos y los del medio no, así que una veta más estrecha que ese hueco
+    oculto puede escaparse. Con spacing = min_vein + 2 no hay hueco suficiente
+    y, a la vez, ninguna pared se expone dos veces.
+
+    La separación es fija a propósito: con spacing >= 3 ninguna pared se
+    comparte, así que exposure_per_block de StripMine se queda en unos
+    2 + 2 / height sea cual sea la separación, y ore_per_block refleja la
+    roca, no la separación. Esas cifras alimentan estimate_blocks.
+    """
+    return max(2, min_vein + 2)
+
+
+def _segments(x0: int, z0: int, x1: int, z1: int, y: int, height: int, segment: int) -> List[Tunnel]:
+    """Parte un túnel recto (en x o en z) en tramos de como mucho segment bloques."""
+    out = []
+    if x0 == x1:
+        step = 1 if z1 >= z0 else -1
+        for a in range(z0, z1 + step, step * segment):
+            b = a + step * (segment - 1)
+            b = min(b, z1) if step > 0 else max(b, z1)
+            out.append((x0, y, min(a, b), x0, y + height - 1, max(a, b)))
+    else:
+        step = 1 if x1 >= x0 else -1
+        for a in range(x0, x1 + step, step * segment):
+            b = a + step * (segment - 1)
+            b = min(b, x1) if step > 0 else max(b, x1)
+            out.append((min(a, b), y, z0, max(a, b), y + height - 1, z0))
+    return out
+
+
+def plan_branch_mine(x: int, y: int, z: int, branches: int = 8, branch_length: int = 32,
+                     spacing: Optional[int] = None, height: int = 2, segment: int = 16,
+                     trunk_from: Optional[int] = None) -> List[Tunnel]:
+    """Túneles de una mina en espina de pez a la altura y, en el orden en que se excavan.
+
+    Un pasillo central avanza en +x; el primer ramal sale en x y los demás
+    cada spacing bloques, uno hacia +z y otro hacia -z, de branch_length
+    bloques. El pasillo empieza en trunk_from (por defecto x): para continuar
+    una mina anterior se pasa el bloque siguiente a su último ramal, que es lo
+    que devuelve next_branch_mine. Todo se devuelve troceado en tramos de
+    segment bloques, un setBlocks cada uno, con x0 creciente.
+    """
+    spacing = spacing or tune_spacing()
+    plan: List[Tunnel] = []
+    trunk_x = x if trunk_from is None else trunk_from
+    for i in range(branches):
+        bx = x + i * spacing
+        plan.extend(_segments(trunk_x, z, bx, z, y, height, segment))  # pasillo hasta el ramal
+        trunk_x = bx + 1
+        plan.extend(_segments(bx, z + 1, bx, z + branch_length, y, height, segment))
+        plan.extend(_segments(bx, z - 1, bx, z - branch_length, y, height, segment))
+    return plan
+
+
+def next_branch_mine(x: int, branches: int, spacing: int) -> Tuple[int, int]:
+    """(x del primer ramal, trunk_from) del plan que continúa uno que empezaba en x."""
+    last = x + (branches - 1) * spacing
+    return last + spacing, last + 1
+
+
+def shell_box(t: Tunnel) -> Tunnel:
+    """Caja del túnel ampliada un bloque por cada lado (suelo, techo y paredes)."""
+    x0, y0, z0, x1, y1, z1 = t
+    return (x0 - 1, y0 - 1, z0 - 1, x1 + 1, y1 + 1, z1 + 1)
+
+
+class StripMine:
+    """Plan de excavación pendiente y estadística de exposición.
+
+    mined cuenta bloques sólidos retirados; exposed, bloques sólidos que han
+    quedado con una cara al aire de la mina (cada uno una sola vez). Su
+    cociente y el mineral por bloque minado permiten estimar cuánto hay que
+    excavar para un pedido grande.
+
+    Los túneles se excavan con x0 creciente (como los de plan_branch_mine),
+    así que las celdas por detrás del frente ya no las toca ninguna envoltura
+    futura y se olvidan: la memoria no crece con la longitud de la mina.
+    """
+
+    def __init__(self, tunnels: List[Tunnel]):
+        self.pending: Deque[Tunnel] = deque(tunnels)
+        self.mined = 0
+        self.exposed = 0
+        self.ore = 0
+        self._opened: Set[Cell] = set()    # celdas ya abiertas por la mina
+        self._seen: Set[Cell] = set()      # celdas ya contadas como expuestas
+        self._front: Optional[int] = None  # x mínima que aún puede tocar una envoltura
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def next_tunnel(self) -> Optional[Tunnel]:
+        return self.pending.popleft() if self.pending else None
+
+    def record(self, tunnel: Tunnel, shell: np.ndarray,
+               is_target: Callable[[int], bool]) -> Tuple[Dict[int, int], List[Cell]]:
+        """Anota un túnel leído junto con su envoltura (shell = read_cuboid de shell_box).
+
+        Devuelve (mineral dentro del túnel por id, celdas de mineral objetivo
+        expuestas en paredes, suelo y techo que aún no se han abierto).
+        """
+        self._prune(tunnel)
+        sx, sy, sz = shell_box(tunnel)[:3]
+        inner = shell[1:-1, 1:-1, 1:-1]
+        ore: Dict[int, int] = {}
+        ids, counts = np.unique(inner, return_counts=True)
+        for block_id, count in zip(ids.tolist(), counts.tolist()):
+            if block_id != 0:
+                self.mined += count
+            if is_target(block_id):
+                ore[block_id] = count
+        x0, y0, z0, x1, y1, z1 = tunnel
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for cz in range(z0, z1 + 1):
+                    self._opened.add((cx, cy, cz))
+
+        # vecinos por cara del túnel: fuera del interior en exactamente un eje
+        nx, ny, nz = shell.shape
+        gx, gy, gz = np.meshgrid(np.arange(nx), np.arange(ny), np.arange(nz), indexing="ij")
+        outside = ((gx == 0) | (gx == nx - 1)).astype(int) + ((gy == 0) | (gy == ny - 1)) + ((gz == 0) | (gz == nz - 1))
+        exposed_ore: List[Cell] = []
+        for i, j, k in np.argwhere((outside == 1) & (shell != 0)).tolist():
+            cell = (sx + i, sy + j, sz + k)
+            if cell in self._opened or cell in self._seen:
+                continue
+            self._seen.add(cell)
+            self.exposed += 1
+            if is_target(int(shell[i, j, k])):
+                exposed_ore.append(cell)
+        self.ore += sum(ore.values()) + len(exposed_ore)
+        return ore, exposed_ore
+
+    def _prune(self, tunnel: Tunnel) -> None:
+        front = min([tunnel[0]] + [t[0] for t in self.pending]) - 1
+        if self._front is not None and front <= self._front:
+            return
+        self._front = front
+        self._opened = {c for c in self._opened if c[0] >= front}
+        self._seen = {c for c in self._seen if c[0] >= front}
+
+    def tracked_cells(self) -> int:
+        """Celdas que se recuerdan ahora mismo (abiertas + contadas como expuestas)."""
+        return len(self._opened) + len(self._seen)
+
+    def open_cells(self, cells: List[Cell]) -> None:
+        """Marca como abiertas celdas extraídas fuera de los túneles (mineral de las paredes)."""
+        self._opened.update(cells)
+        self.mined += len(cells)
+
+    @property
+    def exposure_per_block(self) -> float:
+        return self.exposed / self.mined if self.mined else 0.0
+
+    @property
+    def ore_per_block(self) -> float:
+        return self.ore / self.mined if self.mined else 0.0
+
+    def estimate_blocks(self, ore_needed: int) -> Optional[int]:
+        """Bloques a excavar para ore_needed minerales al ritmo observado (None sin datos)."""
+        if self.ore == 0:
+            return None
+        return int(np.ceil(ore_needed / self.ore_per_block))
+
+    def stats(self) -> dict:
+        return {
+            "pending_tunnels": len(self.pending),
+            "mined": self.mined,
+            "exposed": self.exposed,
+            "ore": self.ore,
+            "exposure_per_block": self.exposure_per_block,
+            "ore_per_block": self.ore_per_block,
+        }
@@ -2,6 +2,7 @@ from mcpi.minecraft import Minecraft
 import mcpi.block as block
 import time
 from mcpi.vec3 import Vec3
+from source.BlockWriter import BlockWriter
 
 # Definimos una base para estrategias
 class BlockPlacementStrategy:
@@ -21,10 +22,12 @@ class ClassicOffsetsStrategy(BlockPlacementStrategy):
 # Ejemplo de una nueva estrategia extensible
 class FloorStrategy(BlockPlacementStrategy):
     def place(self, mc, original_pos):
+        writer = BlockWriter(mc)
         for dx in range(-2, 3):
             for dz in range(-2, 3):
                 pos = original_pos + Vec3(dx, -1, dz)
-                mc.setBlock(pos.x, pos.y, pos.z, block.GRASS.id)
+                writer.set_block(pos.x, pos.y, pos.z, block.GRASS.id)
+        writer.flush()  # las 25 celdas salen como un único setBlocks
 
 # Reflexivamente descubre todas las clases que heredan BlockPlacementStrategy
 def discover_strategies():
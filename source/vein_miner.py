@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+from .world_reads import RegionReader
+
+Cell = Tuple[int, int, int]
+
+_NEIGHBOURS = ((1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1))
+
+
+def ore_cells(reader: RegionReader, x: int, y: int, z: int, targets: Iterable[int]) -> List[Cell]:
+    """Celdas con un id objetivo dentro del cubo que contiene (x, y, z), la más cercana primero."""
+    (x0, y0, z0), arr = reader.cube_at(x, y, z)
+    found = np.argwhere(np.isin(arr, list(targets)))
+    if found.size == 0:
+        return []
+    dist2 = ((found - (x - x0, y - y0, z - z0)) ** 2).sum(axis=1)
+    found = found[np.argsort(dist2, kind="stable")]
+    return [(x0 + int(i), y0 + int(j), z0 + int(k)) for i, j, k in found]
+
+
+def flood_fill(reader: RegionReader, seed: Cell, limit: int, visited: Set[Cell]) -> List[Cell]:
+    """Cuerpo de mena conexo (vecindad 6) del mismo id que seed, hasta limit celdas.
+
+    Los vecinos se consultan en el RegionReader, así que cada cubo de la
+    zona se lee una sola vez aunque la veta cruce varios.
+    """
+    block_id = reader.get(*seed)
+    vein: List[Cell] = []
+    queue = deque([seed])
+    visited.add(seed)
+    while queue and len(vein) < limit:
+        x, y, z = cell = queue.popleft()
+        vein.append(cell)
+        for dx, dy, dz in _NEIGHBOURS:
+            n = (x + dx, y + dy, z + dz)
+            if n not in visited and reader.get(*n) == block_id:
+                visited.add(n)
+                queue.append(n)
+    return vein
+
+
+def find_veins(reader: RegionReader, x: int, y: int, z: int,
+               remaining: Callable[[int], int]) -> Dict[int, List[Cell]]:
+    """Vetas de ids objetivo que empiezan en el cubo de (x, y, z).
+
+    remaining(id) dice cuántos bloques de ese id faltan; ningún id se
+    extrae por encima de lo que falta.
+    """
+    (x0, y0, z0), arr = reader.cube_at(x, y, z)
+    ids = [int(i) for i in np.unique(arr) if remaining(int(i)) > 0]
+    veins: Dict[int, List[Cell]] = {}
+    visited: Set[Cell] = set()
+    for seed in ore_cells(reader, x, y, z, ids):
+        if seed in visited:
+            continue
+        block_id = reader.get(*seed)
+        left = remaining(block_id) - len(veins.get(block_id, ()))
+        if left <= 0:
+            continue
+        veins.setdefault(block_id, []).extend(flood_fill(reader, seed, left, visited))
+    return veins
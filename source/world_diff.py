@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import numpy as np
+from mcpi.vec3 import Vec3
+
+from .read_schematic import SchematicBlocks
+from .world_reads import read_cuboid
+
+
+def plan_arrays(plan) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(offsets (n, 3), ids, data) de un build_plan o SchematicBlocks; la última entrada de cada celda manda."""
+    if isinstance(plan, SchematicBlocks):
+        offsets = np.stack([plan.x, plan.y, plan.z], axis=1).astype(np.int32)
+        return offsets, np.asarray(plan.ids, dtype=np.int32), np.asarray(plan.data, dtype=np.int32)
+
+    cells = {}
+    for entry in plan:
+        o = entry["offset"]
+        cells[(int(o.x), int(o.y), int(o.z))] = (int(entry["id"]), int(entry.get("data", 0)))
+    if not cells:
+        return np.empty((0, 3), np.int32), np.empty(0, np.int32), np.empty(0, np.int32)
+    offsets = np.array(list(cells), dtype=np.int32)
+    values = np.array(list(cells.values()), dtype=np.int32)
+    return offsets, values[:, 0], values[:, 1]
+
+
+def diff_plan(mc, site: Vec3, plan) -> List[dict]:
+    """Entradas del plan cuyo bloque en el mundo no coincide, con una lectura en bloque.
+
+    Solo se compara el id: getBlocks no devuelve el valor data.
+    """
+    offsets, ids, data = plan_arrays(plan)
+    if len(ids) == 0:
+        return []
+    lo = offsets.min(axis=0)
+    hi = offsets.max(axis=0)
+    world = read_cuboid(
+        mc,
+        site.x + lo[0], site.y + lo[1], site.z + lo[2],
+        site.x + hi[0], site.y + hi[1], site.z + hi[2],
+    )
+    rel = offsets - lo
+    current = world[rel[:, 0], rel[:, 1], rel[:, 2]]
+    differs = np.nonzero(current != ids)[0]
+    return [
+        {"offset": Vec3(*offsets[k].tolist()), "id": int(ids[k]), "data": int(data[k])}
+        for k in differs.tolist()
+    ]
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from mcpi.connection import RequestError
+
+# peticiones por ráfaga al pipelinear getHeight / getBlock
+PIPELINE_CHUNK = 1024
+
+
+def _raw_socket(mc):
+    conn = getattr(mc, "conn", None)
+    return getattr(conn, "socket", None), conn
+
+
+def send_commands(mc, payload: bytes) -> None:
+    """Escribe de una vez en el socket comandos que no tienen respuesta (setBlock, setBlocks...)."""
+    sock, conn = _raw_socket(mc)
+    if sock is None:
+        raise TypeError(f"{type(mc).__name__} no expone un socket para enviar comandos")
+    conn.drain()
+    conn.lastSent = payload
+    sock.sendall(payload)
+
+
+def _pipelined(mc, requests: Sequence[bytes]) -> Optional[List[bytes]]:
+    """Envía las peticiones en ráfagas y devuelve las respuestas en orden.
+
+    Devuelve None si mc no expone el socket (p.ej. un doble de pruebas).
+    """
+    sock, conn = _raw_socket(mc)
+    if sock is None:
+        return None
+    conn.drain()
+    replies: List[bytes] = []
+    reader = sock.makefile("rb")
+    try:
+        for start in range(0, len(requests), PIPELINE_CHUNK):
+            batch = b"".join(requests[start:start + PIPELINE_CHUNK])
+            conn.lastSent = batch
+            sock.sendall(batch)
+            for _ in range(min(PIPELINE_CHUNK, len(requests) - start)):
+                replies.append(reader.readline())
+    except BaseException:
+        # no dejar respuestas de esta ráfaga en el socket para la siguiente petición
+        conn.drain()
+        raise
+    finally:
+        reader.close()
+    return replies
+
+
+def _parse_ints(requests: Sequence[bytes], replies: Sequence[bytes]) -> List[int]:
+    """Convierte las respuestas ya leídas; un "Fail" se señala como RequestError."""
+    values: List[int] = []
+    for request, reply in zip(requests, replies):
+        try:
+            values.append(int(reply))
+        except ValueError:
+            raise RequestError(f"{request.strip().decode()} -> {reply.strip().decode(errors='replace')}") from None
+    return values
+
+
+def read_height_columns(mc, coords: Sequence[Tuple[int, int]]) -> List[int]:
+    """getHeight de cada (x, z) de coords, pipelineado, en el mismo orden."""
+    requests = [b"world.getHeight(%d,%d)\n" % (x, z) for x, z in coords]
+    replies = _pipelined(mc, requests)
+    if replies is None:
+        return [mc.getHeight(x, z) for x, z in coords]
+    return _parse_ints(requests, replies)
+
+
+def read_heights(mc, x0: int, z0: int, width: int, length: int,
+                 out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Alturas de un rectángulo: out[i, j] = getHeight(x0 + i, z0 + j).
+
+    Las peticiones se envían en ráfagas por el socket y las respuestas se leen
+    en orden, en lugar de esperar un viaje de ida y vuelta por columna.
+    """
+    if out is None:
+        out = np.empty((width, length), dtype=np.int16)
+    coords = [(x0 + i, z0 + j) for i in range(width) for j in range(length)]
+    out.reshape(-1)[:] = read_height_columns(mc, coords)
+    return out
+
+
+def read_cuboid(mc, x0: int, y0: int, z0: int, x1: int, y1: int, z1: int) -> np.ndarray:
+    """Ids de bloque de una caja inclusiva como array [dx, dy, dz] (uint16).
+
+    Usa una sola llamada world.getBlocks; RaspberryJuice la recorre en orden
+    y, x, z. Si el servidor no la soporta, se cae a getBlock pipelineado.
+    """
+    x0, x1 = sorted((int(x0), int(x1)))
+    y0, y1 = sorted((int(y0), int(y1)))
+    z0, z1 = sorted((int(z0), int(z1)))
+    nx, ny, nz = x1 - x0 + 1, y1 - y0 + 1, z1 - z0 + 1
+
+    try:
+        ids = np.fromiter(mc.getBlocks(x0, y0, z0, x1, y1, z1), dtype=np.uint16)
+        if ids.size == nx * ny * nz:
+            return ids.reshape(ny, nx, nz).transpose(1, 0, 2)
+    except (RequestError, ValueError, AttributeError):
+        pass
+
+    cells = [(x, y, z) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1) for z in range(z0, z1 + 1)]
+    requests = [b"world.getBlock(%d,%d,%d)\n" % c for c in cells]
+    replies = _pipelined(mc, requests)
+    if replies is None:
+        values = [mc.getBlock(*c) for c in cells]
+    else:
+        values = _parse_ints(requests, replies)
+    return np.array(values, dtype=np.uint16).reshape(nx, ny, nz)
+
+
+class RegionReader:
+    """Lecturas de bloques servidas desde cubos alineados de cube^3 leídos con read_cuboid.
+
+    Cada cubo se pide una sola vez (una llamada getBlocks) y se guarda, así
+    que recorrer vecinos no vuelve a leer lo ya visto. note_write/note_cuboid
+    mantienen los cubos cargados al día con las escrituras de los agentes
+    (p.ej. como listener de WorldCache); lo que cambie por otras vías se
+    recoge porque cada cubo caduca a los ttl segundos, como en WorldCache.
+    """
+
+    def __init__(self, mc, cube: int = 16, max_cubes: int = 256, ttl: Optional[float] = 30.0):
+        self.mc = mc
+        self.cube = cube
+        self.max_cubes = max_cubes
+        self.ttl = ttl
+        self._cubes: "OrderedDict[tuple, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.reads = 0
+
+    def _cube_of(self, x: int, y: int, z: int) -> np.ndarray:
+        key = (x // self.cube, y // self.cube, z // self.cube)
+        with self._lock:
+            entry = self._cubes.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[1] < self.ttl):
+                self._cubes.move_to_end(key)
+                return entry[0]
+        x0, y0, z0 = (k * self.cube for k in key)
+        n = self.cube - 1
+        arr = read_cuboid(self.mc, x0, y0, z0, x0 + n, y0 + n, z0 + n)
+        self.reads += 1
+        with self._lock:
+            self._cubes[key] = (arr, time.monotonic())
+            self._cubes.move_to_end(key)
+            if len(self._cubes) > self.max_cubes:
+                self._cubes.popitem(last=False)
+        return arr
+
+    def get(self, x: int, y: int, z: int) -> int:
+        arr = self._cube_of(x, y, z)
+        return int(arr[x % self.cube, y % self.cube, z % self.cube])
+
+    def cube_at(self, x: int, y: int, z: int) -> Tuple[Tuple[int, int, int], np.ndarray]:
+        """(origen, array [dx, dy, dz]) del cubo que contiene (x, y, z)."""
+        arr = self._cube_of(x, y, z)
+        return (x - x % self.cube, y - y % self.cube, z - z % self.cube), arr
+
+    def note_write(self, x: int, y: int, z: int, block_id: int) -> None:
+        self.note_cuboid(x, y, z, x, y, z, block_id)
+
+    def note_cuboid(self, x0: int, y0: int, z0: int, x1: int, y1: int, z1: int, block_id: int) -> None:
+        """Aplica una caja escrita (inclusiva) a los cubos cargados que toca."""
+        x0, x1 = sorted((int(x0), int(x1)))
+        y0, y1 = sorted((int(y0), int(y1)))
+        z0, z1 = sorted((int(z0), int(z1)))
+        c = self.cube
+        with self._lock:
+            for (kx, ky, kz), (arr, _) in self._cubes.items():
+                ax0, ay0, az0 = max(x0, kx * c), max(y0, ky * c), max(z0, kz * c)
+                ax1, ay1, az1 = min(x1, kx * c + c - 1), min(y1, ky * c + c - 1), min(z1, kz * c + c - 1)
+                if ax0 <= ax1 and ay0 <= ay1 and az0 <= az1:
+                    arr[ax0 - kx * c:ax1 - kx * c + 1, ay0 - ky * c:ay1 - ky * c + 1,
+                        az0 - kz * c:az1 - kz * c + 1] = block_id
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cubes.clear()
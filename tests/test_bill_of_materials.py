@@ -0,0 +1,75 @@
+import random
+
+from mcpi.vec3 import Vec3
+
+from source import BillOfMaterials as bom_module
+from source.BillOfMaterials import BillOfMaterials, bom_for_plan
+from source.BuildCheckpoint import plan_hash
+from source.BuilderBot import BuilderBot
+from source.MessageBus import MessageBus
+
+STONE, WOOL, PLANKS = 1, 35, 5
+
+
+def entry(x, y, z, block_id, data=0):
+    return {"offset": Vec3(x, y, z), "id": block_id, "data": data}
+
+
+def test_from_plan_counts_last_entry_per_cell_and_data():
+    plan = [
+        entry(0, 0, 0, STONE),
+        entry(0, 0, 0, WOOL, 14),               # sustituye a la piedra
+        entry(1, 0, 0, WOOL, 14),
+        entry(2, 0, 0, WOOL, 3),
+        entry(3, 0, 0, PLANKS, 2),
+        entry(3, 0, 0, PLANKS, 2),              # repetida: cuenta una vez
+    ]
+    bom = BillOfMaterials.from_plan(plan)
+    assert bom.by_block == {(WOOL, 14): 2, (WOOL, 3): 1, (PLANKS, 2): 1}
+    assert bom.by_id == {WOOL: 3, PLANKS: 1}
+    assert bom.total == 4 and len(bom) == 3
+    assert BillOfMaterials.from_plan([]).by_block == {}
+
+
+def test_by_id_follows_add_and_remove():
+    bom = BillOfMaterials({(WOOL, 1): 2, (WOOL, 2): 1})
+    assert bom.by_id == {WOOL: 3}
+    bom.add(STONE, count=4)
+    bom.remove(WOOL, 1, 2)
+    assert bom.by_block == {(WOOL, 2): 1, (STONE, 0): 4}
+    assert bom.by_id == {WOOL: 1, STONE: 4}
+
+
+def test_bom_for_plan_returns_copies():
+    bom_module._cache.clear()
+    plan = [entry(x, 0, 0, STONE) for x in range(5)]
+    first = bom_for_plan(plan)
+    first.add(STONE, count=10)
+    second = bom_for_plan(plan)
+    assert second.by_id == {STONE: 5}
+    assert second is not first
+    assert len(bom_module._cache) == 1
+
+
+def test_bom_cache_is_bounded_lru():
+    bom_module._cache.clear()
+    for n in range(bom_module.CACHE_SIZE + 1):
+        bom_for_plan([entry(0, 0, 0, STONE)], key=str(n))
+    assert len(bom_module._cache) == bom_module.CACHE_SIZE
+    assert "0" not in bom_module._cache
+
+
+def test_patch_plan_matches_full_recount():
+    rng = random.Random(7)
+    cell = lambda: (rng.randrange(6), rng.randrange(3), rng.randrange(6))
+    plan = [entry(*cell(), rng.choice((STONE, WOOL, PLANKS)), rng.randrange(3)) for _ in range(150)]
+    bot = BuilderBot(None, "BuilderBot", Vec3(0, 0, 0), 0, MessageBus(), plan)
+    bot.get_inventory()
+    for _ in range(20):
+        add = [entry(*cell(), rng.choice((STONE, WOOL)), rng.randrange(3)) for _ in range(rng.randrange(6))]
+        remove = [{"offset": Vec3(*cell())} for _ in range(rng.randrange(6))]
+        bot.patch_plan(add, remove)
+        full = BillOfMaterials.from_plan(bot.build_plan)
+        assert bot.materials.by_block == full.by_block
+        assert bot.bom == full.by_id
+    assert bot.plan_hash() == plan_hash(bot.build_plan)
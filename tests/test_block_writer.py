@@ -0,0 +1,54 @@
+import itertools
+import random
+
+from source.BlockWriter import BlockWriter, merge_cuboids
+
+
+class FakeConn:
+    def __init__(self):
+        self.socket = self
+        self.sent = b""
+        self.lastSent = b""
+
+    def drain(self):
+        pass
+
+    def sendall(self, data):
+        self.sent += data
+
+
+class FakeMC:
+    def __init__(self):
+        self.conn = FakeConn()
+
+
+def cells_of(boxes):
+    out = []
+    for x0, y0, z0, x1, y1, z1 in boxes:
+        out.extend(itertools.product(range(x0, x1 + 1), range(y0, y1 + 1), range(z0, z1 + 1)))
+    return out
+
+
+def test_merge_solid_box_is_one_cuboid():
+    cells = list(itertools.product(range(4), range(3), range(5)))
+    assert merge_cuboids(cells) == [(0, 0, 0, 3, 2, 4)]
+
+
+def test_merge_covers_each_cell_exactly_once():
+    rng = random.Random(1)
+    cells = {(rng.randrange(8), rng.randrange(4), rng.randrange(8)) for _ in range(150)}
+    covered = cells_of(merge_cuboids(cells))
+    assert len(covered) == len(set(covered))
+    assert set(covered) == cells
+
+
+def test_flush_sends_one_setblocks_per_box():
+    mc = FakeMC()
+    writer = BlockWriter(mc, max_delay=60)
+    writer.set_blocks(0, 0, 0, 2, 0, 0, 1)
+    writer.set_block(10, 5, 10, 4, 2)
+    assert writer.flush() == 2
+    lines = mc.conn.sent.splitlines()
+    assert sorted(lines) == [b"world.setBlock(10,5,10,4,2)", b"world.setBlocks(0,0,0,2,0,0,1,0)"]
+    assert writer.stats()["blocks_written"] == 4
+    assert writer.flush() == 0
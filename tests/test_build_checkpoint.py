@@ -0,0 +1,57 @@
+from mcpi.vec3 import Vec3
+
+from source.BuildCheckpoint import BuildCheckpoint, plan_hash
+
+
+def plan(n, block_id=1):
+    return [{"offset": Vec3(dx, 0, 0), "id": block_id, "data": 0} for dx in range(n)]
+
+
+def lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_plan_hash_is_stable_and_sensitive():
+    assert plan_hash(plan(5)) == plan_hash(plan(5))
+    assert plan_hash(plan(5)) == plan_hash(plan(5, block_id=4) + plan(5))   # la última entrada manda
+    assert plan_hash(plan(5)) != plan_hash(plan(5, block_id=4))
+    assert plan_hash(plan(5)) != plan_hash(plan(6))
+
+
+def test_interval_and_force(tmp_path):
+    cp = BuildCheckpoint(str(tmp_path / "cp.jsonl"), interval=3600)
+    assert cp.save({"plan_hash": "h", "index": 1})
+    assert not cp.save({"plan_hash": "h", "index": 2})
+    assert cp.save({"plan_hash": "h", "index": 3}, force=True)
+    assert cp.load()["index"] == 3
+
+
+def test_resume_state_skips_torn_line_and_done(tmp_path):
+    path = str(tmp_path / "cp.jsonl")
+    cp = BuildCheckpoint(path, interval=0)
+    cp.save({"plan_hash": "h", "index": 7})
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"plan_hash": "h", "ind')          # corte a media escritura
+    assert cp.resume_state("h")["index"] == 7
+
+    cp = BuildCheckpoint(path, interval=0)          # reinicio tras el corte
+    assert len(lines(path)) == 1
+    assert cp.resume_state("h")["index"] == 7
+    assert cp.resume_state("otro") is None
+    cp.mark_done("h")
+    assert cp.resume_state("h") is None
+
+
+def test_compaction_counts_records_from_previous_runs(tmp_path):
+    path = str(tmp_path / "cp.jsonl")
+    cp = BuildCheckpoint(path, interval=0, max_records=5)
+    for i in range(3):
+        cp.save({"plan_hash": "h", "index": i})
+    assert len(lines(path)) == 3
+
+    restarted = BuildCheckpoint(path, interval=0, max_records=5)
+    for i in range(3, 5):
+        restarted.save({"plan_hash": "h", "index": i})
+    assert len(lines(path)) == 1                   # compactado al llegar a 5 entre ambas ejecuciones
+    assert restarted.load()["index"] == 4
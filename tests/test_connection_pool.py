@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from source.ConnectionPool import ConnectionPool, PoolExhausted
+
+
+class FakeMinecraft:
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+
+    def getHeight(self, x, z):
+        if not self.healthy:
+            raise OSError("socket cerrado")
+        return 0
+
+
+def _pool(size=2, **kwargs):
+    made = []
+
+    def factory():
+        made.append(FakeMinecraft())
+        return made[-1]
+
+    return ConnectionPool(size=size, timeout=0.05, factory=factory, **kwargs), made
+
+
+def test_acquire_reuses_and_limits_connections():
+    pool, made = _pool()
+    a, b = pool.acquire(), pool.acquire()
+    assert a is not b
+    with pytest.raises(PoolExhausted):
+        pool.acquire()
+    pool.release(a)
+    assert pool.acquire() is a
+    assert len(made) == 2
+
+
+def test_broken_lease_is_discarded():
+    pool, made = _pool(size=1)
+    with pytest.raises(OSError):
+        with pool.lease() as mc:
+            raise OSError("caída")
+    assert pool.stats()["created"] == 0
+    with pool.lease() as mc:
+        assert mc is made[1]
+
+
+def test_stale_idle_connection_is_checked():
+    pool, made = _pool(size=1, health_interval=0.0)
+    mc = pool.acquire()
+    mc.healthy = False
+    pool.release(mc)
+    assert pool.acquire() is made[1]
+
+
+def test_connection_per_thread_and_release_thread():
+    pool, made = _pool()
+    client = pool.client()
+    main_conn = pool.connection()
+    assert pool.connection() is main_conn
+    seen = []
+
+    def worker():
+        seen.append(pool.connection())
+        client.release_thread()
+
+    t = threading.Thread(target=worker)
+    t.start()
+    t.join()
+    assert seen[0] is not main_conn
+    assert pool.stats() == {"size": 2, "created": 2, "idle": 1}
+    assert client.getHeight(0, 0) == 0
+
+
+def test_close_rejects_new_acquires():
+    pool, _ = _pool()
+    pool.release(pool.acquire())
+    pool.close()
+    assert pool.stats()["idle"] == 0
+    with pytest.raises(PoolExhausted):
+        pool.acquire()
+
+
+def test_health_check_runs_outside_the_lock():
+    pool, made = _pool(size=2, health_interval=0.0)
+    mc = pool.acquire()
+    pool.release(mc)
+    pinging, unblock, got = threading.Event(), threading.Event(), []
+
+    def slow_ping(x, z):
+        pinging.set()
+        unblock.wait(2)
+        return 0
+
+    mc.getHeight = slow_ping
+    t = threading.Thread(target=lambda: got.append(pool.acquire()))
+    t.start()
+    assert pinging.wait(1)
+    started = time.monotonic()
+    other = pool.acquire()                      # no espera al ping en curso
+    assert time.monotonic() - started < 1
+    assert other is not mc
+    pool.release(other)
+    unblock.set()
+    t.join()
+    assert got == [mc]
@@ -0,0 +1,51 @@
+from source.CoverageMap import CHUNK_BITS, CoverageMap
+
+
+def test_test_and_set_with_negative_coordinates():
+    coverage = CoverageMap()
+    assert not coverage.test_and_set(-1, -33)
+    assert coverage.test_and_set(-1, -33)
+    assert (-1, -33) in coverage
+    assert (-1, -32) not in coverage
+    assert len(coverage) == 1
+
+
+def test_add_rect_across_chunks_matches_brute_force():
+    coverage = CoverageMap()
+    coverage.add_rect(-5, 20, 40, 50)
+    coverage.add_rect(0, 0, 10, 30)             # se solapa con el anterior
+    expected = {(x, z) for x in range(-5, 35) for z in range(20, 70)}
+    expected |= {(x, z) for x in range(0, 10) for z in range(0, 30)}
+    assert len(coverage) == len(expected)
+    for x in range(-8, 40, 3):
+        for z in range(-3, 75, 3):
+            assert coverage.test(x, z) == ((x, z) in expected)
+
+
+def test_lru_eviction_bounds_memory():
+    coverage = CoverageMap(max_chunks=2)
+    coverage.test_and_set(0, 0)
+    coverage.test_and_set(CHUNK_BITS, 0)
+    coverage.test(0, 0)
+    coverage.test_and_set(0, 0)                 # (0, 0) pasa a ser el más reciente
+    coverage.test_and_set(2 * CHUNK_BITS, 0)
+    assert coverage.evictions == 1
+    assert coverage.test(0, 0) and not coverage.test(CHUNK_BITS, 0)
+    assert len(coverage) == 2
+    assert coverage.memory_bytes() == 2 * CHUNK_BITS * CHUNK_BITS // 8
+
+
+def test_save_and_load(tmp_path):
+    coverage = CoverageMap()
+    coverage.add_rect(100, -100, 7, 9)
+    path = str(tmp_path / "cobertura.npz")
+    coverage.save(path)
+    loaded = CoverageMap.load(path)
+    assert len(loaded) == 63
+    assert loaded.test(106, -92) and not loaded.test(107, -92)
+
+
+def test_empty_save(tmp_path):
+    path = str(tmp_path / "vacia.npz")
+    CoverageMap().save(path)
+    assert len(CoverageMap.load(path)) == 0
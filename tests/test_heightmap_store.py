@@ -0,0 +1,25 @@
+import numpy as np
+
+from source.HeightmapStore import NODATA, HeightmapStore
+
+
+def test_write_read_and_reopen(tmp_path):
+    store = HeightmapStore(str(tmp_path / "store"), tile=16)
+    heights = np.arange(20 * 5, dtype=np.int16).reshape(20, 5)
+    store.write(10, -3, heights)
+    assert np.array_equal(store.read(10, -3, 20, 5), heights)
+    assert store.read(0, 0, 1, 1)[0, 0] == NODATA      # misma tesela, sin explorar
+    store.close()
+
+    reopened = HeightmapStore(str(tmp_path / "store"), tile=16)
+    assert len(reopened) == len(store)
+    assert np.array_equal(reopened.read(10, -3, 20, 5), heights)
+
+
+def test_migrate_dir_runs_once(tmp_path):
+    (tmp_path / "alturas_1").write_text("# start=(0,64,0)\n1,2\n3,4\n", encoding="utf-8")
+    store = HeightmapStore(str(tmp_path / "store"), tile=16)
+    assert store.migrate_dir(str(tmp_path)) == 1
+    store.write(0, 0, np.array([[9]], dtype=np.int16))   # dato más nuevo del explorador
+    assert store.migrate_dir(str(tmp_path)) == 0
+    assert store.read(0, 0, 2, 2).tolist() == [[9, 2], [3, 4]]
@@ -0,0 +1,67 @@
+import pytest
+
+from source.Message import Message, utc_now_iso
+from source.MessageBus import MessageBus, OverflowPolicy
+
+
+def msg(type="data", target="A", n=0):
+    return Message(type=type, source="test", target=target, timestamp=utc_now_iso(),
+                   payload={"n": n}, status="PENDING", context={})
+
+
+@pytest.mark.parametrize("capacity", [0, -1])
+def test_capacity_must_be_positive(capacity):
+    with pytest.raises(ValueError):
+        MessageBus(capacity=capacity)
+    bus = MessageBus()
+    with pytest.raises(ValueError):
+        bus.configure_target("A", capacity=capacity)
+
+
+def test_drop_oldest_keeps_newest():
+    bus = MessageBus(capacity=2)
+    for n in range(3):
+        assert bus.publish(msg(n=n))
+    assert [bus.poll_for("A").payload["n"] for _ in range(2)] == [1, 2]
+    stats = bus.stats()["A"]
+    assert stats["dropped"] == 1
+    assert stats["dropped_by_type"] == {"data": 1}
+    assert stats["high_water"] == 2
+
+
+def test_drop_oldest_never_evicts_control():
+    bus = MessageBus(capacity=2)
+    bus.publish(msg(type="control", n=0))
+    bus.publish(msg(n=1))
+    bus.publish(msg(n=2))          # expulsa el de datos, no el START
+    assert bus.poll_for("A").type == "control"
+    assert bus.poll_for("A").payload["n"] == 2
+
+
+def test_full_of_control_rejects_new():
+    bus = MessageBus(capacity=1)
+    assert bus.publish(msg(type="control", n=0))
+    assert not bus.publish(msg(n=1))
+    assert bus.poll_for("A").payload["n"] == 0
+    assert bus.stats()["A"]["dropped_by_type"] == {"data": 1}
+
+
+def test_reject_policy():
+    bus = MessageBus(capacity=1, overflow=OverflowPolicy.REJECT)
+    assert bus.publish(msg(n=0))
+    assert not bus.publish(msg(n=1))
+    assert bus.poll_for("A").payload["n"] == 0
+
+
+def test_block_policy_times_out():
+    bus = MessageBus(capacity=1, overflow=OverflowPolicy.BLOCK, block_timeout=0.05)
+    assert bus.publish(msg(n=0))
+    assert not bus.publish(msg(n=1))
+    assert bus.stats()["A"]["dropped"] == 1
+
+
+def test_wait_for_returns_published():
+    bus = MessageBus()
+    bus.publish(msg(target="B", n=7))
+    assert bus.wait_for("B", timeout=0.1).payload["n"] == 7
+    assert bus.wait_for("B", timeout=0.01) is None
@@ -0,0 +1,134 @@
+import sys
+
+import pytest
+from mcpi.vec3 import Vec3
+
+from source.MessageBus import MessageBus
+from source.MinerBot import MinerBot
+
+miner_module = sys.modules["source.MinerBot"]   # source.MinerBot es también la clase
+
+AIR, STONE, BEDROCK, IRON, DIAMOND = 0, 1, 7, 15, 56
+
+
+class FakeWorld:
+    """Doble de Minecraft: piedra por defecto, bloques sueltos en un dict y registro de llamadas."""
+
+    def __init__(self, blocks=None):
+        self.blocks = dict(blocks or {})
+        self.calls = []
+
+    def _get(self, x, y, z):
+        return self.blocks.get((x, y, z), STONE)
+
+    def getBlocks(self, x0, y0, z0, x1, y1, z1):
+        self.calls.append(("getBlocks", x0, y0, z0, x1, y1, z1))
+        # RaspberryJuice recorre en orden y, x, z
+        return [self._get(x, y, z)
+                for y in range(y0, y1 + 1) for x in range(x0, x1 + 1) for z in range(z0, z1 + 1)]
+
+    def setBlocks(self, x0, y0, z0, x1, y1, z1, block_id, data=0):
+        self.calls.append(("setBlocks", x0, y0, z0, x1, y1, z1))
+        for x in range(min(x0, x1), max(x0, x1) + 1):
+            for y in range(min(y0, y1), max(y0, y1) + 1):
+                for z in range(min(z0, z1), max(z0, z1) + 1):
+                    self.blocks[(x, y, z)] = block_id
+
+    def setBlock(self, x, y, z, block_id, data=0):
+        self.calls.append(("setBlock", x, y, z))
+        self.blocks[(x, y, z)] = block_id
+
+    def count(self, name):
+        return sum(1 for call in self.calls if call[0] == name)
+
+
+def miner(world, pos, requirements=(), **kwargs):
+    bot = MinerBot(world, Vec3(*pos), 1, MessageBus(), **kwargs)
+    bot.objectives.set(requirements)
+    return bot
+
+
+def column(world, x, z, y0, y1):
+    return [world._get(x, y, z) for y in range(y0, y1 + 1)]
+
+
+@pytest.mark.parametrize("bedrock_y", [5, 8, 9, 1, 33])
+def test_read_shaft_stops_above_the_highest_bedrock(bedrock_y):
+    # lecturas de 8 en 8 desde y = 40: [33, 40], [25, 32], ... incluye bordes de lectura
+    world = FakeWorld({(3, bedrock_y, 4): BEDROCK, (3, bedrock_y - 2, 4): BEDROCK,
+                       (3, bedrock_y + 1, 4): IRON, (3, 40, 4): DIAMOND})
+    bot = miner(world, (3, 40, 4), column_chunk=8)
+    bottom, shaft = bot.read_shaft(3, 40, 4)
+    assert bottom == bedrock_y + 1
+    assert shaft.tolist() == column(world, 3, 4, bottom, 40)
+    assert world.count("getBlocks") == (40 - bedrock_y) // 8 + 1
+
+
+def test_read_shaft_caps_at_max_depth():
+    world = FakeWorld()
+    bot = miner(world, (0, 100, 0), column_chunk=16, max_depth=40)
+    bottom, shaft = bot.read_shaft(0, 100, 0)
+    assert world.count("getBlocks") == 3                # 16 + 16 + 16 >= 40
+    assert bottom == 100 - 3 * 16 + 1
+    assert len(shaft) == 100 - bottom + 1
+
+
+def test_mine_column_one_read_per_chunk_and_one_write():
+    ores = {(2, y, 2): IRON for y in (12, 20, 33)}
+    ores[(2, 25, 2)] = DIAMOND
+    world = FakeWorld({(2, 9, 2): BEDROCK, **ores})
+    bot = miner(world, (2, 40, 2), {IRON: 2, DIAMOND: 1}, column_chunk=10)
+    found = bot.mine_column()
+    assert found == {IRON: 2, DIAMOND: 1}               # la tercera IRON ya no cuenta
+    assert world.count("getBlocks") == 4 and world.count("setBlocks") == 1
+    assert column(world, 2, 2, 10, 40) == [AIR] * 31
+    assert world._get(2, 9, 2) == BEDROCK
+    assert bot.pos.y == 9
+    assert bot.objetivos_cumplidos()
+
+
+def test_mine_face_is_one_read_and_one_write():
+    world = FakeWorld({(11, 21, 5): IRON, (12, 20, 5): IRON, (10, 22, 5): DIAMOND, (11, 21, 6): IRON})
+    bot = miner(world, (10, 20, 5), {IRON: 5, DIAMOND: 1})
+    assert bot.mine_face(3) == {IRON: 2, DIAMOND: 1}
+    assert world.calls == [("getBlocks", 10, 20, 5, 12, 22, 5), ("setBlocks", 10, 20, 5, 12, 22, 5)]
+    assert all(world._get(x, y, 5) == AIR for x in range(10, 13) for y in range(20, 23))
+    assert world._get(11, 21, 6) == IRON                # la cara siguiente no se toca
+    assert bot.objectives.remaining(IRON) == 3
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+def test_pace_spaces_faces_by_blocks_per_second(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(miner_module, "time", clock)
+    world = FakeWorld()
+    bot = miner(world, (0, 10, 0), {DIAMOND: 1}, max_blocks_per_second=18)
+    bot.mine_face(3)                                    # 9 bloques: la siguiente cara a 0.5 s
+    bot.mine_face(3)
+    clock.now += 0.2                                    # trabajo entre caras: se descuenta
+    bot.mine_face(3)
+    clock.now += 2.0                                    # ya pasó el plazo: no se espera
+    bot.mine_face(3)
+    assert clock.sleeps == [0.5, 0.3]
+    assert world.count("getBlocks") == 4 and world.count("setBlocks") == 4
+
+
+def test_pace_without_limit_never_sleeps(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(miner_module, "time", clock)
+    bot = miner(FakeWorld(), (0, 10, 0), {DIAMOND: 1})
+    for _ in range(3):
+        bot.mine_face(5)
+    assert clock.sleeps == []
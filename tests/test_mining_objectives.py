@@ -0,0 +1,24 @@
+from source.MiningObjectives import MiningObjectives
+
+
+def test_collect_caps_at_requirement_and_completes():
+    objectives = MiningObjectives([(3, 5), (1, 2), (3, 1)])
+    assert objectives.required == {3: 6, 1: 2}
+    assert objectives.collect(3, 4) == 4
+    assert objectives.collect(3, 10) == 2
+    assert objectives.collect(56, 1) == 0
+    assert not objectives.is_target(3) and objectives.remaining(1) == 2
+    assert not objectives.complete
+    objectives.collect(1, 2)
+    assert objectives.complete
+
+
+def test_progress_is_a_snapshot():
+    objectives = MiningObjectives({3: 4})
+    snapshot = objectives.progress()
+    objectives.collect(3, 2)
+    assert snapshot["by_block"][3]["collected"] == 0
+    assert snapshot["total_collected"] == 0
+    progress = objectives.progress()
+    assert progress["by_block"][3] == {"required": 4, "collected": 2, "percentage": 50.0}
+    assert progress["overall_percentage"] == 50.0
@@ -0,0 +1,44 @@
+import itertools
+
+from mcpi.vec3 import Vec3
+
+from source.plan_compiler import CompiledPlan, compile_plan
+
+
+def entry(x, y, z, block_id, data=0):
+    return {"offset": Vec3(x, y, z), "id": block_id, "data": data}
+
+
+def expand(compiled):
+    cells = {}
+    for cmd in compiled.commands:
+        x0, y0, z0, x1, y1, z1, block_id, data = cmd
+        for cell in itertools.product(range(x0, x1 + 1), range(y0, y1 + 1), range(z0, z1 + 1)):
+            assert cell not in cells
+            cells[cell] = (block_id, data)
+    return cells
+
+
+def test_solid_floor_and_walls_compress():
+    plan = [entry(x, 0, z, 1) for x in range(8) for z in range(8)]
+    plan += [entry(x, y, 0, 5, 2) for x in range(8) for y in range(1, 4)]
+    compiled = compile_plan(plan)
+    assert compiled.command_count == 2
+    assert compiled.block_count == 64 + 24
+    assert compiled.compression_ratio == 44.0
+    assert sum(CompiledPlan.volume(c) for c in compiled.commands) == compiled.block_count
+
+
+def test_compiled_plan_reproduces_the_plan_bottom_up():
+    plan = [entry(x, y, z, (x + y + z) % 3 + 1) for x in range(4) for y in range(3) for z in range(4)]
+    plan.append(entry(0, 0, 0, 9, 1))          # la última entrada de la celda manda
+    compiled = compile_plan(plan)
+    expected = {(e["offset"].x, e["offset"].y, e["offset"].z): (e["id"], e["data"]) for e in plan}
+    assert expand(compiled) == expected
+    bottoms = [c[1] for c in compiled.commands]
+    assert bottoms == sorted(bottoms)
+
+
+def test_empty_plan():
+    compiled = compile_plan([])
+    assert compiled.commands == [] and compiled.compression_ratio == 1.0
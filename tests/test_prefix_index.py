@@ -0,0 +1,28 @@
+from source.PrefixIndex import PrefixIndex
+
+
+def test_match_returns_every_prefix_from_shortest():
+    index = PrefixIndex()
+    index.add("", "todo")
+    index.add("map", "mapas")
+    index.add("map.v", "versiones")
+    index.add("mine", "minero")
+    assert index.match("map.v2") == ["todo", "mapas", "versiones"]
+    assert index.match("mine.start") == ["todo", "minero"]
+    assert index.match("build") == ["todo"]
+    assert index.longest("map.v2") == "versiones"
+    assert index.longest("map.x") == "mapas"
+
+
+def test_add_is_idempotent_and_remove_prunes():
+    index = PrefixIndex()
+    index.add("map.v", 1)
+    index.add("map.v", 1)
+    assert len(index) == 1
+    assert index.remove("map.v", 1)
+    assert not index.remove("map.v", 1)
+    assert not index.remove("otro", 1)
+    assert len(index) == 0
+    assert index._root.children == {}
+    assert index.match("map.v") == []
+    assert index.longest("map.v") is None
@@ -0,0 +1,141 @@
+import numpy as np
+
+from source.ConnectionPool import ConnectionPool
+from source.ProspectIndex import CHUNK_SIZE, ProspectIndex, Prospector, spiral_chunks
+
+STONE, IRON, DIAMOND = 1, 15, 56
+
+
+def chunk(fill=STONE, height=8):
+    return np.full((CHUNK_SIZE, height, CHUNK_SIZE), fill, dtype=np.uint16)
+
+
+def test_add_chunk_statistics():
+    index = ProspectIndex()
+    blocks = chunk()
+    blocks[3, 2, 4] = DIAMOND
+    blocks[5, 6, 1] = DIAMOND
+    blocks[0, 0, 0] = 0                        # aire: no se indexa
+    index.add_chunk(2, -1, 10, blocks)
+    [hit] = index.nearest_rich(0, 0, DIAMOND)
+    assert hit["chunk"] == (2, -1)
+    assert hit["count"] == 2 and hit["mean_y"] == 10 + (2 + 6) / 2
+    assert hit["sample"] in {(32 + 3, 12, -16 + 4), (32 + 5, 16, -16 + 1)}
+    assert index.density(2, -1, DIAMOND) == 2 / (16 * 16 * 8)
+    assert 0 not in index.by_ore
+    assert index.is_scanned(2, -1, 11, 17) and not index.is_scanned(2, -1, 0, 17)
+
+
+def test_rescan_replaces_previous_counts():
+    index = ProspectIndex()
+    index.add_chunk(0, 0, 0, chunk(IRON))
+    index.add_chunk(0, 0, 0, chunk())
+    assert index.nearest_rich(0, 0, IRON) == []
+
+
+def test_nearest_rich_orders_by_distance_and_min_count():
+    index = ProspectIndex()
+    for cx, n in ((5, 3), (1, 1), (-2, 3)):
+        blocks = chunk()
+        blocks[:n, 0, 0] = DIAMOND
+        index.add_chunk(cx, 0, 0, blocks)
+    assert [h["chunk"] for h in index.nearest_rich(0, 0, DIAMOND)] == [(1, 0), (-2, 0), (5, 0)]
+    assert [h["chunk"] for h in index.nearest_rich(0, 0, DIAMOND, min_count=2, limit=1)] == [(-2, 0)]
+
+
+def test_note_mined_cells_discounts_the_right_chunks():
+    index = ProspectIndex()
+    for cx in (0, 1):
+        blocks = chunk()
+        blocks[14:, 0, 0] = DIAMOND
+        blocks[:2, 0, 0] = DIAMOND
+        index.add_chunk(cx, 0, 0, blocks)
+    # una veta que cruza el borde entre los chunks 0 y 1
+    index.note_mined_cells(DIAMOND, [(14, 0, 0), (15, 0, 0), (16, 0, 0)])
+    counts = {h["chunk"]: h["count"] for h in index.nearest_rich(0, 0, DIAMOND)}
+    assert counts == {(0, 0): 2, (1, 0): 3}
+    index.note_mined(-1, 0, DIAMOND)           # chunk -1: no indexado, no pasa nada
+    index.note_mined_cells(DIAMOND, [(0, 0, 0), (1, 0, 0)])
+    assert [h["chunk"] for h in index.nearest_rich(0, 0, DIAMOND)] == [(1, 0)]
+
+
+def test_skip_is_applied_before_limit():
+    index = ProspectIndex()
+    for cx in range(12):
+        blocks = chunk()
+        blocks[0, 0, 0] = DIAMOND
+        index.add_chunk(cx, 0, 0, blocks)
+    visited = set()
+    reached = []
+    while True:
+        hits = index.nearest_rich(0, 0, DIAMOND, limit=1, skip=lambda x, z: (x, z) in visited)
+        if not hits:
+            break
+        x, _, z = hits[0]["sample"]
+        visited.add((x, z))
+        reached.append(hits[0]["chunk"])
+    assert reached == [(cx, 0) for cx in range(12)]
+
+
+def test_mined_samples_are_replaced():
+    index = ProspectIndex()
+    blocks = chunk()
+    blocks[:, 3, 5] = DIAMOND                   # 16 columnas con diamante
+    index.add_chunk(0, 0, 0, blocks)
+    samples = index.by_ore[DIAMOND][(0, 0)].samples
+    assert len(samples) == 8 and len({(x, z) for x, _, z in samples}) == 8
+    first = index.nearest_rich(0, 0, DIAMOND)[0]["sample"]
+    index.note_mined_cells(DIAMOND, [first])
+    [hit] = index.nearest_rich(0, 0, DIAMOND)
+    assert hit["count"] == 15 and hit["sample"] != first
+    # todas las muestras extraídas pero quedan menas: se apunta al centro del chunk
+    index.note_mined_cells(DIAMOND, list(index.by_ore[DIAMOND][(0, 0)].samples))
+    [hit] = index.nearest_rich(0, 0, DIAMOND)
+    assert hit["count"] == 8 and hit["sample"] == (8, 3, 8)
+    assert index.nearest_rich(0, 0, DIAMOND, skip=lambda x, z: True) == []
+
+
+def test_save_and_load(tmp_path):
+    index = ProspectIndex()
+    blocks = chunk()
+    blocks[1, 1, 1] = IRON
+    index.add_chunk(-3, 4, -60, blocks)
+    path = str(tmp_path / "menas.npz")
+    index.save(path)
+    loaded = ProspectIndex.load(path)
+    assert len(loaded) == 1
+    assert loaded.nearest_rich(0, 0, IRON) == index.nearest_rich(0, 0, IRON)
+
+
+def test_spiral_covers_square_once_in_rings():
+    chunks = list(spiral_chunks(3, -2, 2))
+    assert len(chunks) == len(set(chunks)) == 25
+    assert chunks[0] == (3, -2)
+    rings = [max(abs(cx - 3), abs(cz + 2)) for cx, cz in chunks]
+    assert rings == sorted(rings)
+
+
+class GetBlocksMC:
+    def getBlocks(self, x0, y0, z0, x1, y1, z1):
+        n = (x1 - x0 + 1) * (y1 - y0 + 1) * (z1 - z0 + 1)
+        return [DIAMOND if x0 == 0 and z0 == 0 else STONE] * n
+
+    def getHeight(self, x, z):
+        return 0
+
+
+def test_prospector_returns_its_connection_after_each_chunk():
+    pool = ConnectionPool(size=1, factory=GetBlocksMC)
+    prospector = Prospector(pool.client(), ProspectIndex(), 0, 0, 0, 3, radius=1, interval=0)
+    assert prospector.scan() == 9
+    assert pool.stats()["idle"] == 1            # nada retenido entre chunks
+    assert prospector.index.nearest_rich(0, 0, DIAMOND)[0]["chunk"] == (0, 0)
+    assert prospector.scan() == 0               # ya escaneado
+
+
+def test_load_previous_format(tmp_path):
+    path = str(tmp_path / "menas.npz")
+    np.savez_compressed(path, scanned=np.array([[0, 0, 0, 7]]),
+                        records=np.array([[DIAMOND, 0, 0, 2, 6, 1, 3, 4]]))
+    [hit] = ProspectIndex.load(path).nearest_rich(0, 0, DIAMOND)
+    assert hit["sample"] == (1, 3, 4) and hit["mean_y"] == 3
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+
+import nbtlib
+import numpy as np
+import pytest
+from mcpi.vec3 import Vec3
+from nbtlib.tag import ByteArray, Short, String
+
+from source import read_schematic
+from source.read_schematic import (CACHE_DIRNAME, LOADER_VERSION, iter_blocks, load_blocks,
+                                   load_blocks_cached, read_blocks)
+
+AIR, STONE, WOOL = 0, 1, 35
+
+
+def write_schematic(path, ids, data=None, add_blocks=True):
+    """Guarda un .schematic con ids[y, z, x]; los ids > 255 van en AddBlocks."""
+    height, length, width = ids.shape
+    flat = ids.reshape(-1).astype(np.uint16)
+    root = {
+        "Width": Short(width), "Height": Short(height), "Length": Short(length),
+        "Materials": String("Alpha"),
+        "Blocks": ByteArray((flat & 0xFF).astype(np.uint8).view(np.int8)),
+    }
+    if data is not None:
+        root["Data"] = ByteArray(data.reshape(-1).astype(np.uint8).view(np.int8))
+    if add_blocks:
+        high = np.zeros(flat.size + flat.size % 2, dtype=np.uint8)
+        high[:flat.size] = flat >> 8
+        # dos nibbles por byte, el índice par en el nibble alto
+        root["AddBlocks"] = ByteArray(((high[0::2] << 4) | high[1::2]).view(np.int8))
+    nbtlib.File(root, root_name="Schematic").save(str(path), gzipped=True)
+    return str(path)
+
+
+def sample_volume():
+    ids = np.zeros((2, 3, 4), dtype=np.uint16)      # [y, z, x]
+    ids[0, 0, 0] = STONE
+    ids[0, 2, 3] = 159                              # > 127: byte negativo en el NBT
+    ids[1, 1, 2] = 300                              # necesita AddBlocks
+    ids[1, 2, 1] = 4095
+    data = np.zeros_like(ids, dtype=np.uint8)
+    data[0, 2, 3] = 14
+    data[1, 1, 2] = 0xF7                            # solo cuenta el nibble bajo
+    return ids, data
+
+
+def test_load_blocks_skips_air_and_decodes_ids(tmp_path):
+    ids, data = sample_volume()
+    blocks = load_blocks(write_schematic(tmp_path / "a.schematic", ids, data))
+    assert (blocks.width, blocks.height, blocks.length) == (4, 2, 3)
+    got = {(x, y, z): (i, d) for x, y, z, i, d in zip(blocks.x.tolist(), blocks.y.tolist(),
+                                                      blocks.z.tolist(), blocks.ids.tolist(),
+                                                      blocks.data.tolist())}
+    assert got == {(0, 0, 0): (STONE, 0), (3, 0, 2): (159, 14), (2, 1, 1): (300, 7), (1, 1, 2): (4095, 0)}
+    assert blocks.to_plan()[0] == {"offset": Vec3(0, 0, 0), "id": STONE, "data": 0}
+
+
+def test_iter_blocks_matches_load_blocks(tmp_path):
+    ids, data = sample_volume()
+    path = write_schematic(tmp_path / "a.schematic", ids, data)
+    blocks = load_blocks(path)
+    eager = list(zip(blocks.x.tolist(), blocks.y.tolist(), blocks.z.tolist(),
+                     blocks.ids.tolist(), blocks.data.tolist()))
+    assert sorted(iter_blocks(path)) == sorted(eager)
+
+
+def test_missing_data_and_addblocks(tmp_path):
+    ids = np.zeros((1, 2, 2), dtype=np.uint16)
+    ids[0, 1, 0] = WOOL
+    blocks = load_blocks(write_schematic(tmp_path / "b.schematic", ids, add_blocks=False))
+    assert blocks.ids.tolist() == [WOOL] and blocks.data.tolist() == [0]
+
+
+def old_read_blocks(path):
+    """read_blocks tal como era antes de NumPy (bucle y, z, x sobre Blocks)."""
+    schem = nbtlib.load(path)
+    width, height, length = int(schem["Width"]), int(schem["Height"]), int(schem["Length"])
+    return [[Vec3(x, y, z), int(schem["Blocks"][y * length * width + z * width + x])]
+            for y in range(height) for z in range(length) for x in range(width)]
+
+
+def test_read_blocks_keeps_the_old_contract(tmp_path):
+    rng = np.random.default_rng(1)
+    ids = rng.choice([AIR, STONE, WOOL, 98], size=(3, 4, 5)).astype(np.uint16)
+    path = write_schematic(tmp_path / "c.schematic", ids, add_blocks=False)
+    new, old = read_blocks(path), old_read_blocks(path)
+    assert new == old                               # aire incluido, orden y, z, x
+    assert len(new) == 3 * 4 * 5
+    assert all(type(tipo) is int for _, tipo in new)
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Cuenta las veces que se parsea el NBT de verdad."""
+    calls = []
+    real = read_schematic.load_blocks
+    monkeypatch.setattr(read_schematic, "load_blocks", lambda path: calls.append(path) or real(path))
+    return calls
+
+
+def same_blocks(a, b):
+    return ((a.width, a.height, a.length) == (b.width, b.height, b.length)
+            and all(np.array_equal(getattr(a, f), getattr(b, f)) for f in ("x", "y", "z", "ids", "data")))
+
+
+def test_cache_miss_then_hit(tmp_path, parses):
+    ids, data = sample_volume()
+    path = write_schematic(tmp_path / "a.schematic", ids, data)
+    first = load_blocks_cached(path)
+    assert len(parses) == 1
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    base = tmp_path / CACHE_DIRNAME / f"{digest}.v{LOADER_VERSION}"
+    meta = json.loads((base.parent / (base.name + ".json")).read_text(encoding="utf-8"))
+    assert meta["sha256"] == digest and meta["count"] == 4 and meta["source"] == "a.schematic"
+
+    second = load_blocks_cached(path)
+    assert len(parses) == 1
+    assert same_blocks(first, second) and same_blocks(second, load_blocks(path))
+
+
+def test_cache_key_follows_content(tmp_path, parses):
+    ids, data = sample_volume()
+    path = write_schematic(tmp_path / "a.schematic", ids, data)
+    cache_dir = str(tmp_path / "cache")
+    load_blocks_cached(path, cache_dir)
+    ids[0, 1, 1] = WOOL
+    write_schematic(path, ids, data)                # mismo nombre, otro contenido
+    blocks = load_blocks_cached(path, cache_dir)
+    assert len(parses) == 2 and len(blocks) == 5
+    assert len([n for n in os.listdir(cache_dir) if n.endswith(".json")]) == 2
+
+
+@pytest.mark.parametrize("damage", ["json_garbage", "json_missing_key", "json_old_version",
+                                    "npy_garbage", "npy_missing"])
+def test_corrupt_sidecar_is_regenerated(tmp_path, parses, damage):
+    ids, data = sample_volume()
+    path = write_schematic(tmp_path / "a.schematic", ids, data)
+    cache_dir = tmp_path / "cache"
+    expected = load_blocks_cached(path, str(cache_dir))
+    [meta_path] = cache_dir.glob("*.json")
+    npy_path = meta_path.with_suffix(".npy")
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    if damage == "json_garbage":
+        meta_path.write_text("{no es json", encoding="utf-8")
+    elif damage == "json_missing_key":
+        del meta["width"]
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+    elif damage == "json_old_version":
+        meta["version"] = LOADER_VERSION - 1
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+    elif damage == "npy_garbage":
+        npy_path.write_bytes(b"basura")
+    else:
+        npy_path.unlink()
+
+    assert same_blocks(load_blocks_cached(path, str(cache_dir)), expected)
+    assert len(parses) == 2
+    load_blocks_cached(path, str(cache_dir))        # ya regenerada
+    assert len(parses) == 2
@@ -0,0 +1,90 @@
+import pytest
+
+from source.RecipeResolver import RecipeResolver
+from source.recetas import RECETAS
+
+LOG, COAL_ORE, FURNACE = 17, 16, 61
+
+
+def receta(out, qty, *inputs):
+    return {
+        "outputs": [{"tipo": "item", "id": out, "data": 0, "cantidad": qty}],
+        "inputs": [{"tipo": "item", "id": i, "data": 0, "cantidad": n} for i, n in inputs],
+    }
+
+
+RECETAS_PRUEBA = {
+    "planks": receta("planks", 4, (LOG, 1)),
+    "sticks": receta("stick", 4, ("planks", 2)),
+    "coal": receta("coal", 1, (COAL_ORE, 1)),
+    "fuel_from_coal": receta("fuel", 1, ("coal", 1)),
+    "fuel_from_planks": receta("fuel", 1, ("planks", 2)),
+    "torch": receta("torch", 4, ("stick", 1), ("fuel", 1)),
+    "furnace": receta(FURNACE, 1, ("fuel", 1), ("planks", 8)),
+}
+
+
+@pytest.fixture
+def resolver():
+    return RecipeResolver(RECETAS_PRUEBA, aliases={})
+
+
+def test_resolve_rounds_up_to_whole_batches(resolver):
+    res = resolver.resolve({"torch": 5})
+    assert res.crafts == {"torch": 2, "sticks": 1, "planks": 1, "fuel_from_coal": 2, "coal": 2}
+    assert res.raw == {LOG: 1, COAL_ORE: 2}
+    assert res.surplus == {"torch": 3, "stick": 2, "planks": 2}
+    assert res.minable() == res.raw and res.unresolved() == {}
+
+
+def test_shared_intermediates_are_batched_together(resolver):
+    res = resolver.resolve({"stick": 4, FURNACE: 1})
+    # 2 + 8 tablones en una sola demanda: 3 lotes, 3 troncos
+    assert res.crafts["planks"] == 3
+    assert res.raw[LOG] == 3
+
+
+def test_explicit_choice_and_memo(resolver):
+    res = resolver.resolve({"torch": 4}, choices={"fuel": "fuel_from_planks"})
+    assert COAL_ORE not in res.raw
+    assert resolver.resolve({"torch": 4}) is resolver.resolve({"torch": 4})
+    with pytest.raises(ValueError):
+        resolver.set_choices({"fuel": "planks"})
+
+
+def test_cycle_is_rejected():
+    recetas = dict(RECETAS_PRUEBA, planks_from_fuel=receta("planks", 1, ("fuel", 1)))
+    resolver = RecipeResolver(recetas, aliases={})
+    with pytest.raises(ValueError):
+        resolver.set_choices({"fuel": "fuel_from_planks", "planks": "planks_from_fuel"})
+    # por defecto se elige una receta que no cierra ciclo
+    assert resolver.resolve({"fuel": 1}).raw
+
+
+def test_repo_recipes_resolve_to_blocks():
+    resolver = RecipeResolver()
+    for name, receta_ in RECETAS.items():
+        out = receta_["outputs"][0]["id"]
+        assert resolver.resolve({out: 1}).crafts, name
+
+
+def test_alternatives_lists_items_with_several_recipes(resolver):
+    assert resolver.alternatives({"torch": 1}) == {"fuel": ["fuel_from_coal", "fuel_from_planks"]}
+    assert resolver.alternatives({"stick": 1}) == {}
+
+
+def test_optimize_follows_costs(resolver):
+    # 8 antorchas: 2 combustibles = 2 menas, o 4 tablones más (un tronco extra)
+    cheap_ore = resolver.optimize({"torch": 8}, costs={COAL_ORE: 1.0, LOG: 10.0})
+    assert cheap_ore.choices["fuel"] == "fuel_from_coal"
+    dear_ore = resolver.optimize({"torch": 8}, costs={COAL_ORE: 50.0, LOG: 10.0})
+    assert dear_ore.choices["fuel"] == "fuel_from_planks"
+    assert COAL_ORE not in dear_ore.raw
+    assert resolver.optimize({"torch": 8}, costs={COAL_ORE: 50.0, LOG: 10.0}) is dear_ore
+
+
+def test_optimize_skips_cyclic_combinations():
+    recetas = dict(RECETAS_PRUEBA, planks_from_fuel=receta("planks", 1, ("fuel", 1)))
+    resolver = RecipeResolver(recetas, aliases={})
+    best = resolver.optimize({"torch": 4})
+    assert best.raw and best.unresolved() == {}
@@ -0,0 +1,54 @@
+import numpy as np
+
+from source.HeightmapStore import NODATA, HeightmapStore
+from source.site_finder import find_sites, find_sites_in_store, sliding_extreme, window_sum
+
+
+def brute_extreme(a, window, op):
+    return np.array([op.reduce(a[i:i + window]) for i in range(len(a) - window + 1)])
+
+
+def test_sliding_extreme_matches_brute_force():
+    rng = np.random.default_rng(0)
+    a = rng.integers(-50, 50, size=37).astype(np.int16)
+    for window in (1, 2, 5, 37):
+        assert np.array_equal(sliding_extreme(a, window, 0, np.maximum), brute_extreme(a, window, np.maximum))
+        assert np.array_equal(sliding_extreme(a, window, 0, np.minimum), brute_extreme(a, window, np.minimum))
+    assert sliding_extreme(a, 40, 0, np.maximum).size == 0
+
+
+def test_window_sum():
+    mask = np.ones((4, 5), dtype=bool)
+    assert (window_sum(mask, 2, 3) == 6).all()
+
+
+def test_find_sites_respects_tolerance_and_nodata():
+    h = np.full((6, 6), 64, dtype=np.int16)
+    h[0, 0] = 70
+    h[5, 5] = NODATA
+    sites = find_sites(h, 3, 3, tolerance=0, origin=(100, 200))
+    xz = {(x, z) for x, _, z in sites}
+    assert (100, 200) not in xz          # ventana con el pico
+    assert (103, 203) not in xz          # ventana sin datos
+    assert (101, 201) in xz
+    assert all(y == 65 for _, y, _ in sites)
+
+
+def test_find_sites_limit_returns_flattest_without_overlap():
+    h = np.full((10, 10), 64, dtype=np.int16)
+    h[:, 5:] += np.arange(5, dtype=np.int16)[None, :] % 2   # mitad z >= 5 algo rugosa
+    sites = find_sites(h, 3, 3, tolerance=2, limit=3)
+    assert len(sites) == 3
+    for a in range(3):
+        for b in range(a + 1, 3):
+            xa, _, za = sites[a]
+            xb, _, zb = sites[b]
+            assert abs(xa - xb) >= 3 or abs(za - zb) >= 3
+    assert sites[0][2] + 3 <= 5          # el primero, en la parte totalmente plana
+
+
+def test_find_sites_in_store(tmp_path):
+    store = HeightmapStore(str(tmp_path), tile=8)
+    store.write(0, 0, np.full((4, 4), 10, dtype=np.int16))
+    sites = find_sites_in_store(store, 4, 4)
+    assert sites == [(0, 11, 0)]
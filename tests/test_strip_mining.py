@@ -0,0 +1,94 @@
+import numpy as np
+
+from source.strip_mining import (StripMine, _segments, next_branch_mine, plan_branch_mine,
+                                 shell_box, tune_spacing)
+
+STONE, DIAMOND = 1, 56
+
+
+def trunk_xs(plan, z):
+    return sorted({x for x0, _, z0, x1, _, z1 in plan if z0 == z1 == z for x in range(x0, x1 + 1)})
+
+
+def test_tune_spacing():
+    assert tune_spacing() == 3
+    assert tune_spacing(3) == 5
+
+
+def test_segments_cover_the_tunnel():
+    segs = _segments(0, 5, 0, -30, y=10, height=2, segment=16)
+    assert segs == [(0, 10, -10, 0, 11, 5), (0, 10, -26, 0, 11, -11), (0, 10, -30, 0, 11, -27)]
+
+
+def test_plan_shape_and_dig_order():
+    plan = plan_branch_mine(0, 10, 0, branches=3, branch_length=5, spacing=3)
+    assert trunk_xs(plan, 0) == list(range(0, 7))
+    branch_cells = {(x0, z) for x0, _, z0, x1, _, z1 in plan if x0 == x1 for z in range(z0, z1 + 1) if z != 0}
+    assert branch_cells == {(bx, z) for bx in (0, 3, 6) for z in list(range(-5, 0)) + list(range(1, 6))}
+    x0s = [t[0] for t in plan]
+    assert x0s == sorted(x0s)
+
+
+def test_consecutive_plans_leave_no_trunk_gap():
+    branches, spacing = 8, 3
+    first = plan_branch_mine(0, 10, 0, branches=branches, spacing=spacing)
+    x, trunk_from = next_branch_mine(0, branches, spacing)
+    second = plan_branch_mine(x, 10, 0, branches=branches, spacing=spacing, trunk_from=trunk_from)
+    trunk = trunk_xs(first + second, 0)
+    assert trunk == list(range(0, trunk[-1] + 1))
+    branch_xs = sorted({t[0] for t in first + second if t[0] == t[3] and t[2] != 0})
+    assert np.all(np.diff(branch_xs) == spacing)
+
+
+def world_shell(world, tunnel):
+    x0, y0, z0, x1, y1, z1 = shell_box(tunnel)
+    return world[x0:x1 + 1, y0:y1 + 1, z0:z1 + 1].copy()
+
+
+def dig(world, tunnels, strip):
+    for t in tunnels:
+        shell = world_shell(world, t)
+        ore, exposed = strip.record(t, shell, lambda i: i == DIAMOND)
+        x0, y0, z0, x1, y1, z1 = t
+        world[x0:x1 + 1, y0:y1 + 1, z0:z1 + 1] = 0
+        yield t, ore, exposed
+
+
+def touching_air(dug):
+    touching = np.zeros_like(dug)
+    for axis in range(3):
+        for shift in (1, -1):
+            touching |= np.roll(dug, shift, axis=axis)
+    return ~dug & touching
+
+
+def test_exposure_counts_each_wall_block_once():
+    world = np.full((40, 6, 40), STONE, dtype=np.uint16)
+    world[5, 2, 21] = DIAMOND               # pared del ramal en x = 4
+    plan = [(t[0] + 1, t[1], t[2] + 20, t[3] + 1, t[4], t[5] + 20)
+            for t in plan_branch_mine(0, 2, 0, branches=3, branch_length=6, spacing=3)]
+    strip = StripMine(plan)
+    ever_exposed = np.zeros(world.shape, dtype=bool)
+    exposed_ore = []
+    for _, _, exposed in dig(world, list(strip.pending), strip):
+        exposed_ore.extend(exposed)
+        ever_exposed |= touching_air(world == 0)
+    assert exposed_ore == [(5, 2, 21)]
+    # bloques que en algún momento tuvieron una cara al aire, por fuerza bruta
+    assert strip.exposed == int(ever_exposed.sum())
+    assert strip.mined == int((world == 0).sum())
+    assert strip.estimate_blocks(10) == int(np.ceil(10 * strip.mined / strip.ore))
+
+
+def test_tracked_cells_stay_bounded():
+    world = np.full((400, 6, 40), STONE, dtype=np.uint16)
+    strip = StripMine([])
+    x, trunk_from, sizes = 1, 1, []
+    for _ in range(12):
+        plan = plan_branch_mine(x, 2, 20, branches=8, branch_length=8, spacing=3, trunk_from=trunk_from)
+        strip.pending.extend(plan)
+        for _ in dig(world, list(plan), strip):
+            strip.pending.popleft()
+        sizes.append(strip.tracked_cells())
+        x, trunk_from = next_branch_mine(x, 8, 3)
+    assert max(sizes[2:]) <= sizes[1] * 1.1
@@ -0,0 +1,51 @@
+import numpy as np
+
+from source.TileIndex import TileIndex
+
+
+def _tile(w=10, l=10):
+    return np.zeros((w, l), dtype=np.int16)
+
+
+def test_query_bbox_and_replace():
+    index = TileIndex(cell=16)
+    index.insert(0, 0, _tile())
+    index.insert(100, -40, _tile(20, 5))
+    assert {t.key for t in index.query_bbox(0, 0, 10, 10)} == {(0, 0)}
+    assert {t.key for t in index.query_bbox(5, -40, 105, 5)} == {(0, 0), (100, -40)}
+    assert index.query_bbox(10, 0, 100, 10) == []      # caja semiabierta: no toca ninguno
+
+    index.insert(0, 0, _tile(40, 40))                   # sustituye al anterior
+    assert len(index) == 2
+    assert {t.key for t in index.query_bbox(30, 30, 31, 31)} == {(0, 0)}
+    assert index.remove(0, 0) and not index.remove(0, 0)
+    assert index.query_bbox(0, 0, 40, 40) == []
+
+
+def test_nearest_matches_brute_force():
+    rng = np.random.default_rng(3)
+    index = TileIndex(cell=32)
+    for x0, z0 in rng.integers(-500, 500, size=(40, 2)):
+        index.insert(int(x0), int(z0), _tile(int(rng.integers(1, 30)), int(rng.integers(1, 30))))
+    for x, z in rng.integers(-700, 700, size=(50, 2)):
+        best = index.nearest(x, z)
+        assert best.distance2(x, z) == min(t.distance2(x, z) for t in index)
+    assert TileIndex().nearest(0, 0) is None
+
+
+def test_far_query_only_visits_occupied_cells():
+    index = TileIndex(cell=16)
+    index.insert(0, 0, _tile())
+    index.insert(40, 40, _tile())
+    rings = []
+    ring = index._ring
+    index._ring = lambda *args: rings.append(list(ring(*args))) or iter(rings[-1])
+    assert index.nearest(1_000_000, -1_000_000).key == (0, 0)
+    assert sum(len(cells) for cells in rings) <= 4 * 4  # solo la caja ocupada, no el camino hasta ella
+
+
+def test_uncovered_cells():
+    index = TileIndex(cell=16)
+    index.insert(0, 0, _tile(16, 16))
+    assert index.uncovered(0, 0, 32, 32) == [(0, 1), (1, 0), (1, 1)]
+    assert index.cell_origin((1, -1)) == (16, -16)
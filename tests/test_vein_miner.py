@@ -0,0 +1,88 @@
+import numpy as np
+
+from source.WorldCache import WorldCache
+from source.vein_miner import find_veins, flood_fill
+from source.world_reads import RegionReader
+
+STONE, IRON, GOLD = 1, 15, 14
+
+
+class ArrayWorld:
+    """Mundo [x, y, z] con getBlocks en el orden y, x, z de RaspberryJuice."""
+
+    def __init__(self, size=32, fill=STONE):
+        self.blocks = np.full((size, size, size), fill, dtype=np.uint16)
+        self.get_blocks_calls = 0
+
+    def getBlocks(self, x0, y0, z0, x1, y1, z1):
+        self.get_blocks_calls += 1
+        return self.blocks[x0:x1 + 1, y0:y1 + 1, z0:z1 + 1].transpose(1, 0, 2).reshape(-1).tolist()
+
+
+def test_region_reader_reads_each_cube_once():
+    world = ArrayWorld()
+    world.blocks[3, 4, 5] = IRON
+    reader = RegionReader(world, cube=8)
+    assert reader.get(3, 4, 5) == IRON
+    assert reader.get(0, 0, 0) == STONE
+    assert reader.reads == 1
+    reader.get(8, 0, 0)
+    assert reader.reads == 2
+
+
+def test_cubes_expire_after_ttl():
+    world = ArrayWorld()
+    reader = RegionReader(world, cube=8, ttl=0)
+    reader.get(1, 1, 1)
+    world.blocks[1, 1, 1] = GOLD                # cambio hecho fuera de los agentes
+    assert reader.get(1, 1, 1) == GOLD
+    assert reader.reads == 2
+
+
+def test_eviction_keeps_recently_used_cubes():
+    world = ArrayWorld()
+    reader = RegionReader(world, cube=8, max_cubes=2)
+    reader.get(0, 0, 0)
+    reader.get(8, 0, 0)
+    reader.get(0, 0, 0)                         # el cubo (0, 0, 0) pasa a ser el más reciente
+    reader.get(16, 0, 0)
+    assert reader.reads == 3
+    reader.get(1, 1, 1)
+    assert reader.reads == 3
+    reader.get(9, 0, 0)
+    assert reader.reads == 4
+
+
+def test_writes_through_world_cache_reach_loaded_cubes():
+    world = ArrayWorld()
+    cache = WorldCache(world)
+    reader = RegionReader(world, cube=8)
+    cache.add_write_listener(reader.note_cuboid)
+    reader.get(0, 0, 0)
+    reader.get(8, 0, 0)
+    cache.note_cuboid(6, 0, 0, 9, 1, 0, 0)     # otro agente excava cruzando dos cubos
+    assert [reader.get(x, 0, 0) for x in range(5, 11)] == [STONE, 0, 0, 0, 0, STONE]
+    assert reader.reads == 2
+
+
+def test_flood_fill_follows_vein_across_cubes():
+    world = ArrayWorld()
+    vein = [(6 + i, 7, 7) for i in range(5)] + [(10, 8, 7), (10, 9, 7)]
+    for cell in vein:
+        world.blocks[cell] = IRON
+    world.blocks[12, 9, 7] = IRON               # no conexo
+    reader = RegionReader(world, cube=8)
+    found = flood_fill(reader, (6, 7, 7), limit=100, visited=set())
+    assert set(found) == set(vein)
+    assert flood_fill(reader, (6, 7, 7), limit=3, visited=set())[:1] == [(6, 7, 7)]
+
+
+def test_find_veins_stops_at_remaining():
+    world = ArrayWorld()
+    for x in range(8, 12):
+        world.blocks[x, 10, 10] = IRON
+    world.blocks[13, 13, 13] = GOLD
+    remaining = {IRON: 2, GOLD: 5}
+    veins = find_veins(RegionReader(world, cube=8), 8, 10, 10, lambda i: remaining.get(i, 0))
+    assert len(veins[IRON]) == 2
+    assert veins[GOLD] == [(13, 13, 13)]
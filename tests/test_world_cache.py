@@ -0,0 +1,97 @@
+import numpy as np
+
+from source.WorldCache import CHUNK_SIZE, WorldCache
+
+
+class FakeWorld:
+    """Doble de Minecraft sin socket: cuenta las llamadas."""
+
+    def __init__(self):
+        self.blocks = {}
+        self.calls = 0
+
+    def getBlock(self, x, y, z):
+        self.calls += 1
+        return self.blocks.get((x, y, z), 0)
+
+    def getHeight(self, x, z):
+        self.calls += 1
+        return (x * 3 + z) % 50
+
+    def setBlock(self, x, y, z, block_id, data=0):
+        self.blocks[(x, y, z)] = block_id
+
+
+def test_reads_are_cached_and_writes_go_through():
+    world = FakeWorld()
+    cache = WorldCache(world)
+    assert cache.get_block(1, 2, 3) == 0
+    assert cache.get_block(1, 2, 3) == 0
+    assert world.calls == 1
+    cache.set_block(1, 2, 3, 4)
+    assert world.blocks[(1, 2, 3)] == 4
+    assert cache.get_block(1, 2, 3) == 4
+    assert world.calls == 1
+    assert cache.stats()["hits"] == 2
+
+
+def test_write_drops_the_column_height():
+    world = FakeWorld()
+    cache = WorldCache(world)
+    cache.get_height(5, 5)
+    cache.get_height(6, 5)
+    cache.note_write(5, 60, 5, 1)
+    calls = world.calls
+    cache.get_height(6, 5)
+    assert world.calls == calls
+    cache.get_height(5, 5)
+    assert world.calls == calls + 1
+    assert cache.get_block(5, 60, 5) == 1 and world.calls == calls + 1
+
+
+def test_read_heights_only_fetches_missing_columns():
+    world = FakeWorld()
+    cache = WorldCache(world)
+    cache.get_height(2, 3)
+    out = cache.read_heights(0, 0, 4, 5)
+    assert world.calls == 20
+    expected = np.array([[(x * 3 + z) % 50 for z in range(5)] for x in range(4)])
+    assert (out == expected).all()
+    cache.read_heights(0, 0, 4, 5)
+    assert world.calls == 20
+
+
+def test_expired_entries_are_read_again():
+    world = FakeWorld()
+    cache = WorldCache(world, ttl=0.0)
+    cache.get_block(0, 0, 0)
+    cache.get_block(0, 0, 0)
+    assert world.calls == 2
+
+
+def test_lru_eviction_by_chunk():
+    world = FakeWorld()
+    cache = WorldCache(world, max_entries=2)
+    cache.get_block(0, 0, 0)
+    cache.get_block(CHUNK_SIZE, 0, 0)
+    cache.get_block(0, 0, 0)                    # el chunk (0, 0) pasa a ser el más reciente
+    cache.get_block(2 * CHUNK_SIZE, 0, 0)
+    assert cache.stats()["evictions"] == 1
+    calls = world.calls
+    cache.get_block(0, 0, 0)
+    assert world.calls == calls
+    cache.get_block(CHUNK_SIZE, 0, 0)
+    assert world.calls == calls + 1
+
+
+def test_write_listeners_receive_boxes():
+    world = FakeWorld()
+    cache = WorldCache(world)
+    seen = []
+    cache.add_write_listener(lambda *box: seen.append(box))
+    cache.note_write(1, 2, 3, 7)
+    cache.note_cuboid(5, 1, 5, 3, 0, 4, 9)
+    assert seen == [(1, 2, 3, 1, 2, 3, 7), (3, 0, 4, 5, 1, 5, 9)]
+    assert cache.stats()["entries"] == 1 + 3 * 2 * 2
+    assert cache.get_block(5, 0, 4) == 9 and cache.get_block(3, 1, 5) == 9
+    assert world.calls == 0
@@ -0,0 +1,105 @@
+import numpy as np
+from mcpi.vec3 import Vec3
+
+from source.BuilderBot import BuilderBot
+from source.MessageBus import MessageBus
+from source.read_schematic import SchematicBlocks
+from source.world_diff import diff_plan, plan_arrays
+
+AIR, STONE, GLASS, WOOL = 0, 1, 20, 35
+
+
+class FakeWorld:
+    """Doble de Minecraft: un dict de bloques (aire por defecto) y contadores de llamadas."""
+
+    def __init__(self, blocks=None):
+        self.blocks = dict(blocks or {})
+        self.reads = 0
+        self.writes = []
+
+    def getBlocks(self, x0, y0, z0, x1, y1, z1):
+        self.reads += 1
+        # RaspberryJuice recorre en orden y, x, z
+        return [self.blocks.get((x, y, z), AIR)
+                for y in range(y0, y1 + 1) for x in range(x0, x1 + 1) for z in range(z0, z1 + 1)]
+
+    def setBlock(self, x, y, z, block_id, data=0):
+        self.writes.append(("setBlock", x, y, z))
+        self.blocks[(x, y, z)] = block_id
+
+    def setBlocks(self, x0, y0, z0, x1, y1, z1, block_id, data=0):
+        self.writes.append(("setBlocks", x0, y0, z0, x1, y1, z1))
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                for z in range(z0, z1 + 1):
+                    self.blocks[(x, y, z)] = block_id
+
+
+def entry(x, y, z, block_id, data=0):
+    return {"offset": Vec3(x, y, z), "id": block_id, "data": data}
+
+
+def test_plan_arrays_keeps_last_entry_per_cell():
+    offsets, ids, data = plan_arrays([entry(0, 0, 0, STONE), entry(1, 0, 0, STONE),
+                                      entry(0, 0, 0, WOOL, 5)])
+    assert offsets.tolist() == [[0, 0, 0], [1, 0, 0]]
+    assert ids.tolist() == [WOOL, STONE] and data.tolist() == [5, 0]
+    empty = plan_arrays([])
+    assert empty[0].shape == (0, 3) and len(empty[1]) == 0
+
+
+def test_plan_arrays_passes_schematic_arrays_through():
+    schem = SchematicBlocks(2, 1, 1, np.array([0, 1], np.int16), np.zeros(2, np.int16),
+                            np.zeros(2, np.int16), np.array([STONE, 300], np.uint16),
+                            np.array([0, 4], np.uint8))
+    offsets, ids, data = plan_arrays(schem)
+    assert offsets.tolist() == [[0, 0, 0], [1, 0, 0]]
+    assert ids.tolist() == [STONE, 300] and data.tolist() == [0, 4]
+
+
+def test_diff_plan_against_known_world():
+    site = Vec3(100, 64, -20)
+    world = FakeWorld({
+        (100, 64, -20): STONE,                  # coincide
+        (101, 64, -20): GLASS,                  # difiere
+        (100, 66, -18): WOOL,                   # la primera entrada casa, la última no
+        (102, 65, -20): WOOL,                   # la primera no casa, la última sí
+    })
+    plan = [
+        entry(0, 0, 0, STONE),
+        entry(1, 0, 0, STONE),
+        entry(0, 2, 2, WOOL), entry(0, 2, 2, GLASS, 3),
+        entry(2, 1, 0, STONE), entry(2, 1, 0, WOOL),
+        entry(1, 1, 1, STONE),                  # aire en el mundo
+    ]
+    missing = diff_plan(world, site, plan)
+    assert world.reads == 1
+    got = {(e["offset"].x, e["offset"].y, e["offset"].z): (e["id"], e["data"]) for e in missing}
+    assert got == {(1, 0, 0): (STONE, 0), (0, 2, 2): (GLASS, 3), (1, 1, 1): (STONE, 0)}
+    assert diff_plan(world, site, []) == [] and world.reads == 1
+
+
+def _builder(world, plan, **kwargs):
+    return BuilderBot(world, "BuilderBot", Vec3(0, 0, 0), 0, MessageBus(), plan, **kwargs)
+
+
+def test_verify_and_repair_places_only_the_difference():
+    site = Vec3(0, 10, 0)
+    plan = [entry(x, 0, z, STONE) for x in range(4) for z in range(3)]
+    world = FakeWorld({(x, 10, z): STONE for x in range(4) for z in range(3)})
+    world.blocks[(2, 10, 1)] = AIR
+    world.blocks[(3, 10, 2)] = GLASS
+    bot = _builder(world, plan)
+    assert bot.verify_and_repair(site) == 2
+    assert sorted(world.writes) == [("setBlock", 2, 10, 1), ("setBlock", 3, 10, 2)]
+    assert diff_plan(world, site, plan) == []
+
+
+def test_verify_and_repair_compiles_cuboids():
+    site = Vec3(5, 0, 5)
+    plan = [entry(x, y, 0, WOOL) for x in range(3) for y in range(2)]
+    world = FakeWorld()
+    bot = _builder(world, plan, compile_plans=True)
+    assert bot.verify_and_repair(site) == 6
+    assert world.writes == [("setBlocks", 5, 0, 5, 7, 1, 5)]
+    assert bot.verify_and_repair(site) == 0
@@ -0,0 +1,88 @@
+import socket
+import threading
+
+import numpy as np
+import pytest
+from mcpi.connection import RequestError
+
+from source.WorldCache import WorldCache
+from source.world_reads import read_cuboid, read_heights
+
+
+class SocketConn:
+    """Conexión mcpi mínima sobre un extremo de socketpair."""
+
+    def __init__(self, sock):
+        self.socket = sock
+        self.lastSent = b""
+
+    def drain(self):
+        self.socket.setblocking(False)
+        try:
+            while self.socket.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        finally:
+            self.socket.setblocking(True)
+
+
+class SocketMC:
+    def __init__(self, reply):
+        client, server = socket.socketpair()
+        self.conn = SocketConn(client)
+        self.requests = 0
+        threading.Thread(target=self._serve, args=(server, reply), daemon=True).start()
+
+    def _serve(self, server, reply):
+        for line in server.makefile("rb"):
+            self.requests += 1
+            server.sendall(reply(line.decode().strip()) + b"\n")
+
+
+def args_of(request):
+    return [int(a) for a in request[request.index("(") + 1:-1].split(",")]
+
+
+class ColumnMC:
+    """Sin socket: read_heights cae a getHeight columna a columna."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def getHeight(self, x, z):
+        self.calls += 1
+        return x + 10 * z
+
+
+def test_read_heights_pipelined():
+    mc = SocketMC(lambda r: b"%d" % sum(args_of(r)))
+    heights = read_heights(mc, 3, 5, 4, 6)
+    assert heights.shape == (4, 6)
+    assert heights[2, 1] == 3 + 2 + 5 + 1
+
+
+def test_fail_reply_raises_after_reading_everything():
+    mc = SocketMC(lambda r: b"Fail" if args_of(r) == [1, 1] else b"7")
+    with pytest.raises(RequestError):
+        read_heights(mc, 0, 0, 3, 3)
+    # el socket queda limpio: la siguiente lectura recibe sus propias respuestas
+    assert read_heights(mc, 5, 5, 2, 2).tolist() == [[7, 7], [7, 7]]
+
+
+def test_read_cuboid_falls_back_to_getblock():
+    mc = SocketMC(lambda r: b"%d" % args_of(r)[1])
+    arr = read_cuboid(mc, 0, 0, 0, 1, 2, 1)   # sin getBlocks: getBlock pipelineado
+    assert arr.shape == (2, 3, 2)
+    assert (arr[:, 2, :] == 2).all()
+
+
+def test_cache_read_heights_only_fetches_missing_columns():
+    mc = ColumnMC()
+    cache = WorldCache(mc)
+    first = cache.read_heights(0, 0, 4, 4)
+    assert mc.calls == 16
+    assert cache.get_height(2, 3) == first[2, 3] == 32
+    second = cache.read_heights(2, 0, 4, 4)
+    assert mc.calls == 24                      # solo las 8 columnas nuevas
+    assert np.array_equal(second[:2], first[2:])